@@ -2,7 +2,9 @@ import os
 from pathlib import Path
 
 from kgls import KGLS
+from kgls.datastructure import CostEvaluator
 from kgls.log import init_logging
+from kgls.read_write import read_vrp_instance
 
 instance = "X-n101-k25"
 
@@ -11,9 +13,17 @@ file_path = os.path.join(instance_path, instance + ".vrp")
 
 init_logging("", instance, 0, True)
 
+# read the instance and compute its costs and neighborhoods only once,
+# the neighborhood has to be as large as the largest one of both searches
+vrp_instance = read_vrp_instance(file_path)
+cost_evaluator = CostEvaluator(
+    vrp_instance.nodes, vrp_instance.capacity, {"neighborhood_size": 30}
+)
+
 # start with a quick search and 'light' parameters
-kgls_light = KGLS(
-    path_to_instance_file=file_path,
+kgls_light = KGLS.from_problem(
+    vrp_instance,
+    cost_evaluator,
     depth_lin_kernighan=2,
     depth_relocation_chain=3,
     num_perturbations=3,
@@ -24,11 +34,11 @@ kgls_light.set_abortion_condition("runtime_without_improvement", 1)
 kgls_light.run(visualize_progress=False)
 
 kgls_light.print_time_distribution()
-kgls_light.best_solution_to_file("interim_solution.txt")
 
 # continue from above solution with a longer search and 'more heavy' parameters
-kgls_heavy = KGLS(
-    path_to_instance_file=file_path,
+kgls_heavy = KGLS.from_problem(
+    vrp_instance,
+    cost_evaluator,
     depth_lin_kernighan=5,
     depth_relocation_chain=3,
     num_perturbations=3,
@@ -36,6 +46,6 @@ kgls_heavy = KGLS(
     moves=["segment_move", "cross_exchange", "relocation_chain"],
 )
 kgls_heavy.set_abortion_condition("runtime_without_improvement", 120)
-kgls_heavy.start_from_solution("interim_solution.txt", False)
+kgls_heavy.run(start_solution=kgls_light.best_solution)
 
-kgls_light.best_solution_to_file("final_solution.txt")
+kgls_heavy.best_solution_to_file("final_solution.txt")
@@ -1,3 +1,15 @@
 from .kgls import KGLS
+from .parallel_kgls import ParallelKGLS
+from .decomposition_kgls import DecompositionKGLS
+from .multilevel_kgls import MultilevelKGLS
+from .solver_service import SolverService
+from .batch_solve import solve_many
 
-__all__ = ["KGLS"]
+__all__ = [
+    "KGLS",
+    "ParallelKGLS",
+    "DecompositionKGLS",
+    "MultilevelKGLS",
+    "SolverService",
+    "solve_many",
+]
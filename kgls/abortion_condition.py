@@ -1,4 +1,6 @@
+import math
 import time
+from typing import Any, Optional
 
 
 class BaseAbortionCondition:
@@ -22,6 +24,21 @@ class BaseAbortionCondition:
         """
         raise NotImplementedError("Subclasses must implement this method.")
 
+    def get_deadline(self, start_time: float) -> float:
+        """
+        Point in time at which the search has to stop, even within an iteration.
+        :param start_time: Algorithm start time.
+        :return: The deadline, or infinity if the condition only aborts between iterations.
+        """
+        return math.inf
+
+    def get_cancel_event(self) -> Optional[Any]:
+        """
+        Event which stops the search as soon as it is set, even within an iteration.
+        :return: The event, or None if the condition only aborts between iterations.
+        """
+        return None
+
 
 class MaxIterationsCondition(BaseAbortionCondition):
     def __init__(self, abortion_parameter: int):
@@ -56,6 +73,9 @@ class MaxRuntimeCondition(BaseAbortionCondition):
         elapsed_time = time.time() - start_time
         return elapsed_time >= self.abortion_parameter
 
+    def get_deadline(self, start_time: float) -> float:
+        return start_time + self.abortion_parameter
+
 
 class RuntimeWithoutImprovementCondition(BaseAbortionCondition):
     def __init__(self, abortion_parameter: int):
@@ -67,3 +87,20 @@ class RuntimeWithoutImprovementCondition(BaseAbortionCondition):
     ) -> bool:
         elapsed_time = time.time() - best_sol_time
         return elapsed_time >= self.abortion_parameter
+
+
+ABORTION_CONDITIONS = {
+    "max_iterations": MaxIterationsCondition,
+    "max_runtime": MaxRuntimeCondition,
+    "iterations_without_improvement": IterationsWithoutImprovementCondition,
+    "runtime_without_improvement": RuntimeWithoutImprovementCondition,
+}
+
+
+def get_abortion_condition(condition_name: str, param: int) -> BaseAbortionCondition:
+    if condition_name not in ABORTION_CONDITIONS:
+        raise ValueError(
+            f"Unknown abortion condition: {condition_name}. "
+            f"Choose one of {' ,'.join(ABORTION_CONDITIONS.keys())}."
+        )
+    return ABORTION_CONDITIONS[condition_name](param)
@@ -0,0 +1,134 @@
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Optional
+
+from .kgls import KGLS
+from .abortion_condition import (
+    BaseAbortionCondition,
+    IterationsWithoutImprovementCondition,
+    MaxRuntimeCondition,
+    get_abortion_condition,
+)
+
+
+def _get_dimension(path_to_instance_file: str) -> int:
+    # number of nodes from the header, without reading the whole instance
+    with open(path_to_instance_file, "r") as file:
+        for line in file:
+            if line.startswith("DIMENSION"):
+                return int(line.split(":")[1].strip())
+            if line.startswith("NODE_COORD_SECTION"):
+                break
+
+    raise ValueError(f"No DIMENSION found in the header of {path_to_instance_file}")
+
+
+def _solve_instance(
+    path_to_instance_file: str,
+    run_parameters: dict[str, Any],
+    abortions_conditions: list[BaseAbortionCondition],
+) -> dict[str, Any]:
+    # executed in a worker process
+    kgls = KGLS(path_to_instance_file, **run_parameters)
+    kgls.set_abortions_conditions(abortions_conditions)
+    kgls.run()
+
+    return {
+        "instance": os.path.basename(path_to_instance_file),
+        "costs": kgls.best_found_solution_value,
+        "gap": kgls.best_found_gap,
+        "run_time": kgls.total_runtime,
+        "iterations": kgls.iterations,
+        "operator_run_times": kgls.operator_run_times,
+    }
+
+
+def solve_many(
+    paths_to_instance_files: list[str],
+    workers: Optional[int] = None,
+    per_instance_budget: Optional[int] = None,
+    abortion_conditions: Optional[list[tuple[str, int]]] = None,
+    large_instance_size: int = 1000,
+    max_large_instances: Optional[int] = None,
+    **kwargs,
+) -> list[dict[str, Any]]:
+    """
+    Solve several instances with KGLS in a process pool, one instance per worker.
+    Instances are started from the largest to the smallest, so that long runs do not
+    end up last. Since memory grows quadratically with the number of nodes, at most
+    'max_large_instances' instances with 'large_instance_size' or more nodes are solved
+    at the same time, other instances are started meanwhile.
+    :param paths_to_instance_files: The '.vrp' files to solve.
+    :param workers: Number of worker processes, by default the number of cpus.
+    :param per_instance_budget: Maximum runtime of each run in seconds.
+    :param abortion_conditions: Pairs of condition name and parameter, which stop each
+        run in addition to 'per_instance_budget'. By default, runs stop after 100
+        iterations without improvement.
+    :param large_instance_size: Number of nodes from which an instance counts as large.
+    :param max_large_instances: By default, all workers can solve large instances.
+    :param kwargs: Run parameters of KGLS.
+    :return: For each instance in the given order, its best costs, gap, run time,
+        iterations and run time of each operator.
+    """
+    run_parameters = KGLS._get_run_parameters(**kwargs)
+    workers = workers or os.cpu_count()
+    max_large_instances = max_large_instances or workers
+
+    if abortion_conditions is None:
+        abortions_conditions = [IterationsWithoutImprovementCondition(100)]
+    else:
+        abortions_conditions = [
+            get_abortion_condition(condition_name, param)
+            for condition_name, param in abortion_conditions
+        ]
+    if per_instance_budget is not None:
+        abortions_conditions.append(MaxRuntimeCondition(per_instance_budget))
+
+    logging.info(
+        f"#Solving {len(paths_to_instance_files)} instances with {workers} worker processes"
+    )
+    start_time = time.time()
+
+    dimensions = {path: _get_dimension(path) for path in paths_to_instance_files}
+    pending = sorted(paths_to_instance_files, key=lambda path: -dimensions[path])
+    running: dict[Future, str] = dict()
+    results: dict[str, dict[str, Any]] = dict()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while pending or running:
+            num_large = sum(
+                dimensions[path] >= large_instance_size for path in running.values()
+            )
+
+            # start the largest instances which may run now
+            for path in list(pending):
+                if len(running) >= workers:
+                    break
+                if dimensions[path] >= large_instance_size:
+                    if num_large >= max_large_instances:
+                        continue
+                    num_large += 1
+
+                pending.remove(path)
+                future = executor.submit(
+                    _solve_instance, path, run_parameters, abortions_conditions
+                )
+                running[future] = path
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = running.pop(future)
+                results[path] = future.result()
+                logging.info(
+                    f"#Solved {results[path]['instance']} with gap {results[path]['gap']} "
+                    f"after {results[path]['run_time']:.1f} seconds"
+                )
+
+    logging.info(
+        f"#Solved {len(paths_to_instance_files)} instances in "
+        f"{(time.time() - start_time):.1f} seconds"
+    )
+
+    return [results[path] for path in paths_to_instance_files]
@@ -0,0 +1,141 @@
+import logging
+import os
+import pickle
+import struct
+import threading
+from typing import Any, Optional
+
+from .datastructure import VRPProblem, VRPSolution
+from .run_stats import COLUMNS
+
+# binary layout of one row of the run stats
+_RUN_STATS_ROW = struct.Struct("<" + "".join(COLUMNS.values()))
+
+
+def solution_to_node_ids(solution: VRPSolution) -> list[list[int]]:
+    # customer ids of each route, empty routes are kept to preserve the route indices
+    return [[node.node_id for node in route.customers] for route in solution.routes]
+
+
+def solution_from_node_ids(
+    route_node_ids: list[list[int]], problem: VRPProblem
+) -> VRPSolution:
+    node_map = {node.node_id: node for node in problem.nodes}
+    solution = VRPSolution(problem)
+    for node_ids in route_node_ids:
+        solution.add_route([node_map[node_id] for node_id in node_ids])
+
+    return solution
+
+
+def get_problem_path(path_to_file: str) -> str:
+    return f"{path_to_file}.problem"
+
+
+def get_run_stats_path(path_to_file: str) -> str:
+    return f"{path_to_file}.stats"
+
+
+def read_checkpoint(path_to_file: str) -> dict[str, Any]:
+    # the search state, completed with the problem and the run stats rows it refers to
+    with open(path_to_file, "rb") as file:
+        state = pickle.load(file)
+    with open(get_problem_path(path_to_file), "rb") as file:
+        state["problem"] = pickle.load(file)
+    with open(get_run_stats_path(path_to_file), "rb") as file:
+        # rows appended after this checkpoint (by a checkpoint which was never completed)
+        # are ignored
+        data = file.read(state["num_run_stats_rows"] * _RUN_STATS_ROW.size)
+    state["run_stats_rows"] = list(_RUN_STATS_ROW.iter_unpack(data))
+
+    return state
+
+
+class CheckpointWriter:
+    """
+    Writes checkpoints of the search state in a background thread, so that the search
+    only pays for taking the snapshot. Each checkpoint is pickled to a temporary file,
+    which then replaces the previous checkpoint, so a crash while writing never leaves
+    a broken checkpoint behind. At most one write is pending at any time.
+    The problem never changes and is written once, next to the first checkpoint.
+    The kept rows of the run stats only grow, so each checkpoint appends its new rows
+    to a stats file and stores how many rows it covers.
+    """
+
+    def __init__(
+        self, path_to_file: str, interval: int, num_run_stats_rows: Optional[int] = None
+    ):
+        self.path_to_file = path_to_file
+        # number of iterations between two checkpoints
+        self.interval = interval
+        # rows of the run stats in the stats file (None: no checkpoint of this run yet)
+        self.num_run_stats_rows = num_run_stats_rows
+        self._thread: Optional[threading.Thread] = None
+
+    def start_new_run(self):
+        # the next checkpoint starts over, with the problem and without run stats rows
+        self.wait()
+        self.num_run_stats_rows = None
+
+    def write(
+        self, state: dict[str, Any], problem: VRPProblem, new_run_stats_rows: list[tuple]
+    ):
+        # 'new_run_stats_rows' are the rows added since the previous checkpoint
+        self.wait()
+        if self.num_run_stats_rows is None:
+            first_row = 0
+        else:
+            first_row = self.num_run_stats_rows
+            problem = None
+        self.num_run_stats_rows = first_row + len(new_run_stats_rows)
+        state["num_run_stats_rows"] = self.num_run_stats_rows
+
+        self._thread = threading.Thread(
+            target=self._write,
+            args=(state, problem, first_row, new_run_stats_rows),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def wait(self):
+        # wait until the pending checkpoint has been written
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @staticmethod
+    def _dump(obj: Any, path_to_file: str):
+        # pickle to a temporary file, which then replaces 'path_to_file'
+        tmp_path = f"{path_to_file}.tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump(obj, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path_to_file)
+
+    def _write(
+        self,
+        state: dict[str, Any],
+        problem: Optional[VRPProblem],
+        first_row: int,
+        new_run_stats_rows: list[tuple],
+    ):
+        if problem is not None:
+            self._dump(problem, get_problem_path(self.path_to_file))
+
+        # append the new rows, dropping rows which no checkpoint refers to
+        run_stats_path = get_run_stats_path(self.path_to_file)
+        mode = "r+b" if first_row > 0 else "wb"
+        with open(run_stats_path, mode) as file:
+            file.seek(first_row * _RUN_STATS_ROW.size)
+            file.truncate()
+            for row in new_run_stats_rows:
+                file.write(_RUN_STATS_ROW.pack(*row))
+            file.flush()
+            os.fsync(file.fileno())
+
+        # the checkpoint is replaced last, so it only refers to data already written
+        self._dump(state, self.path_to_file)
+        logging.debug(
+            f"Wrote checkpoint of iteration {state['iteration']} to {self.path_to_file}"
+        )
@@ -4,5 +4,14 @@ from .route import Route
 from .vrp_solution import VRPSolution
 from .vrp_problem import VRPProblem
 from .cost_evaluator import CostEvaluator
+from .shared_problem_data import SharedProblemData
 
-__all__ = ["Node", "Edge", "Route", "VRPSolution", "VRPProblem", "CostEvaluator"]
+__all__ = [
+    "Node",
+    "Edge",
+    "Route",
+    "VRPSolution",
+    "VRPProblem",
+    "CostEvaluator",
+    "SharedProblemData",
+]
@@ -1,82 +1,241 @@
-import heapq
 from collections import defaultdict
 from itertools import cycle
 import math
-from typing import Any
+from typing import Any, Optional, Union
 
 from .node import Node
 from .edge import Edge
 from .route import Route
+from .shared_problem_data import SharedProblemData
 from .vrp_solution import VRPSolution
 
 
-class MaxHeapWithUpdate:
-    def __init__(self, elements: list[Edge]):
-        # Create a max-heap by inverting values (negate them)
-        self.heap = elements
-        heapq.heapify(self.heap)
-
-    def get_max_element(self):
-        # Pop the max element (the root of the heap)
-        return heapq.heappop(self.heap)  # Removes the largest (smallest negative)
-
-    def insert_element(self, element: Edge):
-        # Add the new value (inverted for max-heap)
-        heapq.heappush(self.heap, element)
-
-    def get_sorted_list(self):
-        # To get a sorted list, we retrieve and negate all elements
-        return sorted([elem for elem in self.heap])
+class IndexedMaxHeap:
+    """
+    Binary max-heap over integer keys, supporting value updates and removals
+    of arbitrary keys in O(log n).
+    Among keys with the same value, the key whose value was set first is the maximum.
+    """
+
+    def __init__(self):
+        self._keys: list[int] = []
+        self._positions: dict[int, int] = dict()
+        # (value, sequence number of the update)
+        self._priorities: dict[int, tuple[float, int]] = dict()
+        self._num_updates: int = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._positions
+
+    def get_max_key(self) -> int:
+        return self._keys[0]
+
+    def get_value(self, key: int) -> float:
+        return self._priorities[key][0]
+
+    def update(self, key: int, value: float):
+        # insert 'key' or change its value
+        self._num_updates += 1
+        self._priorities[key] = (value, self._num_updates)
+
+        if key not in self._positions:
+            self._keys.append(key)
+            self._positions[key] = len(self._keys) - 1
+        self._restore(self._positions[key])
+
+    def remove(self, key: int):
+        position = self._positions.pop(key)
+        del self._priorities[key]
+
+        last_key = self._keys.pop()
+        if position < len(self._keys):
+            self._keys[position] = last_key
+            self._positions[last_key] = position
+            self._restore(position)
+
+    def _is_higher(self, key1: int, key2: int) -> bool:
+        value1, update1 = self._priorities[key1]
+        value2, update2 = self._priorities[key2]
+        return value1 > value2 or (value1 == value2 and update1 < update2)
+
+    def _swap(self, position1: int, position2: int):
+        key1 = self._keys[position1]
+        key2 = self._keys[position2]
+        self._keys[position1] = key2
+        self._keys[position2] = key1
+        self._positions[key2] = position1
+        self._positions[key1] = position2
+
+    def _restore(self, position: int):
+        # sift up
+        while position > 0:
+            parent = (position - 1) // 2
+            if not self._is_higher(self._keys[position], self._keys[parent]):
+                break
+            self._swap(position, parent)
+            position = parent
+
+        # sift down
+        while True:
+            highest = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(self._keys) and self._is_higher(
+                    self._keys[child], self._keys[highest]
+                ):
+                    highest = child
+            if highest == position:
+                break
+            self._swap(position, highest)
+            position = highest
+
+
+class PenalizedCostsRow:
+    # costs from one node, indexed by node id, with the penalized costs of its penalized edges
+    __slots__ = ("costs", "penalized_costs")
+
+    def __init__(self, costs, penalized_costs: dict[int, int]):
+        self.costs = costs
+        self.penalized_costs = penalized_costs
+
+    def __getitem__(self, node_id: int) -> int:
+        costs = self.penalized_costs.get(node_id)
+        if costs is None:
+            return self.costs[node_id]
+        return costs
 
 
 class CostEvaluator:
 
     def __init__(
-        self, nodes: list[Node], capacity: int, run_parameters: dict[str, Any]
+        self,
+        nodes: list[Node],
+        capacity: int,
+        run_parameters: dict[str, Any],
+        shared_data: Optional[SharedProblemData] = None,
     ):
-        self._penalization_enabled: bool = False
-        self._edge_penalties: dict[Edge, int] = defaultdict(int)
-        self._baseline_cost: float = 0.0
-        self._edge_ranking: MaxHeapWithUpdate = None
         self.neighborhood_size = run_parameters["neighborhood_size"]
         self._capacity = capacity
-
-        # compute costs as euclidean distance between each pair of nodes
-        self._costs = dict()
-        for node1 in nodes:
-            self._costs[node1.node_id] = dict()
-            for node2 in nodes:
-                self._costs[node1.node_id][node2.node_id] = (
-                    self._compute_euclidean_distance(node1, node2)
+        self._nodes = nodes
+        self._nodes_by_id: dict[int, Node] = {node.node_id: node for node in nodes}
+        self._num_node_ids: int = max(self._nodes_by_id) + 1
+
+        if shared_data is not None:
+            if shared_data.neighborhood_size != self.neighborhood_size:
+                raise ValueError(
+                    f"Shared problem data has neighborhood size {shared_data.neighborhood_size}, "
+                    f"expected {self.neighborhood_size}"
                 )
+            # costs and neighborhood are read from memory shared with other processes
+            self._costs = shared_data.get_cost_rows()
+            self._neighborhood = shared_data.get_neighborhood(nodes)
 
-        # initialize penalized as euclidean costs
-        self._penalized_costs = dict()
-        for node1 in nodes:
-            self._penalized_costs[node1.node_id] = dict()
-            for node2 in nodes:
-                self._penalized_costs[node1.node_id][node2.node_id] = self._costs[
-                    node1.node_id
-                ][node2.node_id]
+        else:
+            # compute costs as euclidean distance between each pair of nodes
+            self._costs = dict()
+            for node1 in nodes:
+                self._costs[node1.node_id] = dict()
+                for node2 in nodes:
+                    self._costs[node1.node_id][node2.node_id] = (
+                        self._compute_euclidean_distance(node1, node2)
+                    )
+
+            # get neighborhood for each node
+            self._neighborhood = self._compute_neighborhood(nodes)
+
+        # costs to the neighbours, as lists parallel to the neighborhood lists
+        self._neighborhood_costs: dict[int, list[int]] = dict()
+        # position of each neighbour in the neighborhood list
+        self._neighborhood_slots: dict[int, dict[int, int]] = dict()
+        for node, neighbors in self._neighborhood.items():
+            self._neighborhood_costs[node.node_id] = [
+                self._costs[node.node_id][neighbor.node_id] for neighbor in neighbors
+            ]
+            self._neighborhood_slots[node.node_id] = {
+                neighbor.node_id: slot for slot, neighbor in enumerate(neighbors)
+            }
+
+        self.reset_search_state(run_parameters)
+
+    def reset_search_state(self, run_parameters: dict[str, Any]) -> None:
+        """
+        Reset everything a run changes: penalties, penalized costs, edge rankings and
+        the active neighborhood. Costs and neighborhoods are kept, so one evaluator can be
+        reused by consecutive runs with different parameters, as long as their
+        neighborhood is not larger than the precomputed one.
+        """
+        if run_parameters["neighborhood_size"] > self.neighborhood_size:
+            raise ValueError(
+                f"Cost evaluator has neighborhood size {self.neighborhood_size}, "
+                f"expected at least {run_parameters['neighborhood_size']}"
+            )
+
+        self._penalization_enabled: bool = False
+        # penalty counts, indexed by edge id and ordered from least to most recently penalized
+        self._edge_penalties: dict[int, int] = defaultdict(int)
+        # with penalty policy 'lru', only the most recently penalized edges keep their penalty
+        self._max_penalized_edges: Optional[int] = None
+        if run_parameters.get("penalty_policy") == "lru":
+            self._max_penalized_edges = max(1, run_parameters["max_penalized_edges"])
+        # upper bound of the difference between penalized and euclidean costs of any edge
+        self._max_penalty_surcharge: int = 0
+
+        # penalized costs of penalized edges (in both directions), by node id and node id.
+        # All other edges are read from the euclidean costs, which are never copied.
+        self._penalized_costs: dict[int, dict[int, int]] = dict()
+        self._penalized_neighborhood_costs: dict[int, list[int]] = {
+            node_id: costs.copy() for node_id, costs in self._neighborhood_costs.items()
+        }
 
-        # get neighborhood for each node
-        self._neighborhood = self._compute_neighborhood(nodes)
+        # operators only consider the nearest 'active_neighborhood_size' neighbours
+        self.active_neighborhood_size = self.neighborhood_size
+        self._active_neighborhood = self._neighborhood
+        self.set_active_neighborhood_size(run_parameters["neighborhood_size"])
 
+        # penalties are relative to the average costs to the neighbours of the run
         self._baseline_cost = int(
             sum(
                 self.get_distance(node, other)
-                for node in nodes
+                for node in self._nodes
                 if not node.is_depot
-                for other in self._neighborhood[node]
+                for other in self._active_neighborhood[node]
             )
-            / (self.neighborhood_size * len(nodes))
+            / (self.active_neighborhood_size * len(self._nodes))
         )
 
         self._penalization_criterium_options = cycle(
             ["width", "length", "width_length"]
         )
+        # different seeds start the search with different criteria
+        for _ in range(run_parameters.get("seed", 0) % 3):
+            next(self._penalization_criterium_options)
         self._penalization_criterium = next(self._penalization_criterium_options)
 
+        # For each criterium, the edges of the solution are ranked by their badness
+        # in an indexed heap over edge ids. Between two perturbations, only the edges
+        # of changed routes and the edges with changed penalties are re-ranked.
+        criteria = ["width", "length", "width_length"]
+        self._edge_rankings: dict[str, IndexedMaxHeap] = {
+            criterium: IndexedMaxHeap() for criterium in criteria
+        }
+        # route index -> (route, version of route, ranked edge ids)
+        self._ranked_routes: dict[str, dict[int, tuple[Route, int, list[int]]]] = {
+            criterium: dict() for criterium in criteria
+        }
+        # edges whose penalty changed since the ranking was refreshed
+        self._outdated_edges: dict[str, set[int]] = {
+            criterium: set() for criterium in criteria
+        }
+        # route index -> (route, version of route, (edge ids, widths, lengths))
+        self._route_edge_values: dict[
+            int, tuple[Route, int, tuple[list[int], list[float], list[int]]]
+        ] = dict()
+        self._edge_ranking: Optional[IndexedMaxHeap] = None
+        # route index -> (route, version of route, euclidean costs)
+        self._route_costs: dict[int, tuple[Route, int, int]] = dict()
+
     @staticmethod
     def _compute_euclidean_distance(node1: Node, node2: Node) -> int:
         return round(
@@ -87,7 +246,32 @@ class CostEvaluator:
         )
 
     def get_neighborhood(self, node: Node) -> list[Node]:
-        return self._neighborhood[node]
+        return self._active_neighborhood[node]
+
+    def get_neighborhood_costs(self, node: Node) -> list[int]:
+        # current (possibly penalized) costs to the neighbours, parallel to get_neighborhood
+        # (covers the full neighborhood, also if only a prefix of it is active)
+        if self._penalization_enabled:
+            return self._penalized_neighborhood_costs[node.node_id]
+        return self._neighborhood_costs[node.node_id]
+
+    def get_neighborhood_with_costs(self, node: Node) -> zip:
+        # iterates (neighbour, current costs) pairs of the neighborhood of 'node'
+        return zip(self._active_neighborhood[node], self.get_neighborhood_costs(node))
+
+    def set_active_neighborhood_size(self, size: int) -> None:
+        # restrict the neighborhood to a prefix of the precomputed nearest neighbours
+        size = max(1, min(size, self.neighborhood_size))
+        if size == self.active_neighborhood_size:
+            return
+
+        self.active_neighborhood_size = size
+        if size == self.neighborhood_size:
+            self._active_neighborhood = self._neighborhood
+        else:
+            self._active_neighborhood = {
+                node: neighbors[:size] for node, neighbors in self._neighborhood.items()
+            }
 
     def _compute_neighborhood(self, nodes: list[Node]) -> list[Node]:
         neighborhood = {
@@ -113,47 +297,133 @@ class CostEvaluator:
         return capacity <= self._capacity
 
     def determine_edge_badness(self, routes: list[Route]):
-        edges_in_solution: list[Edge] = []
-
-        criterium_functions = {
-            "length": self._compute_edge_length_value,
-            "width": self._compute_edge_width_value,
-            "width_length": self._compute_edge_width_length_value,
-        }
-        # Get the computation function based on the current penalization criterium
-        compute_edge_value = criterium_functions[self._penalization_criterium]
-
+        criterium = self._penalization_criterium
+        ranking = self._edge_rankings[criterium]
+        ranked_routes = self._ranked_routes[criterium]
+
+        # remove the edges of routes which changed or are no longer in the solution
+        current_routes = {route.route_index: route for route in routes}
+        for route_index, (route, version, edge_ids) in list(ranked_routes.items()):
+            if current_routes.get(route_index) is not route or route.version != version:
+                for edge_id in edge_ids:
+                    if edge_id in ranking:
+                        ranking.remove(edge_id)
+                del ranked_routes[route_index]
+
+        # rank the edges of new and changed routes
         for route in routes:
-            center_x, center_y = (None, None)
-            if self._penalization_criterium in {"width", "width_length"}:
-                center_x, center_y = self._compute_route_center(route.nodes)
+            if route.route_index not in ranked_routes and route.size > 0:
+                ranked_routes[route.route_index] = (
+                    route,
+                    route.version,
+                    self._rank_route_edges(route, criterium, ranking),
+                )
 
-            for edge in route.edges:
-                # Compute the value for the edge
-                edge.value = compute_edge_value(edge, center_x, center_y, route)
-                edge.value /= 1 + self._edge_penalties[edge]
-                edges_in_solution.append(edge)
+        # re-rank the edges of unchanged routes whose penalty changed
+        outdated_edges = self._outdated_edges[criterium]
+        for route, _, edge_ids in ranked_routes.values():
+            if outdated_edges.intersection(edge_ids):
+                self._rank_route_edges(route, criterium, ranking, outdated_edges)
+        outdated_edges.clear()
 
-        # Update edge ranking
-        self._edge_ranking = MaxHeapWithUpdate(edges_in_solution)
+        self._edge_ranking = ranking
 
         # Rotate to next penalization criterium
         self._penalization_criterium = next(self._penalization_criterium_options)
 
-    def _compute_edge_length_value(self, edge: Edge, *args) -> float:
-        return self._costs[edge.nodes[0].node_id][edge.nodes[1].node_id]
+    def _rank_route_edges(
+        self,
+        route: Route,
+        criterium: str,
+        ranking: IndexedMaxHeap,
+        only_edges: Optional[set[int]] = None,
+    ) -> list[int]:
+        edge_ids, widths, lengths = self._get_route_edge_values(route)
+
+        if criterium == "width":
+            values = widths
+        elif criterium == "length":
+            values = lengths
+        else:
+            values = [width + length for width, length in zip(widths, lengths)]
+
+        for edge_id, value in zip(edge_ids, values):
+            if only_edges is None or edge_id in only_edges:
+                ranking.update(
+                    edge_id, value / (1 + self._edge_penalties.get(edge_id, 0))
+                )
 
-    def _compute_edge_width_value(
-        self, edge: Edge, center_x: float, center_y: float, route: Route
-    ) -> float:
-        return self._compute_edge_width(edge, center_x, center_y, route.depot)
+        return edge_ids
+
+    def _get_route_edge_values(
+        self, route: Route
+    ) -> tuple[list[int], list[float], list[int]]:
+        """
+        Ids, widths and lengths of all edges of 'route'.
+        The values of all criteria are computed in one pass over the route's coordinates
+        and are reused by the rankings of the other criteria until the route changes.
+        """
+        cached = self._route_edge_values.get(route.route_index)
+        if cached is not None and cached[0] is route and cached[1] == route.version:
+            return cached[2]
+
+        nodes = route._nodes
+        depot = route.depot
+        center_x, center_y = self._compute_route_center(route.nodes)
+        distance_depot_center = math.sqrt(
+            math.pow(depot.x_coordinate - center_x, 2)
+            + math.pow(depot.y_coordinate - center_y, 2)
+        )
+
+        # signed distance of each node to the line through depot and route center
+        delta_x = center_x - depot.x_coordinate
+        delta_y = center_y - depot.y_coordinate
+        offset_x = center_x * depot.y_coordinate
+        offset_y = center_y * depot.x_coordinate
+        if distance_depot_center == 0:
+            line_distances = [0] * len(nodes)
+        else:
+            line_distances = [
+                (
+                    delta_y * node.x_coordinate
+                    - delta_x * node.y_coordinate
+                    + offset_x
+                    - offset_y
+                )
+                / distance_depot_center
+                for node in nodes
+            ]
+
+        edge_ids = []
+        widths = []
+        lengths = []
+        num_node_ids = self._num_node_ids
+        for idx in range(len(nodes) - 1):
+            node1_id = nodes[idx].node_id
+            node2_id = nodes[idx + 1].node_id
+            if node1_id >= node2_id:
+                edge_ids.append(node1_id * num_node_ids + node2_id)
+            else:
+                edge_ids.append(node2_id * num_node_ids + node1_id)
+            widths.append(abs(line_distances[idx] - line_distances[idx + 1]))
+            lengths.append(self._costs[node1_id][node2_id])
+
+        values = (edge_ids, widths, lengths)
+        self._route_edge_values[route.route_index] = (route, route.version, values)
+        return values
+
+    def _get_edge_id(self, edge: Edge) -> int:
+        return edge.nodes[0].node_id * self._num_node_ids + edge.nodes[1].node_id
+
+    def _get_edge_by_id(self, edge_id: int) -> Edge:
+        return Edge(
+            self._nodes_by_id[edge_id // self._num_node_ids],
+            self._nodes_by_id[edge_id % self._num_node_ids],
+        )
 
-    def _compute_edge_width_length_value(
-        self, edge: Edge, center_x: float, center_y: float, route: Route
-    ) -> float:
-        width_value = self._compute_edge_width(edge, center_x, center_y, route.depot)
-        length_value = self._costs[edge.nodes[0].node_id][edge.nodes[1].node_id]
-        return width_value + length_value
+    def _mark_penalty_changed(self, edge_id: int) -> None:
+        for outdated_edges in self._outdated_edges.values():
+            outdated_edges.add(edge_id)
 
     def enable_penalization(self):
         self._penalization_enabled = True
@@ -167,88 +437,221 @@ class CostEvaluator:
                 node2.node_id
             ]  # node1.get_distance(node2)
         else:
-            return self._penalized_costs[node1.node_id][
-                node2.node_id
-            ]  # node1.get_distance(node2) + 0.1 * self._baseline_cost * self._edge_penalties[Edge(node1, node2)]
+            penalized_costs = self._penalized_costs.get(node1.node_id)
+            if penalized_costs is not None and node2.node_id in penalized_costs:
+                # node1.get_distance(node2) + 0.1 * self._baseline_cost * self._edge_penalties[Edge(node1, node2)]
+                return penalized_costs[node2.node_id]
+            return self._costs[node1.node_id][node2.node_id]
+
+    def may_improve_route(
+        self, node: Node, gain: float, route: Route, nearest_neighbour: Node
+    ) -> bool:
+        """
+        Cheap geometric test whether connecting 'node' to a customer of 'route' can pay off.
+        A move which removes edges worth 'gain', adds one edge between 'node' and a customer
+        of 'route' and removes one edge of 'route' next to this customer can only be improving
+        if 'gain' + (removed edge) > (added edge). Edges between customers are bounded by the
+        longest one of the route and the added edge by the unpenalized costs to
+        'nearest_neighbour', the nearest neighbour of 'node' in 'route'.
+        Depot edges are usually much longer, but can only be removed when connecting to the
+        first or last customer, so these two connections are checked exactly.
+        Euclidean edge lengths are rounded to costs, hence the 0.5 tolerances.
+        """
+        min_added_costs = self._costs[node.node_id][nearest_neighbour.node_id]
+
+        max_gain = gain + 0.5
+        if self._penalization_enabled:
+            max_gain += self._max_penalty_surcharge
+
+        if max_gain + route.max_edge_length > min_added_costs:
+            return True
+
+        for customer, depot_edge_length in route.depot_edges:
+            added_costs = max(
+                min_added_costs,
+                math.hypot(
+                    node.x_coordinate - customer.x_coordinate,
+                    node.y_coordinate - customer.y_coordinate,
+                )
+                - 0.5,
+            )
+            if max_gain + depot_edge_length > added_costs:
+                return True
+
+        return False
+
+    def get_costs_from(self, node: Node) -> Union[dict[int, int], PenalizedCostsRow]:
+        # current (possibly penalized) costs from 'node' to all nodes, indexed by node id
+        if self._penalization_enabled:
+            penalized_costs = self._penalized_costs.get(node.node_id)
+            if penalized_costs is not None:
+                return PenalizedCostsRow(self._costs[node.node_id], penalized_costs)
+        return self._costs[node.node_id]
 
     def get_and_penalize_worst_edge(self) -> Edge:
-        worst_edge = self._edge_ranking.get_max_element()
-        self._edge_penalties[worst_edge] += 1
+        return self._penalize_edge(self._edge_ranking.get_max_key())
+
+    def get_and_penalize_worst_edges(self, num_edges: int) -> list[Edge]:
+        # the 'num_edges' worst edges, each penalized once even if it stays the worst edge
+        worst_edge_ids = []
+        while len(worst_edge_ids) < num_edges and len(self._edge_ranking) > 0:
+            worst_edge_ids.append(self._edge_ranking.get_max_key())
+            # taken out of the ranking until it is penalized (and ranked again)
+            self._edge_ranking.remove(worst_edge_ids[-1])
+
+        return [self._penalize_edge(edge_id) for edge_id in worst_edge_ids]
+
+    def _penalize_edge(self, worst_edge_id: int) -> Edge:
+        worst_edge = self._get_edge_by_id(worst_edge_id)
+        self._increase_penalty(worst_edge_id)
 
         # update costs
         node1 = worst_edge.nodes[0].node_id
         node2 = worst_edge.nodes[1].node_id
-        penalization_costs = round(
-            self._costs[node1][node2]
-            + 0.1 * self._baseline_cost * self._edge_penalties[worst_edge]
+        penalization_costs = self._compute_penalized_costs(
+            node1, node2, self._edge_penalties[worst_edge_id]
+        )
+        self._set_penalized_costs(node1, node2, penalization_costs)
+        self._max_penalty_surcharge = max(
+            self._max_penalty_surcharge, penalization_costs - self._costs[node1][node2]
         )
-        self._penalized_costs[node1][node2] = penalization_costs
-        self._penalized_costs[node2][node1] = penalization_costs
 
         # update (reduce) 'badness' of the just penalized edge (to avoid penalizing it again too soon)
         worst_edge.value = self._costs[node1][node2] / (
-            1 + self._edge_penalties[worst_edge]
+            1 + self._edge_penalties[worst_edge_id]
         )
-        self._edge_ranking.insert_element(worst_edge)
+        self._edge_ranking.update(worst_edge_id, worst_edge.value)
 
         return worst_edge
 
+    def _set_penalized_costs(self, node1: int, node2: int, costs: int) -> None:
+        # update the penalized costs and the neighborhood costs in both directions
+        for from_node, to_node in ((node1, node2), (node2, node1)):
+            if costs != self._costs[from_node][to_node]:
+                self._penalized_costs.setdefault(from_node, dict())[to_node] = costs
+            elif from_node in self._penalized_costs:
+                # the edge is no longer penalized
+                self._penalized_costs[from_node].pop(to_node, None)
+                if not self._penalized_costs[from_node]:
+                    del self._penalized_costs[from_node]
+
+            slot = self._neighborhood_slots.get(from_node, {}).get(to_node)
+            if slot is not None:
+                self._penalized_neighborhood_costs[from_node][slot] = costs
+
     def penalize(self, edge: Edge) -> None:
-        self._edge_penalties[edge] += 1
+        self._increase_penalty(self._get_edge_id(edge))
+
+    def _compute_penalized_costs(self, node1: int, node2: int, penalty: int) -> int:
+        return round(self._costs[node1][node2] + 0.1 * self._baseline_cost * penalty)
+
+    def _increase_penalty(self, edge_id: int) -> None:
+        # (re-)insert the edge as the most recently penalized one
+        self._edge_penalties[edge_id] = self._edge_penalties.pop(edge_id, 0) + 1
+        self._mark_penalty_changed(edge_id)
+
+        if self._max_penalized_edges is not None:
+            while len(self._edge_penalties) > self._max_penalized_edges:
+                # evict the least recently penalized edge
+                self._set_penalty(next(iter(self._edge_penalties)), 0)
+
+    def _set_penalty(self, edge_id: int, penalty: int) -> None:
+        if penalty > 0:
+            self._edge_penalties[edge_id] = penalty
+        else:
+            self._edge_penalties.pop(edge_id, None)
+        self._mark_penalty_changed(edge_id)
+
+        node1, node2 = divmod(edge_id, self._num_node_ids)
+        self._set_penalized_costs(
+            node1, node2, self._compute_penalized_costs(node1, node2, penalty)
+        )
+
+    def decay_penalties(self) -> None:
+        # halve all penalties, edges whose penalty drops to 0 are no longer penalized
+        for edge_id, penalty in list(self._edge_penalties.items()):
+            self._set_penalty(edge_id, penalty // 2)
+        self._update_max_penalty_surcharge()
+
+    def reset_penalties(self) -> None:
+        for edge_id in list(self._edge_penalties):
+            self._set_penalty(edge_id, 0)
+        self._update_max_penalty_surcharge()
+
+    def _update_max_penalty_surcharge(self) -> None:
+        # tighten the bound after penalties were lowered
+        self._max_penalty_surcharge = 0
+        for edge_id in self._edge_penalties:
+            node1, node2 = divmod(edge_id, self._num_node_ids)
+            costs = self._costs[node1][node2]
+            penalized_costs = self._penalized_costs.get(node1, {}).get(node2, costs)
+            self._max_penalty_surcharge = max(
+                self._max_penalty_surcharge, penalized_costs - costs
+            )
+
+    def get_search_state(self) -> dict[str, Any]:
+        # the state of the guided local search, which is not derived from the instance
+        return {
+            "edge_penalties": list(self._edge_penalties.items()),
+            "penalization_criterium": self._penalization_criterium,
+            "active_neighborhood_size": self.active_neighborhood_size,
+        }
+
+    def set_search_state(self, state: dict[str, Any]) -> None:
+        # restore a state of 'get_search_state', the edge rankings are recomputed
+        self.reset_penalties()
+        for edge_id, penalty in state["edge_penalties"]:
+            self._set_penalty(edge_id, penalty)
+        self._update_max_penalty_surcharge()
+
+        criterium = state["penalization_criterium"]
+        self._penalization_criterium_options = cycle(
+            ["width", "length", "width_length"]
+        )
+        while next(self._penalization_criterium_options) != criterium:
+            pass
+        self._penalization_criterium = criterium
+
+        self.set_active_neighborhood_size(state["active_neighborhood_size"])
+
+    @property
+    def num_penalized_edges(self) -> int:
+        return len(self._edge_penalties)
 
     def get_solution_costs(
         self, solution: VRPSolution, ignore_penalties: bool = False
     ) -> int:
-        solution_costs: int = 0
+        if ignore_penalties or not self._penalization_enabled:
+            # costs of routes which did not change since the last call are reused
+            return sum(
+                self._get_route_costs(route)
+                for route in solution.routes
+                if route.size > 0
+            )
 
+        solution_costs: int = 0
         for route in solution.routes:
             if route.size > 0:
                 for idx in range(len(route._nodes) - 1):
-                    edge_node1 = route._nodes[idx]
-                    edge_node2 = route._nodes[idx + 1]
-
-                    if ignore_penalties:
-                        solution_costs += self._costs[edge_node1.node_id][
-                            edge_node2.node_id
-                        ]
-                    else:
-                        solution_costs += self.get_distance(edge_node1, edge_node2)
+                    solution_costs += self.get_distance(
+                        route._nodes[idx], route._nodes[idx + 1]
+                    )
 
         return solution_costs
 
-    @staticmethod
-    def _compute_edge_width(
-        edge: Edge, route_center_x: float, route_center_y: float, depot: Node
-    ) -> float:
-        node1 = edge.get_first_node()
-        node2 = edge.get_second_node()
+    def _get_route_costs(self, route: Route) -> int:
+        # euclidean costs of 'route', cached until the route changes
+        cached = self._route_costs.get(route.route_index)
+        if cached is not None and cached[0] is route and cached[1] == route.version:
+            return cached[2]
 
-        distance_depot_center = math.sqrt(
-            math.pow(depot.x_coordinate - route_center_x, 2)
-            + math.pow(depot.y_coordinate - route_center_y, 2)
-        )
-
-        distance_node1 = (
-            (route_center_y - depot.y_coordinate) * node1.x_coordinate
-            - (route_center_x - depot.x_coordinate) * node1.y_coordinate
-            + (route_center_x * depot.y_coordinate)
-            - (route_center_y * depot.x_coordinate)
-        )
-        distance_node1 = (
-            0 if distance_depot_center == 0 else distance_node1 / distance_depot_center
+        nodes = route._nodes
+        costs = sum(
+            self._costs[nodes[idx].node_id][nodes[idx + 1].node_id]
+            for idx in range(len(nodes) - 1)
         )
-
-        distance_node2 = (
-            (route_center_y - depot.y_coordinate) * node2.x_coordinate
-            - (route_center_x - depot.x_coordinate) * node2.y_coordinate
-            + (route_center_x * depot.y_coordinate)
-            - (route_center_y * depot.x_coordinate)
-        )
-        distance_node2 = (
-            0 if distance_depot_center == 0 else distance_node2 / distance_depot_center
-        )
-
-        return abs(distance_node1 - distance_node2)
+        self._route_costs[route.route_index] = (route, route.version, costs)
+        return costs
 
     @staticmethod
     def _compute_route_center(nodes: list[Node]) -> tuple[float, float]:
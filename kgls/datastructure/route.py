@@ -1,4 +1,5 @@
-from typing import List
+import math
+from typing import List, Optional
 
 from .edge import Edge
 from .node import Node
@@ -20,6 +21,12 @@ class Route:
             node.demand for node in self._nodes
         )  # Sum of demand of all customers of the route
 
+        # incremented whenever the nodes of the route change
+        self.version: int = 0
+        # geometry of the route, lazily recomputed after the route changed
+        self._max_edge_length: Optional[float] = None
+        self._depot_edges: Optional[tuple[tuple[Node, float], tuple[Node, float]]] = None
+
         self.validate()
 
     def __repr__(self):
@@ -37,6 +44,7 @@ class Route:
         self.size -= 1
         self.volume -= node.demand
         self._nodes.remove(node)
+        self.mark_changed()
 
     def add_customers_after(self, nodes_to_add: list[Node], insert_after: Node):
         if insert_after not in self._nodes:
@@ -50,6 +58,50 @@ class Route:
             self.size += 1
             self.volume += node.demand
 
+        self.mark_changed()
+
+    def mark_changed(self):
+        self.version += 1
+        self._max_edge_length = None
+        self._depot_edges = None
+
+    def _update_geometry(self):
+        customers = self._nodes[1:-1]
+        self._max_edge_length = max(
+            (
+                math.hypot(
+                    customers[idx].x_coordinate - customers[idx + 1].x_coordinate,
+                    customers[idx].y_coordinate - customers[idx + 1].y_coordinate,
+                )
+                for idx in range(len(customers) - 1)
+            ),
+            default=0,
+        )
+        self._depot_edges = tuple(
+            (
+                customer,
+                math.hypot(
+                    self.depot.x_coordinate - customer.x_coordinate,
+                    self.depot.y_coordinate - customer.y_coordinate,
+                ),
+            )
+            for customer in (self._nodes[1], self._nodes[-2])
+        )
+
+    @property
+    def max_edge_length(self) -> float:
+        # longest euclidean edge between two customers of the route (without the depot edges)
+        if self._max_edge_length is None:
+            self._update_geometry()
+        return self._max_edge_length
+
+    @property
+    def depot_edges(self) -> tuple[tuple[Node, float], tuple[Node, float]]:
+        # first and last customer of the route with the euclidean length of their depot edge
+        if self._depot_edges is None:
+            self._update_geometry()
+        return self._depot_edges
+
     @property
     def customers(self) -> list[Node]:
         return self._nodes[1:-1]
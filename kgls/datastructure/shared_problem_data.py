@@ -0,0 +1,190 @@
+from multiprocessing import shared_memory
+from typing import Optional
+
+from .node import Node
+from .vrp_problem import VRPProblem
+
+
+class _SharedMemory(shared_memory.SharedMemory):
+    def __del__(self):
+        # views of the memory may outlive this object, the mapping is then released with them
+        try:
+            self.close()
+        except (BufferError, OSError):
+            pass
+
+
+class SharedProblemData:
+    """
+    Nodes, euclidean costs and nearest neighbors of a VRP instance in shared memory.
+    The data is computed once by the creating process. Pickling only transfers the
+    name of the memory block, so worker processes attach to the same memory
+    without copying or recomputing anything.
+    Costs and neighbors are indexed by node id and must not be modified.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        num_nodes: int,
+        num_node_ids: int,
+        neighborhood_size: int,
+        capacity: int,
+        bks: float,
+        create: bool = False,
+    ):
+        self.num_nodes = num_nodes
+        self.num_node_ids = num_node_ids
+        self.neighborhood_size = neighborhood_size
+        self.capacity = capacity
+        self.bks = bks
+        self._is_owner = create
+
+        # (offset in bytes, item format, number of items) of each array
+        self._layout: dict[str, tuple[int, str, int]] = dict()
+        offset = 0
+        for array_name, item_format, num_items in (
+            ("x_coordinates", "d", num_nodes),
+            ("y_coordinates", "d", num_nodes),
+            ("node_ids", "i", num_nodes),
+            ("demands", "i", num_nodes),
+            ("is_depot", "i", num_nodes),
+            ("costs", "i", num_node_ids * num_node_ids),
+            ("neighbor_counts", "i", num_node_ids),
+            ("neighbors", "i", num_node_ids * neighborhood_size),
+        ):
+            self._layout[array_name] = (offset, item_format, num_items)
+            offset += num_items * (8 if item_format == "d" else 4)
+
+        if create:
+            self._memory = _SharedMemory(create=True, size=max(1, offset))
+        else:
+            self._memory = _SharedMemory(name=name)
+        self._arrays: Optional[dict[str, memoryview]] = None
+
+    @classmethod
+    def create(cls, problem: VRPProblem, neighborhood_size: int) -> "SharedProblemData":
+        from .cost_evaluator import CostEvaluator
+
+        cost_evaluator = CostEvaluator(
+            problem.nodes, problem.capacity, {"neighborhood_size": neighborhood_size}
+        )
+        num_node_ids = max(node.node_id for node in problem.nodes) + 1
+
+        shared_data = cls(
+            name="",
+            num_nodes=len(problem.nodes),
+            num_node_ids=num_node_ids,
+            neighborhood_size=neighborhood_size,
+            capacity=problem.capacity,
+            bks=problem.bks,
+            create=True,
+        )
+        arrays = shared_data._get_arrays()
+        for idx, node in enumerate(problem.nodes):
+            arrays["x_coordinates"][idx] = node.x_coordinate
+            arrays["y_coordinates"][idx] = node.y_coordinate
+            arrays["node_ids"][idx] = node.node_id
+            arrays["demands"][idx] = node.demand
+            arrays["is_depot"][idx] = node.is_depot
+
+        for node1 in problem.nodes:
+            row_start = node1.node_id * num_node_ids
+            for node2 in problem.nodes:
+                arrays["costs"][row_start + node2.node_id] = (
+                    cost_evaluator.get_distance(node1, node2)
+                )
+
+        for node in problem.customers:
+            neighbors = cost_evaluator.get_neighborhood(node)
+            arrays["neighbor_counts"][node.node_id] = len(neighbors)
+            row_start = node.node_id * neighborhood_size
+            for slot, neighbor in enumerate(neighbors):
+                arrays["neighbors"][row_start + slot] = neighbor.node_id
+
+        return shared_data
+
+    def __getstate__(self):
+        return (
+            self._memory.name,
+            self.num_nodes,
+            self.num_node_ids,
+            self.neighborhood_size,
+            self.capacity,
+            self.bks,
+        )
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __enter__(self) -> "SharedProblemData":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        # release the memory, which is freed once the creating process closed it
+        if self._arrays is not None:
+            for array in self._arrays.values():
+                array.release()
+            self._arrays = None
+
+        try:
+            self._memory.close()
+        except BufferError:
+            # costs are still in use, the mapping is released together with them
+            pass
+        if self._is_owner:
+            self._memory.unlink()
+
+    def _get_arrays(self) -> dict[str, memoryview]:
+        if self._arrays is None:
+            self._arrays = {
+                array_name: self._memory.buf[
+                    offset : offset + num_items * (8 if item_format == "d" else 4)
+                ].cast(item_format)
+                for array_name, (offset, item_format, num_items) in self._layout.items()
+            }
+        return self._arrays
+
+    def get_problem(self) -> VRPProblem:
+        arrays = self._get_arrays()
+        nodes = [
+            Node(
+                node_id=arrays["node_ids"][idx],
+                x_coordinate=arrays["x_coordinates"][idx],
+                y_coordinate=arrays["y_coordinates"][idx],
+                demand=arrays["demands"][idx],
+                is_depot=bool(arrays["is_depot"][idx]),
+            )
+            for idx in range(self.num_nodes)
+        ]
+        return VRPProblem(nodes=nodes, capacity=self.capacity, bks=self.bks)
+
+    def get_cost_rows(self) -> dict[int, memoryview]:
+        # costs from each node, indexed by node id (views of the shared memory)
+        costs = self._get_arrays()["costs"]
+        node_ids = self._get_arrays()["node_ids"]
+        return {
+            node_id: costs[
+                node_id * self.num_node_ids : (node_id + 1) * self.num_node_ids
+            ]
+            for node_id in node_ids
+        }
+
+    def get_neighborhood(self, nodes: list[Node]) -> dict[Node, list[Node]]:
+        arrays = self._get_arrays()
+        nodes_by_id = {node.node_id: node for node in nodes}
+
+        neighborhood = dict()
+        for node in nodes:
+            if not node.is_depot:
+                row_start = node.node_id * self.neighborhood_size
+                row_end = row_start + arrays["neighbor_counts"][node.node_id]
+                neighborhood[node] = [
+                    nodes_by_id[neighbor_id]
+                    for neighbor_id in arrays["neighbors"][row_start:row_end]
+                ]
+
+        return neighborhood
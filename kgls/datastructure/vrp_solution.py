@@ -184,6 +184,7 @@ class VRPSolution:
                 self._next[node.node_id] = node_order[idx + 1]
 
         route._nodes = node_order
+        route.mark_changed()
         self.validate()
 
     def _initialize_plots(self):
@@ -0,0 +1,227 @@
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+
+from .datastructure import CostEvaluator, Node, VRPProblem, VRPSolution
+from .kgls import KGLS
+from .read_write import read_vrp_instance
+from .solution_construction import sweep
+from .abortion_condition import (
+    BaseAbortionCondition,
+    IterationsWithoutImprovementCondition,
+    get_abortion_condition,
+)
+
+
+def _improve_routes(
+    depot: Node,
+    capacity: int,
+    routes: list[list[Node]],
+    run_parameters: dict[str, Any],
+    iterations: int,
+) -> list[list[Node]]:
+    # executed in a worker process: KGLS on the subproblem formed by 'routes'
+    customers = [node for route in routes for node in route]
+    sub_problem = VRPProblem([depot] + customers, capacity)
+
+    start_solution = VRPSolution(sub_problem)
+    for route in routes:
+        start_solution.add_route(route)
+
+    kgls = KGLS.from_problem(sub_problem, **run_parameters)
+    kgls.set_abortion_condition("max_iterations", iterations)
+    kgls.run(start_solution=start_solution)
+
+    return [route.customers for route in kgls.best_solution.routes if route.size > 0]
+
+
+def group_routes_by_angle(
+    routes: list[list[Node]], depot: Node, routes_per_group: int, shift: int = 0
+) -> list[list[list[Node]]]:
+    # groups of neighboring routes, by the polar angle of their centers around the depot
+    # (with the group boundaries shifted by 'shift' routes)
+    def get_center_angle(route: list[Node]) -> float:
+        center_x = sum(node.x_coordinate for node in route) / len(route)
+        center_y = sum(node.y_coordinate for node in route) / len(route)
+        return math.atan2(center_y - depot.y_coordinate, center_x - depot.x_coordinate)
+
+    sorted_routes = sorted(routes, key=get_center_angle)
+    sorted_routes = sorted_routes[shift:] + sorted_routes[:shift]
+
+    return [
+        sorted_routes[idx : idx + routes_per_group]
+        for idx in range(0, len(sorted_routes), routes_per_group)
+    ]
+
+
+def _compute_route_costs(route: list[Node], depot: Node) -> int:
+    route_nodes = [depot] + route + [depot]
+    return sum(
+        CostEvaluator._compute_euclidean_distance(
+            route_nodes[idx], route_nodes[idx + 1]
+        )
+        for idx in range(len(route_nodes) - 1)
+    )
+
+
+class DecompositionKGLS:
+    """
+    KGLS for very large instances, which never works on the full solution at once.
+    In each round, the routes are partitioned into groups of 'routes_per_group'
+    neighboring routes, by the polar angle of their centers around the depot.
+    Each group is solved as an independent subproblem with KGLS in a process pool,
+    starting from the group's routes, and the improved routes replace them.
+    Group boundaries are shifted every other round, so that routes at the border
+    of two groups are also optimized together.
+    """
+
+    _abortions_conditions: list[BaseAbortionCondition]
+    _best_solution: Optional[VRPSolution]
+    _run_stats: list[dict[str, Any]]
+
+    def __init__(
+        self,
+        path_to_instance_file: str,
+        workers: Optional[int] = None,
+        routes_per_group: int = 10,
+        iterations_per_group: int = 50,
+        **kwargs,
+    ):
+        self.run_parameters = KGLS._get_run_parameters(**kwargs)
+        self._vrp_instance = read_vrp_instance(path_to_instance_file)
+        self.workers = workers or os.cpu_count()
+        self.routes_per_group = routes_per_group
+        self.iterations_per_group = iterations_per_group
+        # abortion conditions refer to rounds
+        self._abortions_conditions = [IterationsWithoutImprovementCondition(5)]
+        self._best_solution = None
+        self._best_solution_costs = math.inf
+        self._run_stats = []
+
+    def set_abortion_condition(self, condition_name: str, param: int):
+        # Set the abortion condition, iterations are counted in rounds.
+        self._abortions_conditions = [get_abortion_condition(condition_name, param)]
+
+    def add_abortion_condition(self, condition_name: str, param: int):
+        # Add an abortion condition, iterations are counted in rounds.
+        self._abortions_conditions.append(get_abortion_condition(condition_name, param))
+
+    def _get_route_groups(
+        self, routes: list[list[Node]], round_index: int
+    ) -> list[list[list[Node]]]:
+        # shift the group boundaries by half a group every other round
+        shift = (round_index % 2) * (self.routes_per_group // 2)
+        return group_routes_by_angle(
+            routes, self._vrp_instance.depot, self.routes_per_group, shift
+        )
+
+    def _compute_solution_costs(self, routes: list[list[Node]]) -> int:
+        depot = self._vrp_instance.depot
+        return sum(_compute_route_costs(route, depot) for route in routes)
+
+    def run(self, start_solution: Optional[VRPSolution] = None):
+        abortion_msg = " ".join(a.msg for a in self._abortions_conditions)
+        logging.info(
+            f"#Running decomposition KGLS with {self.workers} worker processes. "
+            f"{abortion_msg}"
+        )
+
+        start_time = time.time()
+        self._run_stats = []
+        round_index = 0
+
+        if start_solution is None:
+            start_solution = sweep(self._vrp_instance)
+        routes = [route.customers for route in start_solution.routes if route.size > 0]
+
+        self._best_solution_costs = self._compute_solution_costs(routes)
+        best_round = 0
+        best_solution_time = time.time()
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            while not any(
+                a.should_abort(
+                    iteration=round_index,
+                    best_iteration=best_round,
+                    start_time=start_time,
+                    best_sol_time=best_solution_time,
+                )
+                for a in self._abortions_conditions
+            ):
+                round_index += 1
+
+                futures = [
+                    executor.submit(
+                        _improve_routes,
+                        self._vrp_instance.depot,
+                        self._vrp_instance.capacity,
+                        group,
+                        self.run_parameters,
+                        self.iterations_per_group,
+                    )
+                    for group in self._get_route_groups(routes, round_index)
+                ]
+                # each group is at least as good as before, so is the merged solution
+                routes = [route for future in futures for route in future.result()]
+
+                costs = self._compute_solution_costs(routes)
+                if costs < self._best_solution_costs:
+                    best_round = round_index
+                    best_solution_time = time.time()
+                    self._best_solution_costs = costs
+
+                logging.info(
+                    [
+                        round_index,
+                        f"{(time.time() - start_time):1f}",
+                        costs,
+                        len(routes),
+                    ]
+                )
+                self._run_stats.append(
+                    {
+                        "run_time": time.time() - start_time,
+                        "iteration": round_index,
+                        "costs": costs,
+                        "num_routes": len(routes),
+                    }
+                )
+
+        self._best_solution = VRPSolution(self._vrp_instance)
+        for route in routes:
+            self._best_solution.add_route(route)
+        self._best_solution.validate()
+
+        logging.info(
+            f"#Decomposition KGLS finished after {(time.time() - start_time): 1f} "
+            f"seconds and {round_index} rounds."
+        )
+
+    def best_solution_to_file(self, path_to_file: str):
+        self._best_solution.to_file(path_to_file)
+
+    @property
+    def best_solution(self) -> Optional[VRPSolution]:
+        return self._best_solution
+
+    @property
+    def best_found_solution_value(self) -> int:
+        return self._best_solution_costs
+
+    @property
+    def best_found_gap(self) -> Optional[float]:
+        if self._vrp_instance.bks != float("inf"):
+            return (
+                100
+                * (self._best_solution_costs - self._vrp_instance.bks)
+                / self._vrp_instance.bks
+            )
+        else:
+            return None
+
+    @property
+    def run_stats(self) -> list[dict[str, Any]]:
+        return self._run_stats
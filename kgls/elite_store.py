@@ -0,0 +1,70 @@
+import math
+import multiprocessing
+from typing import Optional
+
+from .datastructure import VRPProblem, VRPSolution
+
+
+class EliteStore:
+    """
+    Best solution found by any of several cooperating KGLS processes.
+    The solution lives in shared memory as a sequence of node ids in which
+    routes are separated by the depot, guarded by a lock.
+    The store has to be handed to the processes when they are created.
+    """
+
+    def __init__(self, num_nodes: int):
+        self._lock = multiprocessing.Lock()
+        self._costs = multiprocessing.Value("d", math.inf, lock=False)
+        self._length = multiprocessing.Value("i", 0, lock=False)
+        # customers plus one depot before each route and one at the end
+        self._node_ids = multiprocessing.Array("i", 2 * num_nodes + 1, lock=False)
+
+    @property
+    def costs(self) -> float:
+        return self._costs.value
+
+    def publish(self, solution: VRPSolution, costs: int) -> bool:
+        # store 'solution' if it is better than the current elite solution
+        if costs >= self._costs.value:
+            return False
+
+        depot_id = solution.problem.depot.node_id
+        node_ids = [depot_id]
+        for route in solution.routes:
+            if route.size > 0:
+                node_ids.extend(node.node_id for node in route.customers)
+                node_ids.append(depot_id)
+
+        with self._lock:
+            if costs >= self._costs.value:
+                return False
+
+            self._node_ids[: len(node_ids)] = node_ids
+            self._length.value = len(node_ids)
+            self._costs.value = costs
+
+        return True
+
+    def get_better_solution(
+        self, costs: int, problem: VRPProblem
+    ) -> Optional[VRPSolution]:
+        # the elite solution, if it is better than 'costs'
+        if self._costs.value >= costs:
+            return None
+
+        with self._lock:
+            node_ids = self._node_ids[: self._length.value]
+
+        node_map = {node.node_id: node for node in problem.nodes}
+        solution = VRPSolution(problem)
+        route_nodes = []
+        for node_id in node_ids[1:]:
+            node = node_map[node_id]
+            if node.is_depot:
+                solution.add_route(route_nodes)
+                route_nodes = []
+            else:
+                route_nodes.append(node)
+
+        return solution
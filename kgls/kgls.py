@@ -1,19 +1,30 @@
 import logging
 import math
 import time
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
-from .datastructure import CostEvaluator, VRPProblem, VRPSolution
+from .datastructure import CostEvaluator, SharedProblemData, VRPProblem, VRPSolution
 from .read_write.problem_reader import read_vrp_instance
 from .read_write.solution_reader import read_vrp_solution
-from .local_search import improve_solution, perturbate_solution
-from .solution_construction import clark_wright_route_reduction
+from .local_search import (
+    Deadline,
+    improve_solution,
+    perturbate_solution,
+    get_registered_operators,
+)
+from .solution_construction import clark_wright_route_reduction, giant_tour_split
+from .elite_store import EliteStore
+from .run_stats import RunStats
+from .checkpoint import (
+    CheckpointWriter,
+    read_checkpoint,
+    solution_from_node_ids,
+    solution_to_node_ids,
+)
 from .abortion_condition import (
     BaseAbortionCondition,
-    MaxRuntimeCondition,
-    MaxIterationsCondition,
-    RuntimeWithoutImprovementCondition,
     IterationsWithoutImprovementCondition,
+    get_abortion_condition,
 )
 
 
@@ -21,10 +32,38 @@ DEFAULT_PARAMETERS = {
     "depth_lin_kernighan": 4,
     "depth_relocation_chain": 3,
     "num_perturbations": 3,
+    "perturbation_batch_size": 1,
     "neighborhood_size": 20,
     "moves": ["segment_move", "cross_exchange", "relocation_chain"],
+    "acceptance": "best",
+    "first_k": 5,
+    "operator_scheduling": "fixed",
+    "scheduling_patience": 50,
+    "min_neighborhood_size": 0,
+    "neighborhood_growth_iterations": 20,
+    "penalty_policy": "keep",
+    "penalty_interval": 100,
+    "max_penalized_edges": 1000,
+    "construction": "savings",
+    "seed": 0,
 }
 
+# possible values of parameters which are not of type int
+PARAMETER_CHOICES = {
+    "acceptance": ["best", "first", "best_of_first_k"],
+    "operator_scheduling": ["fixed", "adaptive"],
+    "penalty_policy": ["keep", "decay", "reset", "lru"],
+    "construction": ["savings", "sweep_split", "hilbert_split"],
+}
+
+# int parameters which have to be at least 1
+POSITIVE_PARAMETERS = [
+    "perturbation_batch_size",
+    "scheduling_patience",
+    "neighborhood_growth_iterations",
+    "penalty_interval",
+]
+
 # # Same default as original paper
 # DEFAULT_PARAMETERS = {
 #     "depth_lin_kernighan": 4,
@@ -45,18 +84,72 @@ class KGLS:
     _best_solution_costs: int
     _best_iteration: int
     _best_solution_time: int
-    _run_stats: list[dict[str, Any]]
+    _run_stats: RunStats
 
     def __init__(self, path_to_instance_file: str, **kwargs):
-        self.run_parameters = self._get_run_parameters(**kwargs)
-        self._vrp_instance = read_vrp_instance(path_to_instance_file)
-        self._cost_evaluator = CostEvaluator(
-            self._vrp_instance.nodes, self._vrp_instance.capacity, self.run_parameters
+        run_parameters = self._get_run_parameters(**kwargs)
+        vrp_instance = read_vrp_instance(path_to_instance_file)
+        cost_evaluator = CostEvaluator(
+            vrp_instance.nodes, vrp_instance.capacity, run_parameters
         )
+        self._setup(vrp_instance, cost_evaluator, run_parameters)
+
+    @classmethod
+    def from_problem(
+        cls,
+        vrp_instance: VRPProblem,
+        cost_evaluator: Optional[CostEvaluator] = None,
+        **kwargs,
+    ) -> "KGLS":
+        # KGLS on an instance which is already in memory, e.g., a subproblem.
+        # A cost evaluator of the instance can be reused by several runs, one after another.
+        run_parameters = cls._get_run_parameters(**kwargs)
+        if cost_evaluator is None:
+            cost_evaluator = CostEvaluator(
+                vrp_instance.nodes, vrp_instance.capacity, run_parameters
+            )
+        else:
+            cost_evaluator.reset_search_state(run_parameters)
+
+        kgls = cls.__new__(cls)
+        kgls._setup(vrp_instance, cost_evaluator, run_parameters)
+        return kgls
+
+    @classmethod
+    def from_shared_problem_data(
+        cls, shared_data: SharedProblemData, **kwargs
+    ) -> "KGLS":
+        # KGLS on problem data which has been prepared by another process
+        run_parameters = cls._get_run_parameters(**kwargs)
+        vrp_instance = shared_data.get_problem()
+        cost_evaluator = CostEvaluator(
+            vrp_instance.nodes,
+            vrp_instance.capacity,
+            run_parameters,
+            shared_data=shared_data,
+        )
+
+        kgls = cls.__new__(cls)
+        kgls._setup(vrp_instance, cost_evaluator, run_parameters)
+        return kgls
+
+    def _setup(
+        self,
+        vrp_instance: VRPProblem,
+        cost_evaluator: CostEvaluator,
+        run_parameters: dict[str, Any],
+    ):
+        self.run_parameters = run_parameters
+        self._vrp_instance = vrp_instance
+        self._cost_evaluator = cost_evaluator
         self._best_solution_costs = math.inf
         self._cur_solution = None
         self._best_solution = None
         self._abortions_conditions = [IterationsWithoutImprovementCondition(100)]
+        self._elite_store: Optional[EliteStore] = None
+        self._exchange_interval: int = 0
+        self._checkpoint_writer: Optional[CheckpointWriter] = None
+        self._deadline: Optional[Deadline] = None
 
     @staticmethod
     def _get_run_parameters(**kwargs) -> dict[str, Any]:
@@ -68,22 +161,31 @@ class KGLS:
                     f"Parameter must be in {', '.join(DEFAULT_PARAMETERS.keys())}"
                 )
 
-            if key != "moves" and not isinstance(value, int):
+            if key in PARAMETER_CHOICES:
+                if value not in PARAMETER_CHOICES[key]:
+                    raise ValueError(
+                        f"Parameter '{key}' must be in "
+                        f"{', '.join(PARAMETER_CHOICES[key])}"
+                    )
+
+            elif key != "moves" and not isinstance(value, int):
                 actual_type = type(value).__name__
                 raise TypeError(
                     f"Parameter '{key}' must be of type int, got {actual_type}"
                 )
 
+            elif key in POSITIVE_PARAMETERS and value < 1:
+                raise ValueError(f"Parameter '{key}' must be at least 1")
+
             elif key == "moves":
                 if not isinstance(value, list):
                     actual_type = type(value).__name__
                     raise TypeError(
                         f"Parameter '{key}' must be of type list, got {actual_type}"
                     )
-                if any(move not in DEFAULT_PARAMETERS["moves"] for move in value):
-                    raise ValueError(
-                        f"Moves must be in {', '.join(DEFAULT_PARAMETERS['moves'])}"
-                    )
+                operators = get_registered_operators()
+                if any(move not in operators for move in value):
+                    raise ValueError(f"Moves must be in {', '.join(operators)}")
 
         # update default parameters
         params = {**DEFAULT_PARAMETERS, **kwargs}
@@ -99,33 +201,103 @@ class KGLS:
 
     def set_abortion_condition(self, condition_name: str, param: int):
         # Set the abortion condition for KGLS.
-        condition_classes = {
-            "max_iterations": MaxIterationsCondition,
-            "max_runtime": MaxRuntimeCondition,
-            "iterations_without_improvement": IterationsWithoutImprovementCondition,
-            "runtime_without_improvement": RuntimeWithoutImprovementCondition,
-        }
-        if condition_name not in condition_classes:
-            raise ValueError(
-                f"Unknown abortion condition: {condition_name}. "
-                f"Choose one of {' ,'.join(condition_classes.keys())}."
-            )
-        self._abortions_conditions = [condition_classes[condition_name](param)]
+        self._abortions_conditions = [get_abortion_condition(condition_name, param)]
 
     def add_abortion_condition(self, condition_name: str, param: int):
         # Add an abortion condition for KGLS.
-        condition_classes = {
-            "max_iterations": MaxIterationsCondition,
-            "max_runtime": MaxRuntimeCondition,
-            "iterations_without_improvement": IterationsWithoutImprovementCondition,
-            "runtime_without_improvement": RuntimeWithoutImprovementCondition,
+        self._abortions_conditions.append(get_abortion_condition(condition_name, param))
+
+    def set_elite_store(self, elite_store: EliteStore, exchange_interval: int):
+        # Cooperate with other runs, which share the same elite store
+        self._elite_store = elite_store
+        self._exchange_interval = exchange_interval
+
+    def set_checkpoint(self, path_to_file: str, interval: int):
+        # Write the search state to 'path_to_file' every 'interval' iterations
+        self._checkpoint_writer = CheckpointWriter(path_to_file, interval)
+
+    def _get_search_state(self, start_time) -> dict[str, Any]:
+        # snapshot of the mutable state needed to continue the search, without
+        # the problem and the rows of the run stats (written separately by the
+        # checkpoint writer) and without the elite store
+        return {
+            "run_parameters": self.run_parameters,
+            "abortions_conditions": self._abortions_conditions,
+            "checkpoint_interval": self._checkpoint_writer.interval,
+            "cur_solution": solution_to_node_ids(self._cur_solution),
+            "solution_stats": dict(self._cur_solution.solution_stats),
+            "best_solution": solution_to_node_ids(self._best_solution),
+            "best_solution_costs": self._best_solution_costs,
+            "iteration": self._iteration,
+            "best_iteration": self._best_iteration,
+            "run_time": time.time() - start_time,
+            "best_solution_run_time": self._best_solution_time - start_time,
+            "run_stats": self._run_stats.get_search_state(),
+            "cost_evaluator": self._cost_evaluator.get_search_state(),
         }
-        if condition_name not in condition_classes:
-            raise ValueError(
-                f"Unknown abortion condition: {condition_name}. "
-                f"Choose one of {' ,'.join(condition_classes.keys())}."
+
+    def _write_checkpoint(self, start_time):
+        if (
+            self._checkpoint_writer is not None
+            and self._iteration % self._checkpoint_writer.interval == 0
+        ):
+            self._checkpoint_writer.write(
+                self._get_search_state(start_time),
+                self._vrp_instance,
+                self._run_stats.get_rows(
+                    start=self._checkpoint_writer.num_run_stats_rows or 0
+                ),
             )
-        self._abortions_conditions.append(condition_classes[condition_name](param))
+
+    @classmethod
+    def resume(cls, path_to_checkpoint: str) -> "KGLS":
+        # Continue a run from its checkpoint, which is updated further while the run continues.
+        logging.info(f"#Resuming KGLS from checkpoint {path_to_checkpoint}")
+        state = read_checkpoint(path_to_checkpoint)
+
+        kgls = cls.from_problem(state["problem"], **state["run_parameters"])
+        kgls.set_abortions_conditions(state["abortions_conditions"])
+        # the checkpoint is continued, including its problem and run stats files
+        kgls._checkpoint_writer = CheckpointWriter(
+            path_to_checkpoint,
+            state["checkpoint_interval"],
+            state["num_run_stats_rows"],
+        )
+        kgls._cost_evaluator.set_search_state(state["cost_evaluator"])
+
+        kgls._cur_solution = solution_from_node_ids(
+            state["cur_solution"], kgls._vrp_instance
+        )
+        kgls._cur_solution.solution_stats.update(state["solution_stats"])
+        kgls._best_solution = solution_from_node_ids(
+            state["best_solution"], kgls._vrp_instance
+        )
+        kgls._best_solution_costs = state["best_solution_costs"]
+        kgls._iteration = state["iteration"]
+        kgls._best_iteration = state["best_iteration"]
+        kgls._run_stats = RunStats()
+        kgls._run_stats.set_search_state(state["run_stats"], state["run_stats_rows"])
+
+        # continue the clock where the run left off
+        start_time = time.time() - state["run_time"]
+        kgls._best_solution_time = start_time + state["best_solution_run_time"]
+        kgls._set_deadline(start_time)
+
+        for _ in kgls._search(start_time):
+            pass
+
+        return kgls
+
+    def _set_deadline(self, start_time):
+        # runtime limits and cancellations also interrupt the local search within an iteration
+        self._deadline = Deadline(
+            min(a.get_deadline(start_time) for a in self._abortions_conditions),
+            cancel_events=[
+                a.get_cancel_event()
+                for a in self._abortions_conditions
+                if a.get_cancel_event() is not None
+            ],
+        )
 
     def _update_run_stats(self, start_time):
         current_costs = self._cost_evaluator.get_solution_costs(self._cur_solution)
@@ -153,84 +325,207 @@ class KGLS:
             self._best_solution = self._cur_solution.copy()
 
         self._run_stats.append(
-            {
-                "run_time": time.time() - start_time,
-                "iteration": self._iteration,
-                "costs": current_costs,
-                "best_costs": self._best_solution_costs,
-                "best_gap": (
-                    None if self._vrp_instance.bks == float("inf") else solution_quality
-                ),
-            }
+            run_time=time.time() - start_time,
+            iteration=self._iteration,
+            costs=current_costs,
+            best_costs=self._best_solution_costs,
+            best_gap=(
+                None if self._vrp_instance.bks == float("inf") else solution_quality
+            ),
         )
 
-    def run(self, visualize_progress: bool = False, start_solution: VRPSolution = None):
+    def _adapt_neighborhood_size(self):
+        # The search starts with the smallest neighborhood for a fast descent.
+        # The neighborhood grows whenever the search stagnates for a while
+        # and shrinks again after improvements.
+        min_size = self.run_parameters["min_neighborhood_size"]
+        if min_size == 0:
+            return
+
+        max_size = self.run_parameters["neighborhood_size"]
+        growth_iterations = self.run_parameters["neighborhood_growth_iterations"]
+        step = max(1, (max_size - min_size) // 4)
+        cur_size = self._cost_evaluator.active_neighborhood_size
+        iterations_without_improvement = self._iteration - self._best_iteration
+
+        if iterations_without_improvement == 0:
+            new_size = max(min_size, cur_size - step)
+        elif iterations_without_improvement % growth_iterations == 0:
+            new_size = min(max_size, cur_size + step)
+        else:
+            return
+
+        if new_size != cur_size:
+            logging.debug(f"Changing neighborhood size to {new_size}")
+            self._cost_evaluator.set_active_neighborhood_size(new_size)
+
+    def _update_penalties(self):
+        # Decaying or resetting the penalties periodically keeps the penalty state bounded.
+        # The 'lru' policy is enforced by the cost evaluator whenever an edge is penalized.
+        policy = self.run_parameters["penalty_policy"]
+        if policy not in {"decay", "reset"}:
+            return
+
+        if self._iteration % self.run_parameters["penalty_interval"] == 0:
+            logging.debug(
+                f"Applying penalty policy '{policy}' to "
+                f"{self._cost_evaluator.num_penalized_edges} penalized edges"
+            )
+            if policy == "decay":
+                self._cost_evaluator.decay_penalties()
+            else:
+                self._cost_evaluator.reset_penalties()
+
+    def _exchange_elite_solution(self, start_time):
+        # Every 'exchange_interval' iterations, the best solution is published to the elite store.
+        # If the search stagnates for as long, it continues from a better elite solution.
+        if self._elite_store is None or self._iteration % self._exchange_interval != 0:
+            return
+
+        self._elite_store.publish(self._best_solution, self._best_solution_costs)
+
+        if self._iteration - self._best_iteration >= self._exchange_interval:
+            elite_solution = self._elite_store.get_better_solution(
+                self._best_solution_costs, self._vrp_instance
+            )
+            if elite_solution is not None:
+                logging.debug(
+                    f"Continuing from elite solution with costs {self._elite_store.costs}"
+                )
+                # keep the operator statistics, e.g., for adaptive operator scheduling
+                elite_solution.solution_stats.update(self._cur_solution.solution_stats)
+                self._cur_solution = elite_solution
+                self._update_run_stats(start_time)
+
+    def _get_best_solution_event(self, start_time) -> dict[str, Any]:
+        return {
+            "solution": self._best_solution.copy(),
+            "costs": self._best_solution_costs,
+            "gap": self.best_found_gap,
+            "run_time": time.time() - start_time,
+            "iteration": self._iteration,
+        }
+
+    def iterate(
+        self, visualize_progress: bool = False, start_solution: VRPSolution = None
+    ) -> Iterator[dict[str, Any]]:
+        # Runs KGLS and yields a snapshot of each new best solution with its costs, gap,
+        # run time and iteration. The search stops when the consumer stops iterating.
         abortion_msg = " ".join(a.msg for a in self._abortions_conditions)
         logging.info(f"#Running KGLS. {abortion_msg}")
 
         start_time = time.time()
-        self._run_stats = []
+        self._run_stats = RunStats()
         self._iteration = 0
+        if self._checkpoint_writer is not None:
+            self._checkpoint_writer.start_new_run()
 
-        # construct initial solution
+        self._set_deadline(start_time)
+
+        # the cost evaluator might have been used by a previous run
+        self._cost_evaluator.reset_search_state(self.run_parameters)
+        # construct initial solution (from the savings of the whole neighborhood)
         if start_solution is None:
-            self._cur_solution = clark_wright_route_reduction(
-                vrp_instance=self._vrp_instance, cost_evaluator=self._cost_evaluator
-            )
+            if self.run_parameters["construction"] == "savings":
+                self._cur_solution = clark_wright_route_reduction(
+                    vrp_instance=self._vrp_instance,
+                    cost_evaluator=self._cost_evaluator,
+                    seed=self.run_parameters["seed"],
+                )
+            else:
+                # e.g., for instances too large for the savings algorithm
+                self._cur_solution = giant_tour_split(
+                    vrp_instance=self._vrp_instance,
+                    tour_order=self.run_parameters["construction"].split("_")[0],
+                    seed=self.run_parameters["seed"],
+                )
         else:
             self._cur_solution = start_solution
 
+        if self.run_parameters["min_neighborhood_size"] > 0:
+            self._cost_evaluator.set_active_neighborhood_size(
+                self.run_parameters["min_neighborhood_size"]
+            )
+
         if visualize_progress:
             self._cur_solution.start_plotting()
 
         logging.info(["iteration", "time", "best_score", "gap"])
 
         self._update_run_stats(start_time)
+        yield self._get_best_solution_event(start_time)
 
         improve_solution(
             solution=self._cur_solution,
             cost_evaluator=self._cost_evaluator,
             start_search_from_routes=self._cur_solution.routes,
             run_parameters=self.run_parameters,
+            deadline=self._deadline,
         )
+        initial_costs = self._best_solution_costs
         self._update_run_stats(start_time)
+        if self._best_solution_costs < initial_costs:
+            yield self._get_best_solution_event(start_time)
+
+        yield from self._search(start_time)
+
+    def _search(self, start_time) -> Iterator[dict[str, Any]]:
+        # the main loop of KGLS, yields each new best solution
+        yielded_costs = self._best_solution_costs
+
+        try:
+            while not any(
+                a.should_abort(
+                    iteration=self._iteration,
+                    best_iteration=self._best_iteration,
+                    start_time=start_time,
+                    best_sol_time=self._best_solution_time,
+                )
+                for a in self._abortions_conditions
+            ):
+                self._iteration += 1
+
+                changed_routes = perturbate_solution(
+                    solution=self._cur_solution,
+                    cost_evaluator=self._cost_evaluator,
+                    run_parameters=self.run_parameters,
+                    deadline=self._deadline,
+                )
+                improve_solution(
+                    solution=self._cur_solution,
+                    cost_evaluator=self._cost_evaluator,
+                    start_search_from_routes=changed_routes,
+                    run_parameters=self.run_parameters,
+                    deadline=self._deadline,
+                )
 
-        while not any(
-            a.should_abort(
-                iteration=self._iteration,
-                best_iteration=self._best_iteration,
-                start_time=start_time,
-                best_sol_time=self._best_solution_time,
-            )
-            for a in self._abortions_conditions
-        ):
-            self._iteration += 1
-
-            changed_routes = perturbate_solution(
-                solution=self._cur_solution,
-                cost_evaluator=self._cost_evaluator,
-                run_parameters=self.run_parameters,
-            )
-            improve_solution(
-                solution=self._cur_solution,
-                cost_evaluator=self._cost_evaluator,
-                start_search_from_routes=changed_routes,
-                run_parameters=self.run_parameters,
-            )
+                self._update_run_stats(start_time)
+                self._adapt_neighborhood_size()
+                self._update_penalties()
+                self._exchange_elite_solution(start_time)
+                self._write_checkpoint(start_time)
 
-            self._update_run_stats(start_time)
+                if self._best_solution_costs < yielded_costs:
+                    yielded_costs = self._best_solution_costs
+                    yield self._get_best_solution_event(start_time)
+        finally:
+            self._run_stats.flush()
+            if self._checkpoint_writer is not None:
+                self._checkpoint_writer.wait()
 
         logging.info(
             f"#KGLS finished after {(time.time() - start_time): 1f} seconds and "
             f"{self._iteration} iterations."
         )
 
+    def run(self, visualize_progress: bool = False, start_solution: VRPSolution = None):
+        for _ in self.iterate(
+            visualize_progress=visualize_progress, start_solution=start_solution
+        ):
+            pass
+
     def print_time_distribution(self):
-        time_entries = {
-            k.replace("time_", ""): v
-            for k, v in self._cur_solution.solution_stats.items()
-            if k.startswith("time_")
-        }
+        time_entries = self.operator_run_times
 
         # Print table header
         print(f"{'Move':<20}{'Time Percentage':<15}")
@@ -264,9 +559,26 @@ class KGLS:
         else:
             return None
 
+    @property
+    def operator_run_times(self) -> dict[str, float]:
+        # run time of each local search operator in seconds
+        return {
+            k.replace("time_", ""): v
+            for k, v in self._cur_solution.solution_stats.items()
+            if k.startswith("time_")
+        }
+
+    @property
+    def iterations(self) -> int:
+        return self._iteration
+
+    @property
+    def run_stats(self) -> RunStats:
+        return self._run_stats
+
     @property
     def total_runtime(self):
-        return self._run_stats[-1]["run_time"]
+        return self._run_stats.last_run_time
 
     def _load_solution(self, path_to_file: str) -> VRPSolution:
         if self._cur_solution is not None:
@@ -1,3 +1,11 @@
 from .search import improve_solution, perturbate_solution
+from .deadline import Deadline
+from .operator_registry import register_operator, get_registered_operators
 
-__all__ = ["improve_solution", "perturbate_solution"]
+__all__ = [
+    "improve_solution",
+    "perturbate_solution",
+    "Deadline",
+    "register_operator",
+    "get_registered_operators",
+]
@@ -0,0 +1,45 @@
+import math
+import time
+from typing import Any, Sequence
+
+
+class Deadline:
+    """
+    Point in time at which the local search stops, even in the middle of an iteration.
+    The clock is only read every 'check_interval' calls of 'expired', such that the
+    search can check the deadline in its inner loops at low overhead.
+    The deadline also expires as soon as one of the 'cancel_events' (e.g., threading or
+    multiprocessing Events) is set. Since reading an event of another process is much
+    slower than reading the clock, they are checked at most every 'event_check_seconds'.
+    Once the deadline has passed, it stays expired.
+    """
+
+    def __init__(
+        self,
+        end_time: float = math.inf,
+        check_interval: int = 16,
+        cancel_events: Sequence[Any] = (),
+        event_check_seconds: float = 0.01,
+    ):
+        self.end_time = end_time
+        self.check_interval = check_interval
+        self.cancel_events = cancel_events
+        self.event_check_seconds = event_check_seconds
+        self._num_checks: int = 0
+        self._next_event_check: float = 0
+        self._expired: bool = False
+
+    def expired(self) -> bool:
+        if self._expired:
+            return True
+
+        self._num_checks += 1
+        if self._num_checks >= self.check_interval:
+            self._num_checks = 0
+            now = time.time()
+            self._expired = now >= self.end_time
+            if self.cancel_events and now >= self._next_event_check:
+                self._next_event_check = now + self.event_check_seconds
+                self._expired |= any(event.is_set() for event in self.cancel_events)
+
+        return self._expired
@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 
 from kgls.datastructure import Node, Route, VRPSolution, CostEvaluator
 from .local_search_move import LocalSearchMove
@@ -40,100 +41,198 @@ class SegmentMove(LocalSearchMove):
         solution.insert_nodes_after(self.segment, self.move_after, self.to_route)
 
 
-def search_3_opt_moves_from(
+def get_first_edge_candidates(
     solution: VRPSolution,
     cost_evaluator: CostEvaluator,
-    start_node: Node,
+    start_nodes: list[Node],
     segment_directions: list[int] = [0, 1],
     insert_directions: list[int] = [0, 1],
-) -> list[SegmentMove]:
-    candidate_moves: list[SegmentMove] = []
-    from_route = solution.route_of(start_node)
+) -> list[tuple[Node, int, int, Node, Node, Route, int]]:
+    """
+    Evaluates the first edge change of all segment moves from all 'start_nodes' at once:
+    the edge between a start node and its predecessor is removed, and the start node
+    is connected to a neighbour in another route (breaking up an edge of that route).
+    The costs of each neighbourhood slot are gathered once from the cost rows and shared
+    between both segment directions.
+    Returns the candidates with a positive improvement as tuples of (start_node,
+    segment_direction, insert_direction, insert_next_to, insert_next_to_2, to_route,
+    improvement), in the order in which a sequential search would find them.
+    """
+    candidates = []
+    skipped_route_pairs = 0
 
-    for segment_direction in segment_directions:
-        for insert_direction in insert_directions:
-            # segment_1_prev = start_node.get_neighbour(1 - segment_direction)
-            segment_1_prev = solution.neighbour(start_node, 1 - segment_direction)
-
-            for insert_next_to in cost_evaluator.get_neighborhood(start_node):
-                to_route = solution.route_of(insert_next_to)
-
-                if to_route != from_route:
-                    # compute improvement of first edge change
-                    # insert_next_to_2 = insert_next_to.get_neighbour(insert_direction)
-                    insert_next_to_2 = solution.neighbour(
-                        insert_next_to, insert_direction
+    for start_node in start_nodes:
+        from_route = solution.route_of(start_node)
+        costs_from_start = cost_evaluator.get_costs_from(start_node)
+
+        # segment_1_prev = start_node.get_neighbour(1 - segment_direction)
+        segment_1_prev = {
+            segment_direction: solution.neighbour(start_node, 1 - segment_direction)
+            for segment_direction in segment_directions
+        }
+        removal_gain = {
+            segment_direction: costs_from_start[prev_node.node_id]
+            for segment_direction, prev_node in segment_1_prev.items()
+        }
+        max_removal_gain = max(removal_gain.values())
+
+        # neighbours in other routes which are geometrically able to yield an improvement
+        promising_routes: dict[int, bool] = dict()
+        neighbours = []
+        for insert_next_to, added_costs in cost_evaluator.get_neighborhood_with_costs(
+            start_node
+        ):
+            to_route = solution.route_of(insert_next_to)
+            if to_route != from_route:
+                if to_route.route_index not in promising_routes:
+                    is_promising = cost_evaluator.may_improve_route(
+                        start_node, max_removal_gain, to_route, insert_next_to
                     )
+                    promising_routes[to_route.route_index] = is_promising
+                    skipped_route_pairs += not is_promising
+                if promising_routes[to_route.route_index]:
+                    neighbours.append((insert_next_to, to_route, added_costs))
 
+        # edge which is broken up when inserting next to each neighbour
+        broken_edges = dict()
+        for insert_direction in insert_directions:
+            broken_edges[insert_direction] = []
+            for insert_next_to, _, _ in neighbours:
+                # insert_next_to_2 = insert_next_to.get_neighbour(insert_direction)
+                insert_next_to_2 = solution.neighbour(insert_next_to, insert_direction)
+                broken_edges[insert_direction].append(
+                    (
+                        insert_next_to_2,
+                        cost_evaluator.get_costs_from(insert_next_to)[
+                            insert_next_to_2.node_id
+                        ],
+                    )
+                )
+
+        for segment_direction in segment_directions:
+            for insert_direction in insert_directions:
+                for (insert_next_to, to_route, added_costs), (
+                    insert_next_to_2,
+                    removed_costs,
+                ) in zip(neighbours, broken_edges[insert_direction]):
                     move_start_improvement = (
-                        cost_evaluator.get_distance(start_node, segment_1_prev)
-                        + cost_evaluator.get_distance(insert_next_to, insert_next_to_2)
-                        - cost_evaluator.get_distance(insert_next_to, start_node)
+                        removal_gain[segment_direction] + removed_costs - added_costs
                     )
-
                     if move_start_improvement > 0:
-                        segment_end = start_node
-                        segment_list = [segment_end]
-                        route_2_new_volume = to_route.volume + segment_end.demand
-
-                        while not segment_end.is_depot and cost_evaluator.is_feasible(
-                            route_2_new_volume
-                        ):
-                            # segment_disconnect_2 = segment_end.get_neighbour(segment_direction)
-                            segment_disconnect_2 = solution.neighbour(
-                                segment_end, segment_direction
+                        candidates.append(
+                            (
+                                start_node,
+                                segment_direction,
+                                insert_direction,
+                                insert_next_to,
+                                insert_next_to_2,
+                                to_route,
+                                move_start_improvement,
                             )
+                        )
 
-                            move_end_improvement = (
-                                cost_evaluator.get_distance(
-                                    segment_end, segment_disconnect_2
-                                )
-                                - cost_evaluator.get_distance(
-                                    segment_1_prev, segment_disconnect_2
-                                )
-                                - cost_evaluator.get_distance(
-                                    segment_end, insert_next_to_2
-                                )
-                            )
+    solution.solution_stats["skipped_route_pairs_segment_move"] += skipped_route_pairs
 
-                            improvement = move_start_improvement + move_end_improvement
-                            if improvement > 0:
-                                # store move
-                                if insert_direction == 1:
-                                    insert_after = insert_next_to
-                                else:
-                                    insert_after = insert_next_to_2
-
-                                candidate_moves.append(
-                                    SegmentMove(
-                                        segment=segment_list.copy(),
-                                        from_route=from_route,
-                                        to_route=to_route,
-                                        move_after=insert_after,
-                                        improvement=improvement,
-                                    )
-                                )
-
-                            # extend
-                            segment_end = segment_disconnect_2
-                            if insert_direction == 1:
-                                segment_list.append(segment_end)
-                            else:
-                                segment_list.insert(0, segment_end)
-                            route_2_new_volume += segment_end.demand
+    return candidates
+
+
+def extend_segment_moves(
+    solution: VRPSolution,
+    cost_evaluator: CostEvaluator,
+    candidates: list[tuple[Node, int, int, Node, Node, Route, int]],
+) -> list[SegmentMove]:
+    # extend the segment of each candidate as long as the capacity of 'to_route' allows
+    candidate_moves: list[SegmentMove] = []
+
+    for (
+        start_node,
+        segment_direction,
+        insert_direction,
+        insert_next_to,
+        insert_next_to_2,
+        to_route,
+        move_start_improvement,
+    ) in candidates:
+        from_route = solution.route_of(start_node)
+        segment_1_prev = solution.neighbour(start_node, 1 - segment_direction)
+
+        segment_end = start_node
+        segment_list = [segment_end]
+        route_2_new_volume = to_route.volume + segment_end.demand
+
+        while not segment_end.is_depot and cost_evaluator.is_feasible(
+            route_2_new_volume
+        ):
+            # segment_disconnect_2 = segment_end.get_neighbour(segment_direction)
+            segment_disconnect_2 = solution.neighbour(segment_end, segment_direction)
+
+            move_end_improvement = (
+                cost_evaluator.get_distance(segment_end, segment_disconnect_2)
+                - cost_evaluator.get_distance(segment_1_prev, segment_disconnect_2)
+                - cost_evaluator.get_distance(segment_end, insert_next_to_2)
+            )
+
+            improvement = move_start_improvement + move_end_improvement
+            if improvement > 0:
+                # store move
+                if insert_direction == 1:
+                    insert_after = insert_next_to
+                else:
+                    insert_after = insert_next_to_2
+
+                candidate_moves.append(
+                    SegmentMove(
+                        segment=segment_list.copy(),
+                        from_route=from_route,
+                        to_route=to_route,
+                        move_after=insert_after,
+                        improvement=improvement,
+                    )
+                )
+
+            # extend
+            segment_end = segment_disconnect_2
+            if insert_direction == 1:
+                segment_list.append(segment_end)
+            else:
+                segment_list.insert(0, segment_end)
+            route_2_new_volume += segment_end.demand
 
     return candidate_moves
 
 
+def search_3_opt_moves_from(
+    solution: VRPSolution,
+    cost_evaluator: CostEvaluator,
+    start_node: Node,
+    segment_directions: list[int] = [0, 1],
+    insert_directions: list[int] = [0, 1],
+) -> list[SegmentMove]:
+    # only moves with an improving first edge change are extended
+    candidates = get_first_edge_candidates(
+        solution, cost_evaluator, [start_node], segment_directions, insert_directions
+    )
+    return extend_segment_moves(solution, cost_evaluator, candidates)
+
+
 def search_3_opt_moves(
     solution: VRPSolution,
     cost_evaluator: CostEvaluator,
     start_nodes: list[Node],
+    max_moves: Optional[int] = None,
 ) -> list[SegmentMove]:
-    candidate_moves = []
-    for start_node in start_nodes:
-        candidate_moves.extend(
-            search_3_opt_moves_from(solution, cost_evaluator, start_node)
-        )
+    if max_moves is None:
+        candidates = get_first_edge_candidates(solution, cost_evaluator, start_nodes)
+        candidate_moves = extend_segment_moves(solution, cost_evaluator, candidates)
+
+    else:
+        # stop scanning as soon as enough improving moves were found
+        candidate_moves = []
+        for start_node in start_nodes:
+            candidate_moves.extend(
+                search_3_opt_moves_from(solution, cost_evaluator, start_node)
+            )
+            if len(candidate_moves) >= max_moves:
+                break
 
     return sorted(candidate_moves)
@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 
 from kgls.datastructure import Node, Route, VRPSolution, CostEvaluator
 from .local_search_move import LocalSearchMove
@@ -66,23 +67,39 @@ def search_cross_exchanges_from(
     # with a segment from another route, starting from a neighborhood node of 'start_node'
     route1: Route = solution.route_of(start_node)
     candidate_moves: list[CrossExchange] = []
+    skipped_route_pairs = 0
 
     for segment1_direction in segment1_directions:
+        route1_segment_connection_start = solution.neighbour(
+            start_node, 1 - segment1_direction
+        )
+        # if segment1_direction == 1:
+        # route1_segment_connection_start = start_node.prev
+        # else:
+        # route1_segment_connection_start = start_node.next
+        removal_gain = cost_evaluator.get_distance(
+            start_node, route1_segment_connection_start
+        )
+        # whether the geometry of a route (by route index) allows an improving exchange with it
+        promising_routes: dict[int, bool] = dict()
+
         for segment2_direction in segment2_directions:
-            route1_segment_connection_start = solution.neighbour(
-                start_node, 1 - segment1_direction
-            )
-            # if segment1_direction == 1:
-            # route1_segment_connection_start = start_node.prev
-            # else:
-            # route1_segment_connection_start = start_node.next
-
-            for route2_segment_connection_start in cost_evaluator.get_neighborhood(
-                start_node
-            ):
+            for (
+                route2_segment_connection_start,
+                added_costs,
+            ) in cost_evaluator.get_neighborhood_with_costs(start_node):
                 route2 = solution.route_of(route2_segment_connection_start)
 
                 if route2 != route1:
+                    if route2.route_index not in promising_routes:
+                        is_promising = cost_evaluator.may_improve_route(
+                            start_node, removal_gain, route2, route2_segment_connection_start
+                        )
+                        promising_routes[route2.route_index] = is_promising
+                        skipped_route_pairs += not is_promising
+                    if not promising_routes[route2.route_index]:
+                        continue
+
                     # compute improvement of first cross
                     # TODO can go both directions
                     # segment2_start = route2_segment_connection_start.get_neighbour(segment2_direction)
@@ -100,9 +117,7 @@ def search_cross_exchanges_from(
                         + cost_evaluator.get_distance(
                             segment2_start, route2_segment_connection_start
                         )
-                        - cost_evaluator.get_distance(
-                            start_node, route2_segment_connection_start
-                        )
+                        - added_costs
                         - cost_evaluator.get_distance(
                             segment2_start, route1_segment_connection_start
                         )
@@ -211,6 +226,8 @@ def search_cross_exchanges_from(
 
                             segment1_volume += segment1_end.demand
 
+    solution.solution_stats["skipped_route_pairs_cross_exchange"] += skipped_route_pairs
+
     return candidate_moves
 
 
@@ -218,11 +235,15 @@ def search_cross_exchanges(
     solution: VRPSolution,
     cost_evaluator: CostEvaluator,
     start_nodes: list[Node],
+    max_moves: Optional[int] = None,
 ) -> list[CrossExchange]:
     candidate_moves = []
     for start_node in start_nodes:
         candidate_moves.extend(
             search_cross_exchanges_from(solution, cost_evaluator, start_node)
         )
+        # stop scanning as soon as enough improving moves were found
+        if max_moves is not None and len(candidate_moves) >= max_moves:
+            break
 
     return sorted(candidate_moves)
@@ -2,7 +2,10 @@ from collections import defaultdict, deque
 import logging
 import math
 
+from typing import Optional
+
 from kgls.datastructure import Node, Route, VRPSolution, CostEvaluator
+from .deadline import Deadline
 from .local_search_move import LocalSearchMove
 
 
@@ -271,7 +274,11 @@ def get_current_neighbors(
 
 
 def run_lin_kernighan_heuristic(
-    solution: VRPSolution, cost_evaluator: CostEvaluator, route: Route, max_depth: int
+    solution: VRPSolution,
+    cost_evaluator: CostEvaluator,
+    route: Route,
+    max_depth: int,
+    deadline: Optional[Deadline] = None,
 ) -> None:
     move_found: bool = True
 
@@ -292,6 +299,9 @@ def run_lin_kernighan_heuristic(
             reverse=True,
         )
         for edge in edges:
+            if deadline is not None and deadline.expired():
+                return
+
             valid_moves: list[NOptMove] = []
 
             for start_node_index in [0, 1]:
@@ -0,0 +1,57 @@
+from typing import Any, Callable, Optional
+
+from .operator_relocation_chain import search_relocation_chains
+from .operator_3_opt import search_3_opt_moves
+from .operator_cross_exchange import search_cross_exchanges
+
+# An operator searches improving moves starting from the given nodes:
+# operator(solution=..., cost_evaluator=..., start_nodes=..., max_moves=..., **parameters)
+# and returns the found moves (LocalSearchMove), sorted by improvement.
+_operators: dict[str, Callable[..., list]] = dict()
+# Extracts the parameters of an operator from the run parameters
+_operator_parameters: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = dict()
+
+
+def register_operator(
+    name: str,
+    search_function: Callable[..., list],
+    get_parameters: Optional[Callable[[dict[str, Any]], dict[str, Any]]] = None,
+) -> None:
+    """
+    Register a local search operator, which can then be used in the run parameter 'moves'.
+
+    Args:
+        name (str): Name of the operator, as used in 'moves'.
+        search_function (Callable): Function searching improving moves, called with the
+            keyword arguments solution, cost_evaluator, start_nodes and max_moves
+            (and the operator parameters).
+        get_parameters (Callable): Maps the run parameters to additional keyword
+            arguments of 'search_function'. If None, no additional arguments are passed.
+    """
+    _operators[name] = search_function
+    _operator_parameters[name] = get_parameters or (lambda run_parameters: dict())
+
+
+def get_operator(name: str) -> Callable[..., list]:
+    if name not in _operators:
+        raise ValueError(f"Operator '{name}' is not defined")
+    return _operators[name]
+
+
+def get_operator_parameters(
+    name: str, run_parameters: dict[str, Any]
+) -> dict[str, Any]:
+    return _operator_parameters[name](run_parameters)
+
+
+def get_registered_operators() -> list[str]:
+    return list(_operators.keys())
+
+
+register_operator(
+    "relocation_chain",
+    search_relocation_chains,
+    lambda run_parameters: {"max_depth": run_parameters["depth_relocation_chain"]},
+)
+register_operator("segment_move", search_3_opt_moves)
+register_operator("cross_exchange", search_cross_exchanges)
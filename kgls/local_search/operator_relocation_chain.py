@@ -118,56 +118,69 @@ class RelocationChain(LocalSearchMove):
             )
 
 
-def insert_node(
+def find_insertions(
     node_to_move: Node,
     removal_gain: float,
-    insert_next_to: Node,
+    insert_next_to_candidates: list[tuple[Node, int]],
     cur_chain: RelocationChain,
     solution: VRPSolution,
     cost_evaluator: CostEvaluator,
-):
-    # TODO check insertion before and after
-    # insertion_cost = cost_evaluator.insertion_costs[node_to_move, insert_next_to]
-    # insert_after = cost_evaluator.insertion_after[node_to_move, insert_next_to]
-    predecessor = solution.prev(insert_next_to)
-    successor = solution.next(insert_next_to)
-    insertion_cost_before = (
-        cost_evaluator.get_distance(node_to_move, predecessor)
-        + cost_evaluator.get_distance(node_to_move, insert_next_to)
-        - cost_evaluator.get_distance(predecessor, insert_next_to)
-    )
-    insertion_cost_after = (
-        cost_evaluator.get_distance(node_to_move, successor)
-        + cost_evaluator.get_distance(node_to_move, insert_next_to)
-        - cost_evaluator.get_distance(successor, insert_next_to)
-    )
-    if insertion_cost_before <= insertion_cost_after:
-        insertion_cost = insertion_cost_before
-        insert_after = predecessor
-        insert_before = insert_next_to
-    else:
-        insertion_cost = insertion_cost_after
-        insert_after = insert_next_to
-        insert_before = successor
-
-    cost_change = removal_gain - insertion_cost
-
-    if cur_chain.improvement + cost_change > 0:
+) -> list[Relocation]:
+    # insertion costs next to all candidates are evaluated in one batch,
+    # only insertions which keep the chain improving are turned into relocations
+    costs_from_node = cost_evaluator.get_costs_from(node_to_move)
+    improving_insertions = []
+
+    for insert_next_to, added_costs in insert_next_to_candidates:
+        predecessor = solution.prev(insert_next_to)
+        successor = solution.next(insert_next_to)
+        costs_from_insert_next_to = cost_evaluator.get_costs_from(insert_next_to)
+        insertion_cost_before = (
+            costs_from_node[predecessor.node_id]
+            + added_costs
+            - costs_from_insert_next_to[predecessor.node_id]
+        )
+        insertion_cost_after = (
+            costs_from_node[successor.node_id]
+            + added_costs
+            - costs_from_insert_next_to[successor.node_id]
+        )
+        if insertion_cost_before <= insertion_cost_after:
+            cost_change = removal_gain - insertion_cost_before
+            insert_after = predecessor
+            insert_before = insert_next_to
+        else:
+            cost_change = removal_gain - insertion_cost_after
+            insert_after = insert_next_to
+            insert_before = successor
+
+        if cur_chain.improvement + cost_change > 0:
+            improving_insertions.append(
+                (insert_next_to, insert_after, insert_before, cost_change)
+            )
+
+    relocations = []
+    for (
+        insert_next_to,
+        insert_after,
+        insert_before,
+        cost_change,
+    ) in improving_insertions:
         if cur_chain.can_insert_between(insert_after, insert_before):
-            route = solution.route_of(insert_next_to)
-
-            return Relocation(
-                node_to_move=node_to_move,
-                cur_prev=solution.prev(node_to_move),
-                cur_next=solution.next(node_to_move),
-                move_from_route=solution.route_of(node_to_move),
-                move_to_route=route,
-                move_after=insert_after,
-                move_before=insert_before,
-                improvement=cost_change,
+            relocations.append(
+                Relocation(
+                    node_to_move=node_to_move,
+                    cur_prev=solution.prev(node_to_move),
+                    cur_next=solution.next(node_to_move),
+                    move_from_route=solution.route_of(node_to_move),
+                    move_to_route=solution.route_of(insert_next_to),
+                    move_after=insert_after,
+                    move_before=insert_before,
+                    improvement=cost_change,
+                )
             )
 
-    return None
+    return relocations
 
 
 def search_relocation_chains_from(
@@ -200,21 +213,40 @@ def search_relocation_chains_from(
     # Step 2: For each candidate neighbour of 'node_to_move',
     # check whether a relocation next to it would improve the solution
     from_route = solution.route_of(node_to_move)
-    candidate_insertions = defaultdict(list)
-    for neighbour in cost_evaluator.get_neighborhood(node_to_move):
+    # whether the geometry of a route (by route index) allows an improving insertion into it
+    promising_routes: dict[int, bool] = dict()
+    insert_next_to_candidates = []
+    for neighbour, added_costs in cost_evaluator.get_neighborhood_with_costs(
+        node_to_move
+    ):
         to_route = solution.route_of(neighbour)
 
         if to_route != from_route and neighbour not in cur_chain.relocated_nodes:
-            insertion = insert_node(
-                node_to_move=node_to_move,
-                removal_gain=removal_improvement,
-                insert_next_to=neighbour,
-                cur_chain=cur_chain,
-                solution=solution,
-                cost_evaluator=cost_evaluator,
-            )
-            if insertion:
-                candidate_insertions[to_route].append(insertion)
+            if to_route.route_index not in promising_routes:
+                is_promising = cost_evaluator.may_improve_route(
+                    node_to_move,
+                    cur_chain.improvement + removal_improvement,
+                    to_route,
+                    neighbour,
+                )
+                promising_routes[to_route.route_index] = is_promising
+                if not is_promising:
+                    solution.solution_stats["skipped_route_pairs_relocation_chain"] += 1
+            if not promising_routes[to_route.route_index]:
+                continue
+
+            insert_next_to_candidates.append((neighbour, added_costs))
+
+    candidate_insertions = defaultdict(list)
+    for insertion in find_insertions(
+        node_to_move=node_to_move,
+        removal_gain=removal_improvement,
+        insert_next_to_candidates=insert_next_to_candidates,
+        cur_chain=cur_chain,
+        solution=solution,
+        cost_evaluator=cost_evaluator,
+    ):
+        candidate_insertions[insertion.move_to_route].append(insertion)
 
     # TODO this can also be pre-processed
     for destination_route, insertions in candidate_insertions.items():
@@ -252,6 +284,7 @@ def search_relocation_chains(
     cost_evaluator: CostEvaluator,
     start_nodes: list[Node],
     max_depth: int,
+    max_moves: Optional[int] = None,
 ) -> list[RelocationChain]:
     found_moves = []
     for start_node in start_nodes:
@@ -262,4 +295,7 @@ def search_relocation_chains(
             node_to_move=start_node,
             max_depth=max_depth,
         )
+        # stop scanning as soon as enough improving moves were found
+        if max_moves is not None and len(found_moves) >= max_moves:
+            break
     return sorted(found_moves)
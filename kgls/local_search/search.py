@@ -1,16 +1,14 @@
 import math
 import time
 import logging
-from typing import Any
+from typing import Any, Optional
 
-from .operator_relocation_chain import search_relocation_chains
+from .deadline import Deadline
 from .operator_linkernighan import run_lin_kernighan_heuristic
-from .operator_3_opt import search_3_opt_moves
-from .operator_cross_exchange import search_cross_exchanges
+from .operator_registry import get_operator, get_operator_parameters
 from kgls.datastructure import Node, Route, VRPSolution, CostEvaluator
 from kgls.local_search.local_search_move import LocalSearchMove
 
-# TODO best or first improving move
 # TODO execute operator until no better solution found?
 
 
@@ -19,6 +17,7 @@ def improve_route(
     solution: VRPSolution,
     cost_evaluator: CostEvaluator,
     run_parameters: dict[str, Any],
+    deadline: Optional[Deadline] = None,
 ) -> None:
     start = time.time()
 
@@ -28,6 +27,7 @@ def improve_route(
             cost_evaluator=cost_evaluator,
             route=route,
             max_depth=run_parameters["depth_lin_kernighan"],
+            deadline=deadline,
         )
     end = time.time()
     solution.solution_stats["time_lin_kernighan"] += end - start
@@ -48,6 +48,16 @@ def get_disjunct_moves(moves: list[LocalSearchMove]) -> list:
     return disjunct_moves
 
 
+def get_max_moves(run_parameters: dict[str, Any]) -> Optional[int]:
+    # number of improving moves after which an operator stops scanning (None: scan all)
+    acceptance = run_parameters.get("acceptance", "best")
+    if acceptance == "first":
+        return 1
+    elif acceptance == "best_of_first_k":
+        return run_parameters["first_k"]
+    return None
+
+
 def find_best_improving_moves(
     solution: VRPSolution,
     cost_evaluator: CostEvaluator,
@@ -55,32 +65,25 @@ def find_best_improving_moves(
     intra_route_opt: bool,
     operator_name: str,
     run_parameters: dict[str, Any],
+    deadline: Optional[Deadline] = None,
 ) -> tuple[int, set[Route]]:
-    operators = {
-        "relocation_chain": search_relocation_chains,
-        "segment_move": search_3_opt_moves,
-        "cross_exchange": search_cross_exchanges,
-    }
-    operator_parameters = {
-        "relocation_chain": {"max_depth": run_parameters["depth_relocation_chain"]},
-        "segment_move": dict(),
-        "cross_exchange": dict(),
-    }
-
-    if operator_name not in operators:
-        raise ValueError(f"Operator '{operator_name}' is not defined")
+    operator = get_operator(operator_name)
+    operator_parameters = get_operator_parameters(operator_name, run_parameters)
+    max_moves = get_max_moves(run_parameters)
 
     start = time.time()
 
-    candidate_moves: list[LocalSearchMove] = operators[operator_name](
+    candidate_moves: list[LocalSearchMove] = operator(
         solution=solution,
         cost_evaluator=cost_evaluator,
         start_nodes=start_nodes,
-        **operator_parameters[operator_name],
+        max_moves=max_moves,
+        **operator_parameters,
     )
 
     end = time.time()
     solution.solution_stats[f"time_{operator_name}"] += end - start
+    solution.solution_stats[f"calls_{operator_name}"] += 1
 
     if candidate_moves:
         # find all disjunct moves, sorted by steepest descent
@@ -90,6 +93,7 @@ def find_best_improving_moves(
         )
         changed_routes = set()
         disjunct_moves = get_disjunct_moves(candidate_moves)
+        solution.solution_stats[f"idle_calls_{operator_name}"] = 0
 
         # execute the moves
         for move in disjunct_moves:
@@ -98,6 +102,7 @@ def find_best_improving_moves(
 
             move.execute(solution)
             solution.solution_stats[f"move_count_{operator_name}"] += 1
+            solution.solution_stats[f"improvement_{operator_name}"] += move.improvement
             solution.plot(cost_evaluator.get_solution_costs(solution, True))
 
             # validate changes in solution
@@ -112,25 +117,72 @@ def find_best_improving_moves(
         # optimize all changed routes
         if intra_route_opt:
             for route in changed_routes:
-                improve_route(route, solution, cost_evaluator, run_parameters)
+                improve_route(
+                    route, solution, cost_evaluator, run_parameters, deadline
+                )
 
         return len(disjunct_moves), changed_routes
 
     else:
+        solution.solution_stats[f"idle_calls_{operator_name}"] += 1
         return 0, set()
 
 
+def schedule_operators(
+    solution: VRPSolution, run_parameters: dict[str, Any], skip_idle: bool = True
+) -> list[str]:
+    """
+    Determine which operators to run in which order.
+    With 'fixed' scheduling, all operators in 'moves' are run in the given order.
+    With 'adaptive' scheduling, operators are ranked by their improvement per second
+    so far, and operators which did not find an improving move in the last
+    'scheduling_patience' calls are only retried every 'scheduling_patience' calls
+    (unless 'skip_idle' is False).
+    """
+    moves = run_parameters["moves"]
+    if run_parameters.get("operator_scheduling", "fixed") == "fixed":
+        return moves
+
+    stats = solution.solution_stats
+    patience = run_parameters["scheduling_patience"]
+    scheduled_moves = []
+    for move_type in moves:
+        idle_calls = stats[f"idle_calls_{move_type}"]
+        if skip_idle and idle_calls >= patience and idle_calls % patience != 0:
+            # count skipped calls as idle, such that the operator is eventually retried
+            stats[f"idle_calls_{move_type}"] += 1
+            stats[f"skipped_calls_{move_type}"] += 1
+        else:
+            scheduled_moves.append(move_type)
+
+    def improvement_per_second(move_type: str) -> float:
+        run_time = stats[f"time_{move_type}"]
+        if run_time == 0:
+            # not measured yet
+            return math.inf
+        return stats[f"improvement_{move_type}"] / run_time
+
+    return sorted(scheduled_moves, key=improvement_per_second, reverse=True)
+
+
 def local_search(
     solution: VRPSolution,
     cost_evaluator: CostEvaluator,
     start_from_nodes: set[Node],
     intra_route_opt: bool,
     run_parameters: dict[str, Any],
+    deadline: Optional[Deadline] = None,
+    skip_idle_operators: bool = True,
 ) -> tuple[int, set[Route]]:
     num_executed_moves = 0
     all_changed_routes = set()
 
-    for move_type in run_parameters["moves"]:
+    for move_type in schedule_operators(
+        solution, run_parameters, skip_idle_operators
+    ):
+        if deadline is not None and deadline.expired():
+            break
+
         found_moves, changed_routes = find_best_improving_moves(
             solution=solution,
             cost_evaluator=cost_evaluator,
@@ -138,6 +190,7 @@ def local_search(
             intra_route_opt=intra_route_opt,
             operator_name=move_type,
             run_parameters=run_parameters,
+            deadline=deadline,
         )
         num_executed_moves += found_moves
         all_changed_routes = all_changed_routes | changed_routes
@@ -150,10 +203,14 @@ def improve_solution(
     cost_evaluator: CostEvaluator,
     start_search_from_routes: set[Route],
     run_parameters: dict[str, Any],
+    deadline: Optional[Deadline] = None,
 ) -> None:
+    # With a deadline, the search stops early once it has passed.
+    # The solution is then still valid, since moves are never interrupted.
+
     # intra-route optimization of routes
     for route in start_search_from_routes:
-        improve_route(route, solution, cost_evaluator, run_parameters)
+        improve_route(route, solution, cost_evaluator, run_parameters, deadline)
 
     # inter-route optimization, starting from all routes in 'start_search_from_routes'
     start_from_nodes = set()
@@ -161,21 +218,44 @@ def improve_solution(
         start_from_nodes.update(route.customers)
     changes_found = True
 
+    def get_skipped_calls() -> int:
+        # number of operator calls skipped by adaptive scheduling so far
+        stats = solution.solution_stats
+        return sum(
+            stats[f"skipped_calls_{move_type}"] for move_type in run_parameters["moves"]
+        )
+
     while changes_found:
+        skipped_calls = get_skipped_calls()
         executed_moves, _ = local_search(
             solution=solution,
             cost_evaluator=cost_evaluator,
             start_from_nodes=start_from_nodes,
             intra_route_opt=True,
             run_parameters=run_parameters,
+            deadline=deadline,
+        )
+        if executed_moves == 0 and get_skipped_calls() > skipped_calls:
+            # confirm the local optimum with all operators, including skipped idle ones
+            executed_moves, _ = local_search(
+                solution=solution,
+                cost_evaluator=cost_evaluator,
+                start_from_nodes=start_from_nodes,
+                intra_route_opt=True,
+                run_parameters=run_parameters,
+                deadline=deadline,
+                skip_idle_operators=False,
+            )
+        changes_found = executed_moves > 0 and not (
+            deadline is not None and deadline.expired()
         )
-        changes_found = executed_moves > 0
 
 
 def perturbate_solution(
     solution: VRPSolution,
     cost_evaluator: CostEvaluator,
     run_parameters: dict[str, Any],
+    deadline: Optional[Deadline] = None,
 ) -> set[Route]:
     logging.debug("Starting perturbation of solution")
 
@@ -187,14 +267,23 @@ def perturbate_solution(
     changed_routes_perturbation = set()
 
     while applied_changes < run_parameters["num_perturbations"]:
-        worst_edge = cost_evaluator.get_and_penalize_worst_edge()
-        logging.debug(
-            f"Penalizing edge({worst_edge.get_first_node()} - {worst_edge.get_second_node()})"
-        )
-        start_from_nodes = [node for node in worst_edge.nodes if not node.is_depot]
+        if deadline is not None and deadline.expired():
+            break
+
+        # penalize the 'perturbation_batch_size' worst edges and repair them in one local search
+        start_from_nodes = []
+        for worst_edge in cost_evaluator.get_and_penalize_worst_edges(
+            run_parameters.get("perturbation_batch_size", 1)
+        ):
+            logging.debug(
+                f"Penalizing edge({worst_edge.get_first_node()} - {worst_edge.get_second_node()})"
+            )
+            for node in worst_edge.nodes:
+                if not node.is_depot and node not in start_from_nodes:
+                    start_from_nodes.append(node)
 
         executed_moves, changed_routes = local_search(
-            solution, cost_evaluator, start_from_nodes, False, run_parameters
+            solution, cost_evaluator, start_from_nodes, False, run_parameters, deadline
         )
 
         applied_changes += executed_moves
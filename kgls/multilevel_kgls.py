@@ -0,0 +1,350 @@
+import logging
+import math
+import time
+from typing import Optional
+
+from .datastructure import CostEvaluator, Node, VRPProblem, VRPSolution
+from .decomposition_kgls import group_routes_by_angle
+from .kgls import KGLS
+from .local_search import improve_solution, perturbate_solution
+from .read_write import read_vrp_instance
+from .solution_construction import clark_wright_route_reduction, giant_tour_split
+from .abortion_condition import (
+    BaseAbortionCondition,
+    IterationsWithoutImprovementCondition,
+    get_abortion_condition,
+)
+
+
+class CoarseLevel:
+    """
+    One level of the multilevel hierarchy: a problem in which each path of customers
+    joined by fixed edges of the finer level is merged into one super-node.
+    """
+
+    def __init__(
+        self,
+        problem: VRPProblem,
+        cost_evaluator: CostEvaluator,
+        paths: dict[int, list[Node]],
+    ):
+        self.problem = problem
+        self.cost_evaluator = cost_evaluator
+        # node id of a (super-)node -> path of nodes of the finer level
+        self.paths = paths
+
+
+class MultilevelKGLS:
+    """
+    Multilevel KGLS: edges which are part of several consecutive local optima are fixed,
+    and the paths they form are merged into super-nodes with summed demand, located at
+    the midpoint of the path's end nodes. This is an approximation: the coarse problem
+    prices every connection to a super-node by its distance to the midpoint, whichever
+    end of the path it actually uses, so coarse moves are ranked by inexact costs.
+    The exact costs are only seen again after uncoarsening, where each path is entered
+    from the end closer to its predecessor and the refinement repairs the remaining
+    errors.
+    Paths are cut so that the demand of a super-node never exceeds
+    'max_super_node_load' times the capacity, otherwise super-nodes which fill
+    a whole route could not be moved anymore.
+    This is repeated for 'levels' levels (or until the number of nodes hardly shrinks),
+    the coarsest problem is solved with KGLS, and the solution is uncoarsened level
+    by level, each time expanding the super-nodes and refining the result with the
+    local search.
+    The cost matrix of the full instance is only built for the final refinement:
+    the local optima of the finest level are found in groups of 'routes_per_group'
+    neighboring routes of a giant tour solution, each with its own small matrix.
+    """
+
+    _abortions_conditions: list[BaseAbortionCondition]
+    _best_solution: Optional[VRPSolution]
+
+    def __init__(
+        self,
+        path_to_instance_file: str,
+        levels: int = 3,
+        optima_per_level: int = 5,
+        max_super_node_load: float = 0.5,
+        routes_per_group: int = 10,
+        **kwargs,
+    ):
+        self.run_parameters = KGLS._get_run_parameters(**kwargs)
+        self._vrp_instance = read_vrp_instance(path_to_instance_file)
+        # built when the finest level is refined
+        self._cost_evaluator: Optional[CostEvaluator] = None
+        self.levels = levels
+        self.optima_per_level = optima_per_level
+        self.max_super_node_load = max_super_node_load
+        self.routes_per_group = routes_per_group
+        # abortion conditions of the search on the coarsest level
+        self._abortions_conditions = [IterationsWithoutImprovementCondition(100)]
+        self._best_solution = None
+        self._best_solution_costs = math.inf
+
+    def set_abortion_condition(self, condition_name: str, param: int):
+        # Set the abortion condition of the search on the coarsest level.
+        self._abortions_conditions = [get_abortion_condition(condition_name, param)]
+
+    def add_abortion_condition(self, condition_name: str, param: int):
+        # Add an abortion condition of the search on the coarsest level.
+        self._abortions_conditions.append(get_abortion_condition(condition_name, param))
+
+    def _get_cost_evaluator(self) -> CostEvaluator:
+        # the cost evaluator of the full instance
+        if self._cost_evaluator is None:
+            self._cost_evaluator = CostEvaluator(
+                self._vrp_instance.nodes,
+                self._vrp_instance.capacity,
+                self.run_parameters,
+            )
+        return self._cost_evaluator
+
+    def _find_fixed_edges(
+        self, solution: VRPSolution, cost_evaluator: CostEvaluator
+    ) -> set[tuple[int, int]]:
+        # edges between customers which are part of 'optima_per_level' consecutive local optima
+        fixed_edges = None
+        for _ in range(self.optima_per_level):
+            changed_routes = perturbate_solution(
+                solution, cost_evaluator, self.run_parameters
+            )
+            improve_solution(
+                solution, cost_evaluator, changed_routes, self.run_parameters
+            )
+
+            edges = {
+                (min(node1.node_id, node2.node_id), max(node1.node_id, node2.node_id))
+                for route in solution.routes
+                for node1, node2 in zip(route.customers, route.customers[1:])
+            }
+            fixed_edges = edges if fixed_edges is None else fixed_edges & edges
+
+        return fixed_edges
+
+    def _find_fixed_edges_in_groups(
+        self, solution: VRPSolution, construct_routes: bool
+    ) -> tuple[VRPSolution, set[tuple[int, int]]]:
+        # local optima and their fixed edges of the full instance, computed independently
+        # for each group of neighboring routes, so only small cost matrices are built.
+        # With 'construct_routes', the routes of each group are rebuilt with the savings
+        # algorithm, which is a much better start for the local search than the split.
+        depot = self._vrp_instance.depot
+        capacity = self._vrp_instance.capacity
+        routes = [route.customers for route in solution.routes if route.size > 0]
+
+        local_optimum = VRPSolution(self._vrp_instance)
+        fixed_edges = set()
+        for group in group_routes_by_angle(routes, depot, self.routes_per_group):
+            sub_problem = VRPProblem(
+                [depot] + [node for route in group for node in route], capacity
+            )
+            sub_evaluator = CostEvaluator(
+                sub_problem.nodes, capacity, self.run_parameters
+            )
+            if construct_routes:
+                sub_solution = clark_wright_route_reduction(
+                    vrp_instance=sub_problem,
+                    cost_evaluator=sub_evaluator,
+                    seed=self.run_parameters["seed"],
+                )
+            else:
+                sub_solution = VRPSolution(sub_problem)
+                for route in group:
+                    sub_solution.add_route(route)
+
+            improve_solution(
+                sub_solution, sub_evaluator, sub_solution.routes, self.run_parameters
+            )
+            fixed_edges |= self._find_fixed_edges(sub_solution, sub_evaluator)
+
+            for route in sub_solution.routes:
+                if route.size > 0:
+                    local_optimum.add_route(route.customers)
+
+        return local_optimum, fixed_edges
+
+    def _coarsen(
+        self,
+        solution: VRPSolution,
+        fixed_edges: set[tuple[int, int]],
+    ) -> tuple[CoarseLevel, VRPSolution]:
+        fine_problem = solution.problem
+        coarse_nodes = [fine_problem.depot]
+        coarse_routes = []
+        paths = dict()
+        max_path_demand = self.max_super_node_load * fine_problem.capacity
+
+        for route in solution.routes:
+            if route.size == 0:
+                continue
+
+            # split the route into paths of fixed edges with limited demand
+            route_paths = [[route.customers[0]]]
+            path_demand = route.customers[0].demand
+            for node1, node2 in zip(route.customers, route.customers[1:]):
+                edge = (
+                    min(node1.node_id, node2.node_id),
+                    max(node1.node_id, node2.node_id),
+                )
+                if (
+                    edge in fixed_edges
+                    and path_demand + node2.demand <= max_path_demand
+                ):
+                    route_paths[-1].append(node2)
+                    path_demand += node2.demand
+                else:
+                    route_paths.append([node2])
+                    path_demand = node2.demand
+
+            coarse_route = []
+            for path in route_paths:
+                if len(path) == 1:
+                    super_node = path[0]
+                else:
+                    # midpoint of the end nodes (an approximation, see class docstring)
+                    super_node = Node(
+                        node_id=path[0].node_id,
+                        x_coordinate=(path[0].x_coordinate + path[-1].x_coordinate) / 2,
+                        y_coordinate=(path[0].y_coordinate + path[-1].y_coordinate) / 2,
+                        demand=sum(node.demand for node in path),
+                        is_depot=False,
+                    )
+                paths[super_node.node_id] = path
+                coarse_nodes.append(super_node)
+                coarse_route.append(super_node)
+            coarse_routes.append(coarse_route)
+
+        coarse_problem = VRPProblem(coarse_nodes, fine_problem.capacity)
+        coarse_level = CoarseLevel(
+            problem=coarse_problem,
+            cost_evaluator=CostEvaluator(
+                coarse_problem.nodes, coarse_problem.capacity, self.run_parameters
+            ),
+            paths=paths,
+        )
+
+        coarse_solution = VRPSolution(coarse_problem)
+        for coarse_route in coarse_routes:
+            coarse_solution.add_route(coarse_route)
+
+        return coarse_level, coarse_solution
+
+    @staticmethod
+    def _uncoarsen(
+        coarse_solution: VRPSolution,
+        coarse_level: CoarseLevel,
+        fine_problem: VRPProblem,
+    ) -> VRPSolution:
+        fine_solution = VRPSolution(fine_problem)
+
+        for route in coarse_solution.routes:
+            if route.size == 0:
+                continue
+
+            route_nodes = []
+            prev_node = fine_problem.depot
+            for super_node in route.customers:
+                path = coarse_level.paths[super_node.node_id]
+                # traverse the path in the direction, which starts closer to the previous node
+                if CostEvaluator._compute_euclidean_distance(
+                    prev_node, path[-1]
+                ) < CostEvaluator._compute_euclidean_distance(prev_node, path[0]):
+                    path = path[::-1]
+                route_nodes.extend(path)
+                prev_node = path[-1]
+
+            fine_solution.add_route(route_nodes)
+
+        fine_solution.validate()
+        return fine_solution
+
+    def run(self, start_solution: Optional[VRPSolution] = None):
+        start_time = time.time()
+        logging.info(f"#Running multilevel KGLS with up to {self.levels} levels")
+
+        construct_routes = start_solution is None
+        if construct_routes:
+            # groups the customers without a cost matrix
+            start_solution = giant_tour_split(self._vrp_instance, "sweep")
+        solution, fixed_edges = self._find_fixed_edges_in_groups(
+            start_solution, construct_routes
+        )
+
+        # coarsening
+        coarse_levels: list[CoarseLevel] = []
+        cost_evaluator = None
+        for level_index in range(self.levels):
+            if level_index > 0:
+                fixed_edges = self._find_fixed_edges(solution, cost_evaluator)
+            coarse_level, coarse_solution = self._coarsen(solution, fixed_edges)
+
+            num_nodes = len(solution.problem.customers)
+            num_coarse_nodes = len(coarse_level.problem.customers)
+            logging.info(
+                f"#Coarsened level {len(coarse_levels) + 1} from {num_nodes} "
+                f"to {num_coarse_nodes} nodes"
+            )
+            if num_coarse_nodes > 0.9 * num_nodes:
+                break
+
+            coarse_levels.append(coarse_level)
+            solution = coarse_solution
+            cost_evaluator = coarse_level.cost_evaluator
+
+        # solve the coarsest problem
+        if not coarse_levels:
+            cost_evaluator = self._get_cost_evaluator()
+        kgls = KGLS.from_problem(
+            solution.problem, cost_evaluator=cost_evaluator, **self.run_parameters
+        )
+        kgls.set_abortions_conditions(self._abortions_conditions)
+        kgls.run(start_solution=solution)
+        solution = kgls.best_solution
+
+        # uncoarsening and refinement
+        for level_index in range(len(coarse_levels) - 1, -1, -1):
+            if level_index > 0:
+                fine_problem = coarse_levels[level_index - 1].problem
+                cost_evaluator = coarse_levels[level_index - 1].cost_evaluator
+            else:
+                fine_problem = self._vrp_instance
+                cost_evaluator = self._get_cost_evaluator()
+
+            solution = self._uncoarsen(
+                solution, coarse_levels[level_index], fine_problem
+            )
+            improve_solution(
+                solution, cost_evaluator, solution.routes, self.run_parameters
+            )
+
+        self._best_solution = solution
+        self._best_solution_costs = self._get_cost_evaluator().get_solution_costs(
+            solution
+        )
+
+        logging.info(
+            f"#Multilevel KGLS finished after {(time.time() - start_time): 1f} seconds "
+            f"with costs {self._best_solution_costs}."
+        )
+
+    def best_solution_to_file(self, path_to_file: str):
+        self._best_solution.to_file(path_to_file)
+
+    @property
+    def best_solution(self) -> Optional[VRPSolution]:
+        return self._best_solution
+
+    @property
+    def best_found_solution_value(self) -> int:
+        return self._best_solution_costs
+
+    @property
+    def best_found_gap(self) -> Optional[float]:
+        if self._vrp_instance.bks != float("inf"):
+            return (
+                100
+                * (self._best_solution_costs - self._vrp_instance.bks)
+                / self._vrp_instance.bks
+            )
+        else:
+            return None
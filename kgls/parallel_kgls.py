@@ -0,0 +1,154 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+
+from .datastructure import SharedProblemData, VRPSolution
+from .elite_store import EliteStore
+from .kgls import KGLS
+from .read_write import read_vrp_instance
+from .abortion_condition import (
+    BaseAbortionCondition,
+    IterationsWithoutImprovementCondition,
+    get_abortion_condition,
+)
+
+
+# elite store of the worker process, if runs cooperate
+_elite_store: Optional[EliteStore] = None
+
+
+def _init_worker(elite_store: Optional[EliteStore]):
+    global _elite_store
+    _elite_store = elite_store
+
+
+def _run_kgls(
+    shared_data: SharedProblemData,
+    run_parameters: dict[str, Any],
+    abortions_conditions: list[BaseAbortionCondition],
+    exchange_interval: int,
+) -> tuple[VRPSolution, dict[str, Any]]:
+    # executed in a worker process, which attaches to the shared problem data
+    kgls = KGLS.from_shared_problem_data(shared_data, **run_parameters)
+    kgls.set_abortions_conditions(abortions_conditions)
+    if _elite_store is not None:
+        kgls.set_elite_store(_elite_store, exchange_interval)
+    kgls.run()
+
+    run_stats = {
+        "seed": run_parameters["seed"],
+        "costs": kgls.best_found_solution_value,
+        "gap": kgls.best_found_gap,
+        "run_time": kgls.total_runtime,
+        "iterations": kgls.iterations,
+    }
+    return kgls.best_solution, run_stats
+
+
+class ParallelKGLS:
+    """
+    Multi-start KGLS: independent runs on the same instance in a process pool.
+    Run i uses seed 'seed' + i, which randomizes the constructed start solution
+    and the first penalization criterium (seed 0 is the deterministic run).
+    The instance is read and preprocessed once, workers share its costs and
+    neighborhoods in shared memory and only keep their penalties private.
+    With 'exchange_interval' > 0, the runs cooperate as islands: every
+    'exchange_interval' iterations they publish their best solution to a shared
+    elite store and continue from a better elite solution when they stagnate.
+    """
+
+    _abortions_conditions: list[BaseAbortionCondition]
+    _best_solution: Optional[VRPSolution]
+    _run_stats: list[dict[str, Any]]
+
+    def __init__(
+        self,
+        path_to_instance_file: str,
+        workers: Optional[int] = None,
+        num_runs: Optional[int] = None,
+        exchange_interval: int = 0,
+        **kwargs,
+    ):
+        self.run_parameters = KGLS._get_run_parameters(**kwargs)
+        self._path_to_instance_file = path_to_instance_file
+        self.workers = workers or os.cpu_count()
+        self.num_runs = num_runs or self.workers
+        self.exchange_interval = exchange_interval
+        self._abortions_conditions = [IterationsWithoutImprovementCondition(100)]
+        self._best_solution = None
+        self._run_stats = []
+
+    def set_abortion_condition(self, condition_name: str, param: int):
+        # Set the abortion condition of each run.
+        self._abortions_conditions = [get_abortion_condition(condition_name, param)]
+
+    def add_abortion_condition(self, condition_name: str, param: int):
+        # Add an abortion condition of each run.
+        self._abortions_conditions.append(get_abortion_condition(condition_name, param))
+
+    def run(self) -> tuple[VRPSolution, list[dict[str, Any]]]:
+        logging.info(
+            f"#Running {self.num_runs} KGLS runs with {self.workers} worker processes"
+        )
+        start_time = time.time()
+        seeds = [self.run_parameters["seed"] + run for run in range(self.num_runs)]
+
+        vrp_instance = read_vrp_instance(self._path_to_instance_file)
+        elite_store = None
+        if self.exchange_interval > 0:
+            elite_store = EliteStore(len(vrp_instance.nodes))
+
+        shared_data = SharedProblemData.create(
+            vrp_instance, self.run_parameters["neighborhood_size"]
+        )
+        with shared_data:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(elite_store,),
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        _run_kgls,
+                        shared_data,
+                        {**self.run_parameters, "seed": seed},
+                        self._abortions_conditions,
+                        self.exchange_interval,
+                    )
+                    for seed in seeds
+                ]
+                results = [future.result() for future in futures]
+
+        self._run_stats = [run_stats for _, run_stats in results]
+        self._best_solution, best_run_stats = min(
+            results, key=lambda result: result[1]["costs"]
+        )
+
+        logging.info(
+            f"#Parallel KGLS finished after {(time.time() - start_time): 1f} seconds. "
+            f"Best run had seed {best_run_stats['seed']} "
+            f"with costs {best_run_stats['costs']}."
+        )
+
+        return self._best_solution, self._run_stats
+
+    def best_solution_to_file(self, path_to_file: str):
+        self._best_solution.to_file(path_to_file)
+
+    @property
+    def best_solution(self) -> Optional[VRPSolution]:
+        return self._best_solution
+
+    @property
+    def best_found_solution_value(self) -> int:
+        return min(run_stats["costs"] for run_stats in self._run_stats)
+
+    @property
+    def best_found_gap(self) -> Optional[float]:
+        return min(self._run_stats, key=lambda run_stats: run_stats["costs"])["gap"]
+
+    @property
+    def run_stats(self) -> list[dict[str, Any]]:
+        return self._run_stats
@@ -1,4 +1,4 @@
-from .problem_reader import read_vrp_instance
+from .problem_reader import read_vrp_instance, parse_vrp_instance
 from .solution_reader import read_vrp_solution
 
-__all__ = ["read_vrp_instance", "read_vrp_solution"]
+__all__ = ["read_vrp_instance", "parse_vrp_instance", "read_vrp_solution"]
@@ -4,47 +4,54 @@ from kgls.datastructure import Node, VRPProblem
 
 
 def read_vrp_instance(file_path: str) -> VRPProblem:
+    with open(file_path, "r") as file:
+        instance_data = file.read()
+
+    # also try read the best known solution
+    sol_file_path = file_path.replace(".vrp", ".sol")
+    if os.path.exists(sol_file_path):
+        best_solution = read_best_known_solution(sol_file_path)
+    else:
+        best_solution = float("inf")
+
+    return parse_vrp_instance(instance_data, bks=best_solution)
+
+
+def parse_vrp_instance(instance_data: str, bks: float = float("inf")) -> VRPProblem:
+    # parses an instance in the format of the '.vrp' files, which is already in memory
     nodes = dict()
     capacity: int = 0
 
-    with open(file_path, "r") as file:
-        current_section = None
-        for line in file:
-            line = line.strip()
+    current_section = None
+    for line in instance_data.splitlines():
+        line = line.strip()
 
-            if line == "":
-                continue
+        if line == "":
+            continue
 
-            if line.startswith("CAPACITY"):
-                capacity = int(line.split(":")[1].strip())
+        if line.startswith("CAPACITY"):
+            capacity = int(line.split(":")[1].strip())
 
-            elif not line[0].isdigit():
-                current_section = line
-                continue
+        elif not line[0].isdigit():
+            current_section = line
+            continue
 
-            elif current_section == "NODE_COORD_SECTION":
-                parts = line.split()
-                node_id = int(parts[0])  # - 1  # assuming IDs start with 1
-                x = float(parts[1])
-                y = float(parts[2])
-                nodes[node_id] = {"id": node_id, "x": x, "y": y}
-
-            elif current_section == "DEMAND_SECTION":
-                parts = line.split()
-                node_id = int(parts[0].strip())  # - 1
-                demand = int(parts[1].strip())
-                # assume that demand section is after coord section
-                nodes[node_id].update({"demand": demand})
+        elif current_section == "NODE_COORD_SECTION":
+            parts = line.split()
+            node_id = int(parts[0])  # - 1  # assuming IDs start with 1
+            x = float(parts[1])
+            y = float(parts[2])
+            nodes[node_id] = {"id": node_id, "x": x, "y": y}
 
-            elif line == "EOF":
-                break
+        elif current_section == "DEMAND_SECTION":
+            parts = line.split()
+            node_id = int(parts[0].strip())  # - 1
+            demand = int(parts[1].strip())
+            # assume that demand section is after coord section
+            nodes[node_id].update({"demand": demand})
 
-        # also try read the best known solution
-        sol_file_path = file_path.replace(".vrp", ".sol")
-        if os.path.exists(sol_file_path):
-            best_solution = read_best_known_solution(sol_file_path)
-        else:
-            best_solution = float("inf")
+        elif line == "EOF":
+            break
 
     vrp_nodes = [
         Node(
@@ -56,7 +63,7 @@ def read_vrp_instance(file_path: str) -> VRPProblem:
         )
         for node in nodes.values()
     ]
-    return VRPProblem(nodes=vrp_nodes, capacity=capacity, bks=best_solution)
+    return VRPProblem(nodes=vrp_nodes, capacity=capacity, bks=bks)
 
 
 def read_best_known_solution(file_path: str) -> float:
@@ -0,0 +1,122 @@
+import csv
+import math
+from array import array
+from typing import Any, Iterator, Optional
+
+# column name -> typecode of the array which stores it
+COLUMNS = {
+    "run_time": "d",
+    "iteration": "q",
+    "costs": "q",
+    "best_costs": "q",
+    "best_gap": "d",
+}
+
+
+class RunStats:
+    """
+    Statistics of the iterations of a run, stored column-wise in typed arrays.
+    Every iteration which improves the best solution is kept. Of the iterations
+    without improvement, only those 1, 2, 4, 8, ... iterations after the last
+    improvement are kept, so long stagnating phases only add logarithmically many rows.
+    Iterating over the stats yields one dict per row. A missing gap is stored as NaN.
+    """
+
+    def __init__(self):
+        self._columns: dict[str, array] = {
+            name: array(typecode) for name, typecode in COLUMNS.items()
+        }
+        self._best_iteration: int = 0
+        # the latest row, also if it was not kept
+        self._last_row: Optional[tuple] = None
+        self._last_row_kept: bool = False
+
+    def append(
+        self,
+        run_time: float,
+        iteration: int,
+        costs: int,
+        best_costs: int,
+        best_gap: Optional[float],
+    ):
+        row = (
+            run_time,
+            iteration,
+            costs,
+            best_costs,
+            math.nan if best_gap is None else best_gap,
+        )
+        improved = self._last_row is None or best_costs < self._last_row[3]
+        if improved:
+            self._best_iteration = iteration
+        self._last_row = row
+
+        iterations_without_improvement = iteration - self._best_iteration
+        self._last_row_kept = improved or (
+            iterations_without_improvement & (iterations_without_improvement - 1) == 0
+        )
+        if self._last_row_kept:
+            self._add_row(row)
+
+    def flush(self):
+        # keep the latest row, e.g., at the end of a run
+        if self._last_row is not None and not self._last_row_kept:
+            self._add_row(self._last_row)
+            self._last_row_kept = True
+
+    def _add_row(self, row: tuple):
+        for column, value in zip(self._columns.values(), row):
+            column.append(value)
+
+    def __len__(self) -> int:
+        return len(self._columns["iteration"])
+
+    def get_rows(self, start: int = 0) -> list[tuple]:
+        # the kept rows from index 'start' on, as tuples in the order of COLUMNS
+        return list(zip(*(column[start:] for column in self._columns.values())))
+
+    def get_search_state(self) -> dict[str, Any]:
+        # the state which decides about keeping the next rows (the rows are not included)
+        return {
+            "best_iteration": self._best_iteration,
+            "last_row": self._last_row,
+            "last_row_kept": self._last_row_kept,
+        }
+
+    def set_search_state(self, state: dict[str, Any], rows: list[tuple]) -> None:
+        # restore the kept 'rows' and a state of 'get_search_state'
+        self._columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+        for row in rows:
+            self._add_row(row)
+        self._best_iteration = state["best_iteration"]
+        self._last_row = state["last_row"]
+        self._last_row_kept = state["last_row_kept"]
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for row in zip(*self._columns.values()):
+            yield dict(zip(COLUMNS, row))
+
+    def __getitem__(self, index: int) -> dict[str, Any]:
+        return {name: column[index] for name, column in self._columns.items()}
+
+    @property
+    def last_run_time(self) -> float:
+        return self._last_row[0]
+
+    def column(self, name: str) -> array:
+        return self._columns[name]
+
+    def to_numpy(self) -> dict[str, Any]:
+        # copies of the columns as numpy arrays
+        import numpy as np
+
+        return {
+            name: np.frombuffer(column, dtype=column.typecode).copy()
+            for name, column in self._columns.items()
+        }
+
+    def to_csv(self, path_to_file: str):
+        with open(path_to_file, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(COLUMNS)
+            writer.writerows(zip(*self._columns.values()))
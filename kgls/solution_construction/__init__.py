@@ -1,3 +1,5 @@
 from .savings_algorithm import clark_wright_route_reduction
+from .split_algorithm import giant_tour_split
+from .sweep_algorithm import sweep
 
-__all__ = ["clark_wright_route_reduction"]
+__all__ = ["clark_wright_route_reduction", "giant_tour_split", "sweep"]
@@ -1,11 +1,20 @@
+from array import array
+from collections import deque
+import heapq
 import logging
-from itertools import combinations
 import math
-from typing import List
+import random
+from typing import Iterator, List, Optional
 
 from kgls.datastructure import Node, CostEvaluator, VRPProblem, VRPSolution
 
 
+# states of customers during the construction
+_NOT_PLANNED = 0
+_ENDPOINT = 1
+_INTERIOR = 2
+
+
 class Saving:
     def __init__(self, from_node, to_node, saving):
         self.from_node = from_node
@@ -16,46 +25,129 @@ class Saving:
         return self.saving > other.saving
 
 
-def compute_savings(
-    customers: List[Node], depot: Node, cost_evaluator: CostEvaluator
-) -> list[Saving]:
-    savings_list = []
-
-    for node_1, node_2 in combinations(customers, 2):
-        saving = (
-            cost_evaluator.get_distance(node_1, depot)
-            + cost_evaluator.get_distance(node_2, depot)
-            - cost_evaluator.get_distance(node_1, node_2)
+class SavingsList:
+    """
+    Savings of pairs of customers, stored as parallel arrays of customer indices
+    and savings. The pairs are ranked by decreasing savings with a single argsort,
+    pairs with the same savings keep their order.
+    Iterating yields the (from_node, to_node) pairs from the highest saving on.
+    """
+
+    def __init__(
+        self, customers: List[Node], first: array, second: array, values: array
+    ):
+        self.customers = customers
+        self.first = first
+        self.second = second
+        self.values = values
+        self.order = array(
+            "l", sorted(range(len(values)), key=lambda idx: -values[idx])
         )
 
-        savings_list.append(Saving(node_1, node_2, saving))
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator[tuple[Node, Node]]:
+        customers, first, second = self.customers, self.first, self.second
+        for idx in self.order:
+            yield customers[first[idx]], customers[second[idx]]
+
+    def ranked_index_pairs(self) -> Iterator[tuple[int, int]]:
+        # like iterating, but yields the indices of the customers
+        first, second = self.first, self.second
+        for idx in self.order:
+            yield first[idx], second[idx]
+
+    def __getitem__(self, rank: int) -> Saving:
+        idx = self.order[rank]
+        return Saving(
+            self.customers[self.first[idx]],
+            self.customers[self.second[idx]],
+            self.values[idx],
+        )
 
-    return sorted(savings_list)
+    def with_values(self, values: array) -> "SavingsList":
+        # the same pairs with other savings
+        return SavingsList(self.customers, self.first, self.second, values)
 
 
-def compute_weighted_savings(
+def compute_savings(
     customers: List[Node], depot: Node, cost_evaluator: CostEvaluator
-) -> list[Saving]:
-    savings_list = compute_savings(customers, depot, cost_evaluator)
+) -> SavingsList:
+    # Only pairs of customers of which one is in the neighborhood of the other are
+    # considered, so the number of savings grows linearly with the number of customers.
+    customer_indices = {node.node_id: idx for idx, node in enumerate(customers)}
+    pairs = set()
+    for idx, node in enumerate(customers):
+        for neighbor in cost_evaluator.get_neighborhood(node):
+            other_idx = customer_indices.get(neighbor.node_id)
+            if other_idx is not None and other_idx != idx:
+                pairs.add((min(idx, other_idx), max(idx, other_idx)))
+    # same order of pairs as 'combinations(customers, 2)'
+    return compute_savings_of_pairs(customers, depot, cost_evaluator, sorted(pairs))
+
+
+def compute_savings_of_pairs(
+    customers: List[Node],
+    depot: Node,
+    cost_evaluator: CostEvaluator,
+    pairs: list[tuple[int, int]],
+) -> SavingsList:
+    # savings of the given pairs of customer indices
+    depot_costs = [cost_evaluator.get_distance(node, depot) for node in customers]
+    first = array("l", (idx1 for idx1, _ in pairs))
+    second = array("l", (idx2 for _, idx2 in pairs))
+    values = array(
+        "d",
+        (
+            depot_costs[idx1]
+            + depot_costs[idx2]
+            - cost_evaluator.get_distance(customers[idx1], customers[idx2])
+            for idx1, idx2 in pairs
+        ),
+    )
+
+    return SavingsList(customers, first, second, values)
 
-    max_saving = sorted([_s.saving for _s in savings_list])[-1]
-    max_demand = (
-        sorted([_n.demand for _n in customers])[-1]
-        + sorted([_n.demand for _n in customers])[-2]
+
+def compute_weighted_savings(
+    customers: List[Node],
+    depot: Node,
+    cost_evaluator: CostEvaluator,
+    savings_list: Optional[SavingsList] = None,
+) -> SavingsList:
+    # savings normalized by the highest saving plus the demand normalized by the two highest
+    # demands, 'savings_list' can be passed to reuse already computed savings
+    if savings_list is None:
+        savings_list = compute_savings(customers, depot, cost_evaluator)
+    if len(savings_list) == 0:
+        return savings_list
+
+    max_saving = max(savings_list.values)
+    max_demand = sum(heapq.nlargest(2, (_n.demand for _n in customers)))
+
+    weighted_values = array(
+        "d",
+        (
+            saving / max_saving
+            + (customers[idx1].demand + customers[idx2].demand) / max_demand
+            for saving, idx1, idx2 in zip(
+                savings_list.values, savings_list.first, savings_list.second
+            )
+        ),
     )
 
-    weighted_savings_list = []
-    for node_1, node_2 in combinations(customers, 2):
-        saving = (
-            cost_evaluator.get_distance(node_1, depot)
-            + cost_evaluator.get_distance(node_2, depot)
-            - cost_evaluator.get_distance(node_1, node_2)
-        )
-        saving = saving / max_saving + (node_1.demand + node_2.demand) / max_demand
+    return savings_list.with_values(weighted_values)
+
 
-        weighted_savings_list.append(Saving(node_1, node_2, saving))
+def randomize_savings(savings_list: SavingsList, seed: int) -> SavingsList:
+    # scale each saving by a random factor, which reorders similar savings
+    rng = random.Random(seed)
+    values = array("d", savings_list.values)
+    for idx in savings_list.order:
+        values[idx] *= rng.uniform(0.9, 1.1)
 
-    return sorted(weighted_savings_list)
+    return savings_list.with_values(values)
 
 
 def clark_wright_parallel(
@@ -63,106 +155,130 @@ def clark_wright_parallel(
     cost_evaluator: CostEvaluator,
     demand_weighted: bool = False,
     visualize_progess: bool = False,
+    seed: int = 0,
+    savings_list: Optional[SavingsList] = None,
 ) -> VRPSolution:
-    if demand_weighted:
-        savings_list = compute_weighted_savings(
-            vrp_instance.customers, vrp_instance.depot, cost_evaluator
-        )
-    else:
-        savings_list = compute_savings(
-            vrp_instance.customers, vrp_instance.depot, cost_evaluator
-        )
-
-    # Nodes not yet planned
-    not_planned: list[Node] = vrp_instance.customers.copy()
-    # Nodes planned at the start or end of a route
-    can_be_extended: list[Node] = []
-    # Nodes planned not at the start or end or a route
-    cannot_be_extended: list[Node] = []
-
-    # start with empty solution
-    solution = VRPSolution(vrp_instance)
-
-    for saving in savings_list:
-        node1, node2 = saving.from_node, saving.to_node
+    """
+    Parallel savings algorithm. 'savings_list' are precomputed (unweighted) savings
+    of neighboring customers, which are then reused.
+    Customers whose neighbors' routes are full would stay on their own routes,
+    so once all savings of neighbors are processed, the savings of all pairs of
+    customers which can still be connected (route ends and unplanned customers)
+    are processed as well.
+    """
+    customers = vrp_instance.customers
+    depot = vrp_instance.depot
+
+    def get_ranked_savings(savings: SavingsList) -> SavingsList:
+        if demand_weighted:
+            savings = compute_weighted_savings(customers, depot, cost_evaluator, savings)
+        if seed != 0:
+            savings = randomize_savings(savings, seed)
+        return savings
+
+    if savings_list is None:
+        savings_list = compute_savings(customers, depot, cost_evaluator)
+    savings_list = get_ranked_savings(savings_list)
+
+    capacity = vrp_instance.capacity
+    # state of each customer (by index): not yet planned, planned at the start or end
+    # of a route (can be extended) or planned in the interior of a route
+    state = bytearray(len(customers))
+    # customers of each route (in order of creation), their demand and the route of each customer
+    routes: list[deque[int]] = []
+    route_volumes: list[int] = []
+    route_of = array("l", [-1]) * len(customers)
+
+    def merge(idx1: int, idx2: int):
+        # connect the customers with indices 'idx1' and 'idx2', if feasible
+        state1, state2 = state[idx1], state[idx2]
 
         # check whether any of the two nodes cannot be extended
-        if node1 in cannot_be_extended or node2 in cannot_be_extended:
-            continue
+        if state1 == _INTERIOR or state2 == _INTERIOR:
+            return
 
-        elif node1 in not_planned and node2 in not_planned:
-            if node1.demand + node2.demand <= vrp_instance.capacity:
+        elif state1 == _NOT_PLANNED and state2 == _NOT_PLANNED:
+            if customers[idx1].demand + customers[idx2].demand <= capacity:
                 # create a new route with node1 and node2
-                solution.add_route([node1, node2])
-
-                not_planned.remove(node1)
-                not_planned.remove(node2)
-                can_be_extended.append(node1)
-                can_be_extended.append(node2)
-
-        elif node1 in can_be_extended and node2 in not_planned:
-            route1 = solution.route_of(node1)
-            if route1.volume + node2.demand <= vrp_instance.capacity:
-                if solution.prev(node1).is_depot:  # add node2 before node1
-                    solution.insert_nodes_after([node2], solution.prev(node1), route1)
-                else:  # add node2 after node1
-                    solution.insert_nodes_after([node2], node1, route1)
-
-                can_be_extended.remove(node1)
-                not_planned.remove(node2)
-                cannot_be_extended.append(node1)
-                can_be_extended.append(node2)
-
-        elif node2 in can_be_extended and node1 in not_planned:
-            route2 = solution.route_of(node2)
-            if route2.volume + node1.demand <= vrp_instance.capacity:
-                if solution.prev(node2).is_depot:  # add node1 before node2
-                    solution.insert_nodes_after([node1], solution.prev(node2), route2)
-                else:  # add node1 after node2
-                    solution.insert_nodes_after([node1], node2, route2)
-
-                can_be_extended.remove(node2)
-                not_planned.remove(node1)
-                cannot_be_extended.append(node2)
-                can_be_extended.append(node1)
-
-        elif node1 in can_be_extended and node2 in can_be_extended:
+                route_of[idx1] = route_of[idx2] = len(routes)
+                routes.append(deque([idx1, idx2]))
+                route_volumes.append(customers[idx1].demand + customers[idx2].demand)
+                state[idx1] = state[idx2] = _ENDPOINT
+
+        elif state1 != state2:
+            # one node is at the start or end of a route, the other one is not yet planned
+            if state1 == _ENDPOINT:
+                endpoint, new_node = idx1, idx2
+            else:
+                endpoint, new_node = idx2, idx1
+
+            route_index = route_of[endpoint]
+            route = routes[route_index]
+            if route_volumes[route_index] + customers[new_node].demand <= capacity:
+                if route[0] == endpoint:  # add new node before the endpoint
+                    route.appendleft(new_node)
+                else:  # add new node after the endpoint
+                    route.append(new_node)
+
+                route_of[new_node] = route_index
+                route_volumes[route_index] += customers[new_node].demand
+                state[endpoint] = _INTERIOR
+                state[new_node] = _ENDPOINT
+
+        else:
             # if both nodes are in different routes, merge the two routes
             # by moving all customers from route2 into route 1
-            route1 = solution.route_of(node1)
-            route2 = solution.route_of(node2)
+            route_index1, route_index2 = route_of[idx1], route_of[idx2]
 
-            if (route1 != route2) and (
-                route1.volume + route2.volume <= vrp_instance.capacity
+            if route_index1 != route_index2 and (
+                route_volumes[route_index1] + route_volumes[route_index2] <= capacity
             ):
-                route2_customers = route2.customers
-                solution.remove_nodes(route2_customers)
+                route1, route2 = routes[route_index1], routes[route_index2]
 
-                if solution.next(node1).is_depot:
+                if route1[-1] == idx1:
                     # insert customers from route2 at the end, node2 has to be the first node
-                    if solution.next(node2).is_depot:
-                        route2_customers = route2_customers[::-1]
-
-                    solution.insert_nodes_after(route2_customers, node1, route1)
-
-                if solution.prev(node1).is_depot:
+                    if route2[-1] == idx2:
+                        route2.reverse()
+                    route1.extend(route2)
+                else:
                     # insert at the front, node2 has to be the last node
-                    if solution.prev(node2).is_depot:
-                        route2_customers = route2_customers[::-1]
-
-                    solution.insert_nodes_after(
-                        route2_customers, solution.prev(node1), route1
-                    )
+                    if route2[0] == idx2:
+                        route2.reverse()
+                    route1.extendleft(reversed(route2))
+
+                for idx in route2:
+                    route_of[idx] = route_index1
+                route_volumes[route_index1] += route_volumes[route_index2]
+                route_volumes[route_index2] = 0
+                route2.clear()
+                state[idx1] = state[idx2] = _INTERIOR
+
+    for idx1, idx2 in savings_list.ranked_index_pairs():
+        merge(idx1, idx2)
+
+    # savings of all pairs of customers which can still be connected
+    open_customers = [idx for idx in range(len(customers)) if state[idx] != _INTERIOR]
+    fallback_pairs = [
+        (idx1, idx2)
+        for pos, idx1 in enumerate(open_customers)
+        for idx2 in open_customers[pos + 1 :]
+    ]
+    fallback_savings = compute_savings_of_pairs(
+        customers, depot, cost_evaluator, fallback_pairs
+    )
+    for idx1, idx2 in get_ranked_savings(fallback_savings).ranked_index_pairs():
+        merge(idx1, idx2)
 
-                can_be_extended.remove(node2)
-                can_be_extended.remove(node1)
-                cannot_be_extended.append(node2)
-                cannot_be_extended.append(node1)
+    # start with empty solution, emptied routes are kept
+    solution = VRPSolution(vrp_instance)
+    for route in routes:
+        solution.add_route([customers[idx] for idx in route])
 
     # All nodes which were not inserted into a route (e.g., because of high capacity)
     # get their 'own' route
-    for node in not_planned:
-        solution.add_route([node])
+    for idx, node in enumerate(customers):
+        if state[idx] == _NOT_PLANNED:
+            solution.add_route([node])
 
     solution.validate()
 
@@ -173,9 +289,15 @@ def clark_wright_route_reduction(
     vrp_instance: VRPProblem,
     cost_evaluator: CostEvaluator,
     visualize_progess: bool = False,
+    seed: int = 0,
 ) -> VRPSolution:
     logging.info("#Constructing VRP solution with Clarke-Wright heuristic")
-    solution = clark_wright_parallel(vrp_instance, cost_evaluator)
+    savings_list = compute_savings(
+        vrp_instance.customers, vrp_instance.depot, cost_evaluator
+    )
+    solution = clark_wright_parallel(
+        vrp_instance, cost_evaluator, seed=seed, savings_list=savings_list
+    )
 
     minimal_num_routes = math.ceil(
         sum(_cust.demand for _cust in vrp_instance.customers) / vrp_instance.capacity
@@ -186,6 +308,8 @@ def clark_wright_route_reduction(
             f"#Solution had {len(solution.routes)} routes, compared to {minimal_num_routes} minimal routes. "
             f"Trying to reduce the number of routes by considering capacity in the savings."
         )
-        solution = clark_wright_parallel(vrp_instance, cost_evaluator, True)
+        solution = clark_wright_parallel(
+            vrp_instance, cost_evaluator, True, seed=seed, savings_list=savings_list
+        )
 
     return solution
@@ -0,0 +1,136 @@
+import logging
+import random
+from collections import deque
+
+from kgls.datastructure import CostEvaluator, Node, VRPProblem, VRPSolution
+from .sweep_algorithm import get_polar_angle
+
+TOUR_ORDERS = ["sweep", "hilbert"]
+
+
+def get_hilbert_index(x: int, y: int, order: int) -> int:
+    # position of the cell (x, y) on the hilbert curve through a 2^order x 2^order grid
+    index = 0
+    side = 1 << (order - 1)
+    while side > 0:
+        rx = 1 if x & side else 0
+        ry = 1 if y & side else 0
+        index += side * side * ((3 * rx) ^ ry)
+        # rotate the quadrant
+        if ry == 0:
+            if rx == 1:
+                x = side - 1 - x
+                y = side - 1 - y
+            x, y = y, x
+        side >>= 1
+
+    return index
+
+
+def get_giant_tour(
+    vrp_instance: VRPProblem, tour_order: str = "sweep", order: int = 16
+) -> list[Node]:
+    # all customers in one sequence, by polar angle around the depot or along a hilbert curve
+    customers = vrp_instance.customers
+    depot = vrp_instance.depot
+
+    if tour_order == "sweep":
+        return sorted(customers, key=lambda node: get_polar_angle(node, depot))
+
+    if tour_order == "hilbert":
+        min_x = min(node.x_coordinate for node in customers)
+        min_y = min(node.y_coordinate for node in customers)
+        extent = max(
+            max(node.x_coordinate for node in customers) - min_x,
+            max(node.y_coordinate for node in customers) - min_y,
+            1e-9,
+        )
+        scale = ((1 << order) - 1) / extent
+        return sorted(
+            customers,
+            key=lambda node: get_hilbert_index(
+                int((node.x_coordinate - min_x) * scale),
+                int((node.y_coordinate - min_y) * scale),
+                order,
+            ),
+        )
+
+    raise ValueError(f"Tour order must be in {', '.join(TOUR_ORDERS)}")
+
+
+def split(giant_tour: list[Node], depot: Node, capacity: int) -> list[list[Node]]:
+    """
+    Cut the giant tour into capacity-feasible routes with minimal total costs,
+    keeping the order of the customers (Split procedure in O(n), Vidal 2016).
+    Route i+1..j costs g(i) + D(j) + d(depot, j) with g(i) = p(i) + d(depot, i+1) - D(i+1),
+    where D are the cumulative costs along the tour and p(i) the minimal costs of
+    serving the first i customers. For each j, the best i is the minimum of g over the
+    window of predecessors within the capacity, which is kept in a monotone queue.
+    A customer whose demand exceeds the capacity is served by its own route.
+    """
+    num_customers = len(giant_tour)
+    distance = CostEvaluator._compute_euclidean_distance
+
+    # 1-based prefix sums of costs along the tour and of the demands
+    depot_costs = [0] + [distance(depot, node) for node in giant_tour]
+    tour_costs = [0, 0]
+    loads = [0, giant_tour[0].demand]
+    for idx in range(1, num_customers):
+        tour_costs.append(
+            tour_costs[-1] + distance(giant_tour[idx - 1], giant_tour[idx])
+        )
+        loads.append(loads[-1] + giant_tour[idx].demand)
+
+    potential = [0] * (num_customers + 1)
+    predecessor = [0] * (num_customers + 1)
+    g = [0] * num_customers
+    g[0] = depot_costs[1] - tour_costs[1]
+    queue = deque([0])
+
+    for j in range(1, num_customers + 1):
+        best = queue[0]
+        potential[j] = g[best] + tour_costs[j] + depot_costs[j]
+        predecessor[j] = best
+
+        if j < num_customers:
+            g[j] = potential[j] + depot_costs[j + 1] - tour_costs[j + 1]
+            # j stays feasible longer than all predecessors, so worse ones are dropped
+            while queue and g[queue[-1]] >= g[j]:
+                queue.pop()
+            queue.append(j)
+            # the route with only customer j + 1 is always kept, even if it exceeds the capacity
+            while queue[0] < j and loads[j + 1] - loads[queue[0]] > capacity:
+                queue.popleft()
+
+    routes = []
+    j = num_customers
+    while j > 0:
+        routes.append(giant_tour[predecessor[j] : j])
+        j = predecessor[j]
+
+    return routes[::-1]
+
+
+def giant_tour_split(
+    vrp_instance: VRPProblem, tour_order: str = "sweep", seed: int = 0
+) -> VRPSolution:
+    """
+    Orders all customers in a giant tour and splits it optimally into routes.
+    Needs no cost matrix and runs in O(n log n), hence also works for very large instances.
+    A 'seed' other than 0 starts the giant tour at a random customer
+    (e.g., at a random angle for the sweep order).
+    """
+    logging.info(f"#Constructing VRP solution with giant tour ({tour_order}) and split")
+    giant_tour = get_giant_tour(vrp_instance, tour_order)
+    if seed != 0:
+        start = random.Random(seed).randrange(len(giant_tour))
+        giant_tour = giant_tour[start:] + giant_tour[:start]
+
+    solution = VRPSolution(vrp_instance)
+    for route in split(giant_tour, vrp_instance.depot, vrp_instance.capacity):
+        solution.add_route(route)
+
+    # no validation, which would take longer than the construction for large instances:
+    # all customers are planned exactly once and routes respect the capacity by construction
+    # (apart from customers whose demand alone exceeds it)
+    return solution
@@ -0,0 +1,43 @@
+import logging
+import math
+
+from kgls.datastructure import Node, VRPProblem, VRPSolution
+
+
+def get_polar_angle(node: Node, depot: Node) -> float:
+    return math.atan2(
+        node.y_coordinate - depot.y_coordinate, node.x_coordinate - depot.x_coordinate
+    )
+
+
+def sweep(vrp_instance: VRPProblem) -> VRPSolution:
+    """
+    Sweep heuristic: customers are sorted by their polar angle around the depot and
+    are added to the current route in this order, until the capacity is exhausted.
+    Needs no cost matrix, hence also works for very large instances.
+    """
+    logging.info("#Constructing VRP solution with sweep heuristic")
+    depot = vrp_instance.depot
+    customers = sorted(
+        vrp_instance.customers, key=lambda node: get_polar_angle(node, depot)
+    )
+
+    solution = VRPSolution(vrp_instance)
+    route_nodes: list[Node] = []
+    route_volume = 0
+
+    for node in customers:
+        if route_nodes and route_volume + node.demand > vrp_instance.capacity:
+            solution.add_route(route_nodes)
+            route_nodes = []
+            route_volume = 0
+
+        route_nodes.append(node)
+        route_volume += node.demand
+
+    if route_nodes:
+        solution.add_route(route_nodes)
+
+    solution.validate()
+
+    return solution
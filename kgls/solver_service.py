@@ -0,0 +1,243 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Optional, Union
+
+from .datastructure import VRPProblem
+from .kgls import KGLS
+from .read_write import parse_vrp_instance
+from .abortion_condition import (
+    BaseAbortionCondition,
+    IterationsWithoutImprovementCondition,
+    get_abortion_condition,
+)
+
+
+class CancelledCondition(BaseAbortionCondition):
+    # Aborts the search as soon as the event is set, e.g., by the service.
+    def __init__(self, cancel_event):
+        super().__init__(0)
+        self.cancel_event = cancel_event
+        self.msg = "Stops when cancelled."
+
+    def should_abort(
+        self, iteration: int, best_iteration: int, start_time: int, best_sol_time: int
+    ) -> bool:
+        return self.cancel_event.is_set()
+
+    def get_cancel_event(self):
+        return self.cancel_event
+
+
+class EndTimeCondition(BaseAbortionCondition):
+    # Aborts the search at a point in time, e.g., the deadline of a job.
+    def __init__(self, end_time: float):
+        super().__init__(0)
+        self.end_time = end_time
+        self.msg = "Stops at the deadline of the job."
+
+    def should_abort(
+        self, iteration: int, best_iteration: int, start_time: int, best_sol_time: int
+    ) -> bool:
+        return time.time() >= self.end_time
+
+    def get_deadline(self, start_time: float) -> float:
+        return self.end_time
+
+
+def _solve(
+    vrp_instance: VRPProblem,
+    run_parameters: dict[str, Any],
+    abortions_conditions: list[BaseAbortionCondition],
+    events,
+    cancel_event,
+) -> Optional[dict[str, Any]]:
+    # executed in a worker: streams each new best solution to 'events', None marks the end
+    best_event = None
+    try:
+        if cancel_event.is_set():
+            return None
+
+        kgls = KGLS.from_problem(vrp_instance, **run_parameters)
+        kgls.set_abortions_conditions(
+            abortions_conditions + [CancelledCondition(cancel_event)]
+        )
+        for event in kgls.iterate():
+            best_event = event
+            events.put(event)
+            if cancel_event.is_set():
+                break
+    finally:
+        events.put(None)
+
+    return best_event
+
+
+class SolveJob:
+    """
+    A solve submitted to the SolverService. Iterating over 'events()' yields each new
+    best solution as soon as it is found, 'result()' waits for the best one.
+    The search stops early when the job is cancelled or its deadline has passed, also
+    within an iteration. Only the construction of the initial solution (and of the
+    cost matrix) is not interrupted.
+    """
+
+    def __init__(self, future: asyncio.Future, events, cancel_event):
+        self._future = future
+        self._events = events
+        self._cancel_event = cancel_event
+        self._deadline_handle: Optional[asyncio.TimerHandle] = None
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    async def events(self) -> AsyncIterator[dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                event = await loop.run_in_executor(None, self._events.get)
+                if event is None:
+                    break
+                yield event
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+
+    async def result(self) -> Optional[dict[str, Any]]:
+        try:
+            return await asyncio.shield(self._future)
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+        finally:
+            if self._future.done() and self._deadline_handle is not None:
+                self._deadline_handle.cancel()
+
+
+class SolverService:
+    """
+    Asyncio front end for KGLS, e.g., for web services. Instances are passed in memory,
+    either as VRPProblem or as the content of a '.vrp' file, and solved in a bounded
+    process pool, so at most 'workers' searches run at the same time.
+    With 'in_process', a thread pool is used instead, e.g., for tests.
+    """
+
+    _executor: Optional[Executor]
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        in_process: bool = False,
+        **kwargs,
+    ):
+        self.run_parameters = KGLS._get_run_parameters(**kwargs)
+        self.workers = workers or os.cpu_count()
+        self.in_process = in_process
+        self._executor = None
+        self._manager = None
+
+    def start(self):
+        if self._executor is not None:
+            return
+
+        logging.info(f"#Starting solver service with {self.workers} workers")
+        if self.in_process:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        else:
+            # queues and events which can be shared with the worker processes
+            self._manager = multiprocessing.Manager()
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def shutdown(self):
+        if self._executor is None:
+            return
+
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    async def __aenter__(self) -> "SolverService":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await asyncio.get_running_loop().run_in_executor(None, self.shutdown)
+
+    def submit(
+        self,
+        instance: Union[VRPProblem, str],
+        deadline: Optional[float] = None,
+        abortion_conditions: Optional[list[tuple[str, int]]] = None,
+        **kwargs,
+    ) -> SolveJob:
+        """
+        Start solving 'instance' and return the job without waiting for it.
+        :param instance: The problem or the content of a '.vrp' file.
+        :param deadline: Seconds after which the search is stopped, including the
+            time the job waits for a free worker.
+        :param abortion_conditions: Pairs of condition name and parameter, by default
+            the search stops after 100 iterations without improvement.
+        :param kwargs: Run parameters which differ from those of the service.
+        """
+        self.start()
+
+        if isinstance(instance, str):
+            instance = parse_vrp_instance(instance)
+        run_parameters = KGLS._get_run_parameters(**{**self.run_parameters, **kwargs})
+
+        if abortion_conditions is None:
+            abortions_conditions = [IterationsWithoutImprovementCondition(100)]
+        else:
+            abortions_conditions = [
+                get_abortion_condition(condition_name, param)
+                for condition_name, param in abortion_conditions
+            ]
+
+        if deadline is not None:
+            # also stops the local search within an iteration
+            abortions_conditions.append(EndTimeCondition(time.time() + deadline))
+
+        if self.in_process:
+            events, cancel_event = queue.Queue(), threading.Event()
+        else:
+            events, cancel_event = self._manager.Queue(), self._manager.Event()
+
+        loop = asyncio.get_running_loop()
+        future = asyncio.wrap_future(
+            self._executor.submit(
+                _solve,
+                instance,
+                run_parameters,
+                abortions_conditions,
+                events,
+                cancel_event,
+            ),
+            loop=loop,
+        )
+        job = SolveJob(future, events, cancel_event)
+        if deadline is not None:
+            job._deadline_handle = loop.call_later(deadline, job.cancel)
+
+        return job
+
+    async def solve(
+        self,
+        instance: Union[VRPProblem, str],
+        deadline: Optional[float] = None,
+        abortion_conditions: Optional[list[tuple[str, int]]] = None,
+        **kwargs,
+    ) -> Optional[dict[str, Any]]:
+        # Solve 'instance' and return the event of the best solution.
+        job = self.submit(instance, deadline, abortion_conditions, **kwargs)
+        return await job.result()
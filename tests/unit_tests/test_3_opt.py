@@ -1,4 +1,8 @@
-from kgls.local_search.operator_3_opt import search_3_opt_moves_from
+from kgls.local_search.operator_3_opt import (
+    get_first_edge_candidates,
+    search_3_opt_moves,
+    search_3_opt_moves_from,
+)
 from kgls.datastructure import Node, VRPProblem, CostEvaluator, VRPSolution
 
 
@@ -72,3 +76,99 @@ def test_search_3_opt_moves_from():
     assert found_moves
     best_move = sorted(found_moves)[0]
     assert best_move.segment == [problem.nodes[3], problem.nodes[2]]
+
+
+def test_search_3_opt_moves_first_improvement():
+    problem, _ = build_problem()
+    evaluator = CostEvaluator(problem.nodes, 4, {"neighborhood_size": 5})
+
+    # both node 1 and node 4 can be moved into the other route
+    route1 = [
+        problem.nodes[2],
+        problem.nodes[3],
+        problem.nodes[4],
+    ]
+    route2 = [
+        problem.nodes[1],
+        problem.nodes[5],
+    ]
+    solution = VRPSolution(problem)
+    solution.add_route(route1)
+    solution.add_route(route2)
+    start_nodes = [problem.nodes[1], problem.nodes[4]]
+
+    all_moves = search_3_opt_moves(solution, evaluator, start_nodes)
+    first_moves = search_3_opt_moves(solution, evaluator, start_nodes, max_moves=1)
+
+    # scanning stops after the first start node with an improving move
+    assert any(problem.nodes[1] in move.segment for move in all_moves)
+    assert any(problem.nodes[4] in move.segment for move in all_moves)
+    assert first_moves
+    assert len(first_moves) < len(all_moves)
+    assert all(problem.nodes[4] not in move.segment for move in first_moves)
+
+
+def test_get_first_edge_candidates():
+    problem, evaluator = build_problem()
+    nodes = problem.nodes
+
+    solution = VRPSolution(problem)
+    solution.add_route([nodes[1], nodes[4], nodes[3]])
+    solution.add_route([nodes[2], nodes[5]])
+
+    # the batched costs include penalties
+    evaluator.determine_edge_badness(solution.routes)
+    evaluator.enable_penalization()
+    evaluator.get_and_penalize_worst_edges(2)
+
+    candidates = get_first_edge_candidates(solution, evaluator, problem.customers)
+
+    # same candidates in the same order as a sequential evaluation of each move start
+    expected = []
+    for start_node in problem.customers:
+        from_route = solution.route_of(start_node)
+        for segment_direction in [0, 1]:
+            for insert_direction in [0, 1]:
+                for insert_next_to, _ in evaluator.get_neighborhood_with_costs(
+                    start_node
+                ):
+                    to_route = solution.route_of(insert_next_to)
+                    if to_route == from_route:
+                        continue
+                    segment_1_prev = solution.neighbour(
+                        start_node, 1 - segment_direction
+                    )
+                    insert_next_to_2 = solution.neighbour(
+                        insert_next_to, insert_direction
+                    )
+                    improvement = (
+                        evaluator.get_distance(start_node, segment_1_prev)
+                        + evaluator.get_distance(insert_next_to, insert_next_to_2)
+                        - evaluator.get_distance(start_node, insert_next_to)
+                    )
+                    if improvement > 0:
+                        expected.append(
+                            (
+                                start_node,
+                                segment_direction,
+                                insert_direction,
+                                insert_next_to,
+                                insert_next_to_2,
+                                to_route,
+                                improvement,
+                            )
+                        )
+
+    assert candidates
+    assert candidates == expected
+
+    # evaluating all start nodes at once finds the same moves as one at a time
+    batch_moves = search_3_opt_moves(solution, evaluator, problem.customers)
+    single_moves = sorted(
+        move
+        for start_node in problem.customers
+        for move in search_3_opt_moves_from(solution, evaluator, start_node)
+    )
+    assert [
+        (move.segment, move.move_after, move.improvement) for move in batch_moves
+    ] == [(move.segment, move.move_after, move.improvement) for move in single_moves]
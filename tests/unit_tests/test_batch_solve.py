@@ -0,0 +1,53 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from kgls import solve_many
+from kgls.batch_solve import _get_dimension
+
+instance_path = os.path.join(
+    Path(__file__).resolve().parents[2], "examples", "run_benchmark", "instances"
+)
+instance_files = [
+    os.path.join(instance_path, instance)
+    for instance in ["X-n101-k25.vrp", "X-n110-k13.vrp", "X-n106-k14.vrp"]
+]
+
+
+def test_get_dimension(tmp_path):
+    assert [_get_dimension(file) for file in instance_files] == [101, 110, 106]
+
+    instance_file = tmp_path / "no_dimension.vrp"
+    instance_file.write_text("NAME : test\nNODE_COORD_SECTION\n1 0 0\n")
+    with pytest.raises(ValueError):
+        _get_dimension(str(instance_file))
+
+
+def test_solve_many():
+    results = solve_many(
+        instance_files,
+        workers=2,
+        per_instance_budget=1,
+        large_instance_size=105,
+        max_large_instances=1,
+    )
+
+    # results are in the order of the instances
+    assert [result["instance"] for result in results] == [
+        "X-n101-k25.vrp",
+        "X-n110-k13.vrp",
+        "X-n106-k14.vrp",
+    ]
+    for result in results:
+        assert result["gap"] is not None
+        assert result["run_time"] < 3
+        assert "segment_move" in result["operator_run_times"]
+
+
+def test_solve_many_abortion_conditions():
+    results = solve_many(
+        instance_files[:2], workers=2, abortion_conditions=[("max_iterations", 2)]
+    )
+
+    assert [result["iterations"] for result in results] == [2, 2]
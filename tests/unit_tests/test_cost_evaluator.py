@@ -1,34 +1,55 @@
 from kgls.datastructure import Node, Edge, VRPProblem, VRPSolution, CostEvaluator
 
 
+def get_edge_width(nodes: list[Node]) -> float:
+    # width of the edge between the two customers of the route D-1-2-D
+    problem = VRPProblem(nodes, 4)
+    evaluator = CostEvaluator(nodes, 4, {"neighborhood_size": 5})
+    solution = VRPSolution(problem)
+    solution.add_route(nodes[1:])
+
+    _, widths, _ = evaluator._get_route_edge_values(solution.routes[0])
+    return widths[1]
+
+
 def test_compute_edge_width_perpendicular():
     depot = Node(0, 10, 10, 0, True)
     customers = [Node(1, 0, 0, 1, False), Node(2, 0, 20, 1, False)]
-    nodes = [depot] + customers
-
-    evaluator = CostEvaluator(nodes, 4, {"neighborhood_size": 5})
-    center_x, center_y = evaluator._compute_route_center(nodes)
-
-    width = evaluator._compute_edge_width(
-        Edge(customers[0], customers[1]), center_x, center_y, depot
-    )
 
-    assert width == 20.0
+    assert get_edge_width([depot] + customers) == 20.0
 
 
 def test_compute_edge_width_line():
     depot = Node(0, 10, 10, 0, True)
     customers = [Node(1, 20, 10, 1, False), Node(2, 30, 10, 1, False)]
+
+    assert get_edge_width([depot] + customers) == 0.0
+
+
+def test_route_edge_values():
+    depot = Node(0, 10, 10, 0, True)
+    customers = [
+        Node(1, 0, 0, 1, False),
+        Node(2, 0, 20, 1, False),
+        Node(3, 30, 15, 1, False),
+    ]
     nodes = [depot] + customers
 
-    evaluator = CostEvaluator(nodes, 4, {"neighborhood_size": 5})
-    center_x, center_y = evaluator._compute_route_center(nodes)
+    problem = VRPProblem(nodes, 3)
+    evaluator = CostEvaluator(nodes, 5, {"neighborhood_size": 5})
 
-    width = evaluator._compute_edge_width(
-        Edge(customers[0], customers[1]), center_x, center_y, depot
-    )
+    solution = VRPSolution(problem)
+    solution.add_route(customers)
+    route = solution.routes[0]
 
-    assert width == 0.0
+    edge_ids, widths, lengths = evaluator._get_route_edge_values(route)
+
+    # the route center is (10, 11.25), so the widths are the differences of the
+    # x coordinates, measured from the vertical line through depot and center
+    for idx, edge in enumerate(route.edges):
+        assert edge_ids[idx] == evaluator._get_edge_id(edge)
+        assert lengths[idx] == evaluator.get_distance(*edge.nodes)
+    assert widths == [10, 0, 30, 20]
 
 
 def test_determine_edge_badness():
@@ -66,3 +87,223 @@ def test_determine_edge_badness():
     edge = evaluator.get_and_penalize_worst_edge()
     assert edge == Edge(nodes[1], nodes[2])
     assert edge.value == 10
+
+
+def test_get_and_penalize_worst_edges():
+    depot = Node(0, 0, 0, 0, True)
+    customers = [
+        Node(1, 10, 0, 1, False),
+        Node(2, 30, 0, 1, False),
+        Node(3, 60, 0, 1, False),
+    ]
+    nodes = [depot] + customers
+
+    problem = VRPProblem(nodes, 3)
+    evaluator = CostEvaluator(nodes, 5, {"neighborhood_size": 5})
+
+    solution = VRPSolution(problem)
+    solution.add_route(customers)
+
+    evaluator.determine_edge_badness(solution.routes)
+    evaluator.determine_edge_badness(solution.routes)
+
+    # one at a time, Edge(3, 0) would be the worst edge again after Edge(2, 3)
+    edges = evaluator.get_and_penalize_worst_edges(3)
+    assert edges == [
+        Edge(nodes[3], nodes[0]),
+        Edge(nodes[2], nodes[3]),
+        Edge(nodes[1], nodes[2]),
+    ]
+    assert [edge.value for edge in edges] == [30, 15, 10]
+
+    # the penalized edges are ranked again
+    assert evaluator.get_and_penalize_worst_edge() == Edge(nodes[3], nodes[0])
+
+    # at most all edges of the solution
+    assert len(evaluator.get_and_penalize_worst_edges(10)) == 4
+
+
+def test_determine_edge_badness_after_route_change():
+    depot = Node(0, 0, 0, 0, True)
+    customers = [
+        Node(1, 10, 0, 1, False),
+        Node(2, 30, 0, 1, False),
+        Node(3, 60, 0, 1, False),
+    ]
+    nodes = [depot] + customers
+
+    problem = VRPProblem(nodes, 3)
+    evaluator = CostEvaluator(nodes, 5, {"neighborhood_size": 5})
+
+    solution = VRPSolution(problem)
+    solution.add_route(customers)
+
+    evaluator.determine_edge_badness(solution.routes)
+    evaluator.determine_edge_badness(solution.routes)
+    assert evaluator.get_and_penalize_worst_edge() == Edge(nodes[3], nodes[0])
+
+    solution.remove_nodes([customers[2]])
+
+    # cycle back to length as criterium, only the changed route is re-ranked
+    for _ in range(3):
+        evaluator.determine_edge_badness(solution.routes)
+
+    edge = evaluator.get_and_penalize_worst_edge()
+    assert edge == Edge(nodes[2], nodes[0])
+    assert edge.value == 15
+
+    edge = evaluator.get_and_penalize_worst_edge()
+    assert edge == Edge(nodes[1], nodes[2])
+    assert edge.value == 10
+
+
+def test_may_improve_route():
+    depot = Node(0, 0, 0, 0, True)
+    customers = [
+        Node(1, 10, 0, 1, False),
+        Node(2, 11, 0, 1, False),
+        Node(3, 100, 0, 1, False),
+        Node(4, 101, 0, 1, False),
+    ]
+    nodes = [depot] + customers
+
+    problem = VRPProblem(nodes, 5)
+    evaluator = CostEvaluator(nodes, 5, {"neighborhood_size": 3})
+
+    solution = VRPSolution(problem)
+    solution.add_route(customers[2:])
+    far_route = solution.routes[0]
+
+    assert far_route.max_edge_length == 1
+    assert far_route.depot_edges == ((customers[2], 100), (customers[3], 101))
+
+    # removing the depot edge (100) of Node3 and connecting Node1 to Node3 (90)
+    # requires a gain of more than -10
+    assert not evaluator.may_improve_route(customers[0], -20, far_route, customers[2])
+    assert evaluator.may_improve_route(customers[0], 1, far_route, customers[2])
+
+    # geometry is updated when the route changes
+    solution.remove_nodes([customers[3]])
+    assert far_route.max_edge_length == 0
+    assert far_route.depot_edges == ((customers[2], 100), (customers[2], 100))
+
+
+def test_may_improve_route_ignores_far_depot_edges():
+    depot = Node(0, 0, 0, 0, True)
+    customers = [
+        Node(1, 10, 0, 1, False),
+        Node(2, 55, 0, 1, False),
+        Node(3, 100, 0, 1, False),
+        Node(4, 0, 60, 1, False),
+    ]
+    nodes = [depot] + customers
+
+    problem = VRPProblem(nodes, 5)
+    evaluator = CostEvaluator(nodes, 5, {"neighborhood_size": 3})
+
+    solution = VRPSolution(problem)
+    solution.add_route(customers[:3])
+    route = solution.routes[0]
+
+    # the route has a depot edge of 100, but Node4 is far from the customer at its end
+    assert route.max_edge_length == 45
+    assert not evaluator.may_improve_route(customers[3], 0, route, customers[0])
+    # a larger gain allows removing the depot edge of Node3
+    assert evaluator.may_improve_route(customers[3], 20, route, customers[0])
+
+
+def test_neighborhood_costs_follow_penalties():
+    depot = Node(0, 0, 0, 0, True)
+    customers = [
+        Node(1, 10, 0, 1, False),
+        Node(2, 30, 0, 1, False),
+        Node(3, 60, 0, 1, False),
+    ]
+    nodes = [depot] + customers
+
+    problem = VRPProblem(nodes, 3)
+    evaluator = CostEvaluator(nodes, 5, {"neighborhood_size": 2})
+
+    solution = VRPSolution(problem)
+    solution.add_route(customers)
+
+    assert list(evaluator.get_neighborhood_with_costs(customers[1])) == [
+        (customers[0], 20),
+        (customers[2], 30),
+    ]
+
+    # penalize edge 2-3 (the longest edge between customers)
+    evaluator.determine_edge_badness(solution.routes)
+    evaluator.determine_edge_badness(solution.routes)
+    evaluator.enable_penalization()
+    evaluator.get_and_penalize_worst_edge()
+    edge = evaluator.get_and_penalize_worst_edge()
+    assert edge == Edge(customers[1], customers[2])
+
+    penalized_costs = evaluator.get_distance(customers[1], customers[2])
+    assert penalized_costs > 30
+    assert evaluator.get_neighborhood_costs(customers[1])[1] == penalized_costs
+    assert evaluator.get_neighborhood_costs(customers[2])[0] == penalized_costs
+
+    evaluator.disable_penalization()
+    assert evaluator.get_neighborhood_costs(customers[1]) == [20, 30]
+
+
+def test_penalty_policies():
+    depot = Node(0, 0, 0, 0, True)
+    customers = [
+        Node(1, 10, 0, 1, False),
+        Node(2, 30, 0, 1, False),
+        Node(3, 60, 0, 1, False),
+    ]
+    nodes = [depot] + customers
+
+    problem = VRPProblem(nodes, 3)
+    evaluator = CostEvaluator(
+        nodes,
+        5,
+        {"neighborhood_size": 5, "penalty_policy": "lru", "max_penalized_edges": 1},
+    )
+    evaluator.enable_penalization()
+
+    solution = VRPSolution(problem)
+    solution.add_route(customers)
+    evaluator.determine_edge_badness(solution.routes)
+    evaluator.determine_edge_badness(solution.routes)
+
+    assert evaluator.get_and_penalize_worst_edge() == Edge(nodes[3], nodes[0])
+    assert evaluator.get_distance(nodes[3], nodes[0]) > 60
+    assert evaluator.get_and_penalize_worst_edge() == Edge(nodes[2], nodes[3])
+
+    # the penalty of the least recently penalized edge is dropped
+    assert evaluator.num_penalized_edges == 1
+    assert evaluator.get_distance(nodes[3], nodes[0]) == 60
+    assert evaluator.get_distance(nodes[2], nodes[3]) > 30
+
+    evaluator.decay_penalties()
+    assert evaluator.num_penalized_edges == 0
+    assert evaluator.get_distance(nodes[2], nodes[3]) == 30
+    assert evaluator.get_neighborhood_costs(customers[2])[0] == 30
+    assert evaluator._max_penalty_surcharge == 0
+
+
+def test_set_active_neighborhood_size():
+    depot = Node(0, 0, 0, 0, True)
+    customers = [
+        Node(1, 10, 0, 1, False),
+        Node(2, 30, 0, 1, False),
+        Node(3, 60, 0, 1, False),
+    ]
+    nodes = [depot] + customers
+    evaluator = CostEvaluator(nodes, 5, {"neighborhood_size": 2})
+
+    evaluator.set_active_neighborhood_size(1)
+    assert evaluator.get_neighborhood(customers[1]) == [customers[0]]
+    assert list(evaluator.get_neighborhood_with_costs(customers[1])) == [
+        (customers[0], 20)
+    ]
+
+    # cannot exceed the precomputed neighborhood
+    evaluator.set_active_neighborhood_size(5)
+    assert evaluator.active_neighborhood_size == 2
+    assert evaluator.get_neighborhood(customers[1]) == [customers[0], customers[2]]
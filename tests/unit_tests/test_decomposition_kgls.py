@@ -0,0 +1,62 @@
+import os
+from pathlib import Path
+
+from kgls import DecompositionKGLS
+from kgls.decomposition_kgls import group_routes_by_angle
+from kgls.datastructure import Node, VRPProblem
+from kgls.solution_construction import sweep
+
+instance_path = os.path.join(
+    Path(__file__).resolve().parents[2], "examples", "simple_run", "instances"
+)
+
+
+def test_sweep():
+    depot = Node(0, 0, 0, 0, True)
+    customers = [
+        Node(1, 10, 1, 1, False),
+        Node(2, -10, 1, 1, False),
+        Node(3, 10, 2, 1, False),
+        Node(4, -10, 2, 1, False),
+    ]
+    problem = VRPProblem([depot] + customers, 2)
+
+    solution = sweep(problem)
+
+    # customers are sorted by polar angle, routes are filled up to the capacity
+    assert [route.print() for route in solution.routes] == ["0-1-3-0", "0-4-2-0"]
+
+
+def test_group_routes_by_angle():
+    depot = Node(0, 0, 0, 0, True)
+    # one route in each quadrant, in the order of their angles
+    routes = [
+        [Node(1, 10, 10, 1, False)],
+        [Node(2, -10, 10, 1, False), Node(3, -10, 12, 1, False)],
+        [Node(4, -10, -10, 1, False)],
+        [Node(5, 10, -10, 1, False)],
+    ]
+
+    def get_ids(groups):
+        return [[route[0].node_id for route in group] for group in groups]
+
+    assert get_ids(group_routes_by_angle(routes[::-1], depot, 2)) == [[4, 5], [1, 2]]
+    # shifted group boundaries
+    assert get_ids(group_routes_by_angle(routes, depot, 2, shift=1)) == [[5, 1], [2, 4]]
+
+
+def test_decomposition_kgls():
+    decomposition_kgls = DecompositionKGLS(
+        os.path.join(instance_path, "X-n101-k25.vrp"),
+        workers=2,
+        routes_per_group=5,
+        iterations_per_group=2,
+    )
+    decomposition_kgls.set_abortion_condition("max_iterations", 2)
+    decomposition_kgls.run()
+
+    decomposition_kgls.best_solution.validate()
+    costs = [stats["costs"] for stats in decomposition_kgls.run_stats]
+    assert len(costs) == 2
+    assert costs[1] <= costs[0]
+    assert decomposition_kgls.best_found_solution_value == costs[-1]
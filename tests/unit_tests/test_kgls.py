@@ -0,0 +1,139 @@
+import os
+import pickle
+from pathlib import Path
+
+import pytest
+
+from kgls import KGLS
+from kgls.checkpoint import CheckpointWriter
+from kgls.kgls import POSITIVE_PARAMETERS
+from kgls.datastructure import CostEvaluator
+from kgls.read_write import read_vrp_instance
+
+instance_path = os.path.join(
+    Path(__file__).resolve().parents[2], "examples", "simple_run", "instances"
+)
+
+
+@pytest.mark.parametrize("parameter", POSITIVE_PARAMETERS)
+def test_positive_parameters(parameter):
+    # e.g., intervals which are used as modulus during the run
+    with pytest.raises(ValueError):
+        KGLS._get_run_parameters(**{parameter: 0})
+    KGLS._get_run_parameters(**{parameter: 1})
+
+
+def test_iterate():
+    kgls = KGLS(os.path.join(instance_path, "X-n101-k25.vrp"))
+    kgls.set_abortion_condition("max_iterations", 5)
+
+    events = list(kgls.iterate())
+
+    # each event is a new best solution
+    costs = [event["costs"] for event in events]
+    assert costs == sorted(costs, reverse=True)
+    assert len(set(costs)) == len(costs)
+    assert costs[-1] == kgls.best_found_solution_value
+    for event in events:
+        event["solution"].validate()
+        assert event["gap"] is not None
+
+
+def test_iterate_stops_early():
+    kgls = KGLS(os.path.join(instance_path, "X-n101-k25.vrp"))
+    kgls.set_abortion_condition("max_iterations", 1000)
+
+    for event in kgls.iterate():
+        if event["iteration"] >= 1:
+            break
+
+    assert kgls.iterations < 1000
+
+
+def test_resume_from_checkpoint(tmp_path):
+    checkpoint_file = str(tmp_path / "kgls.checkpoint")
+    kgls = KGLS(os.path.join(instance_path, "X-n101-k25.vrp"))
+    kgls.set_abortion_condition("max_iterations", 6)
+    kgls.set_checkpoint(checkpoint_file, 4)
+    kgls.run()
+
+    # the checkpoint of iteration 4 is left, as if the run had died afterwards
+    # (while writing the run stats of the next checkpoint)
+    with open(f"{checkpoint_file}.stats", "ab") as file:
+        file.write(b"incomplete row")
+    resumed_kgls = KGLS.resume(checkpoint_file)
+
+    assert resumed_kgls.iterations == 6
+    # the resumed run continues on the same trajectory
+    assert [
+        (stats["iteration"], stats["costs"]) for stats in resumed_kgls.run_stats
+    ] == [(stats["iteration"], stats["costs"]) for stats in kgls.run_stats]
+    assert resumed_kgls.best_found_solution_value == kgls.best_found_solution_value
+    resumed_kgls.best_solution.validate()
+
+
+def test_checkpoint_writes_problem_once(tmp_path, monkeypatch):
+    checkpoint_file = str(tmp_path / "kgls.checkpoint")
+    dumped_files = []
+    dump = CheckpointWriter._dump
+
+    def record_dump(obj, path_to_file):
+        dumped_files.append(os.path.basename(path_to_file))
+        dump(obj, path_to_file)
+
+    monkeypatch.setattr(CheckpointWriter, "_dump", staticmethod(record_dump))
+
+    kgls = KGLS(os.path.join(instance_path, "X-n101-k25.vrp"))
+    kgls.set_abortion_condition("max_iterations", 8)
+    kgls.set_checkpoint(checkpoint_file, 2)
+    kgls.run()
+
+    # the problem is written with the first checkpoint only
+    assert dumped_files.count("kgls.checkpoint.problem") == 1
+    assert dumped_files.count("kgls.checkpoint") == 4
+    with open(checkpoint_file, "rb") as file:
+        state = pickle.load(file)
+    assert "problem" not in state
+    # the run stats rows are appended, each checkpoint only adds its new rows
+    assert 0 < state["num_run_stats_rows"] <= len(kgls.run_stats)
+    assert os.path.getsize(f"{checkpoint_file}.stats") == state[
+        "num_run_stats_rows"
+    ] * 8 * len(kgls.run_stats[0])
+
+
+def test_penalties_do_not_copy_cost_rows():
+    kgls = KGLS(os.path.join(instance_path, "X-n101-k25.vrp"))
+    cost_rows = dict(kgls._cost_evaluator._costs)
+    kgls.set_abortion_condition("max_iterations", 10)
+    kgls.run()
+
+    evaluator = kgls._cost_evaluator
+    assert evaluator.num_penalized_edges > 0
+    # all rows are still the euclidean costs, penalties are stored per edge
+    assert all(evaluator._costs[node_id] is row for node_id, row in cost_rows.items())
+    num_penalized_costs = sum(len(row) for row in evaluator._penalized_costs.values())
+    assert num_penalized_costs <= 2 * evaluator.num_penalized_edges
+
+
+def test_reuse_cost_evaluator():
+    vrp_instance = read_vrp_instance(os.path.join(instance_path, "X-n101-k25.vrp"))
+    cost_evaluator = CostEvaluator(
+        vrp_instance.nodes, vrp_instance.capacity, {"neighborhood_size": 20}
+    )
+
+    costs = []
+    for _ in range(2):
+        kgls = KGLS.from_problem(vrp_instance, cost_evaluator, neighborhood_size=10)
+        kgls.set_abortion_condition("max_iterations", 3)
+        kgls.run()
+        costs.append([stats["costs"] for stats in kgls.run_stats])
+
+    # penalties of the first run do not influence the second run
+    kgls = KGLS.from_problem(vrp_instance, neighborhood_size=10)
+    kgls.set_abortion_condition("max_iterations", 3)
+    kgls.run()
+    assert costs == 2 * [[stats["costs"] for stats in kgls.run_stats]]
+
+    with pytest.raises(ValueError):
+        KGLS.from_problem(vrp_instance, cost_evaluator, neighborhood_size=30)
+
@@ -0,0 +1,111 @@
+import os
+from pathlib import Path
+
+from kgls import KGLS, MultilevelKGLS
+from kgls.datastructure import CostEvaluator, Node, VRPProblem, VRPSolution
+
+instance_path = os.path.join(
+    Path(__file__).resolve().parents[2], "examples", "simple_run", "instances"
+)
+
+
+def test_coarsen_and_uncoarsen():
+    multilevel_kgls = MultilevelKGLS(os.path.join(instance_path, "X-n101-k25.vrp"))
+
+    depot = Node(1, 0, 0, 0, True)
+    customers = [
+        Node(2, 10, 0, 1, False),
+        Node(3, 20, 0, 2, False),
+        Node(4, 30, 0, 1, False),
+        Node(5, 0, 10, 1, False),
+    ]
+    problem = VRPProblem([depot] + customers, 8)
+    solution = VRPSolution(problem)
+    solution.add_route(customers[:3])
+    solution.add_route(customers[3:])
+
+    coarse_level, coarse_solution = multilevel_kgls._coarsen(solution, {(2, 3), (3, 4)})
+
+    # path 2-3-4 is merged into one super-node
+    assert [route.print() for route in coarse_solution.routes] == ["1-2-1", "1-5-1"]
+    super_node = coarse_solution.routes[0].customers[0]
+    assert super_node.demand == 4
+    assert (super_node.x_coordinate, super_node.y_coordinate) == (20, 0)
+
+    fine_solution = multilevel_kgls._uncoarsen(coarse_solution, coarse_level, problem)
+    assert [route.print() for route in fine_solution.routes] == [
+        "1-2-3-4-1",
+        "1-5-1",
+    ]
+
+
+def test_coarsen_limits_super_node_demand():
+    multilevel_kgls = MultilevelKGLS(
+        os.path.join(instance_path, "X-n101-k25.vrp"), max_super_node_load=0.5
+    )
+
+    depot = Node(1, 0, 0, 0, True)
+    customers = [
+        Node(2, 10, 0, 2, False),
+        Node(3, 20, 0, 2, False),
+        Node(4, 30, 0, 2, False),
+    ]
+    problem = VRPProblem([depot] + customers, 8)
+    solution = VRPSolution(problem)
+    solution.add_route(customers)
+
+    coarse_level, coarse_solution = multilevel_kgls._coarsen(solution, {(2, 3), (3, 4)})
+
+    # a super-node may carry at most half of the capacity
+    assert [route.print() for route in coarse_solution.routes] == ["1-2-4-1"]
+    assert [node.demand for node in coarse_solution.routes[0].customers] == [4, 2]
+
+
+def test_multilevel_kgls():
+    multilevel_kgls = MultilevelKGLS(
+        os.path.join(instance_path, "X-n101-k25.vrp"), levels=2, optima_per_level=2
+    )
+    multilevel_kgls.set_abortion_condition("max_iterations", 2)
+    multilevel_kgls.run()
+
+    multilevel_kgls.best_solution.validate()
+    assert multilevel_kgls.best_found_gap is not None
+
+
+def test_multilevel_kgls_builds_each_cost_matrix_once(monkeypatch):
+    num_nodes = []
+    init = CostEvaluator.__init__
+
+    def record_init(self, nodes, *args, **kwargs):
+        num_nodes.append(len(nodes))
+        init(self, nodes, *args, **kwargs)
+
+    monkeypatch.setattr(CostEvaluator, "__init__", record_init)
+
+    cost_evaluators = []
+    from_problem = KGLS.from_problem
+
+    def record_from_problem(vrp_instance, cost_evaluator=None, **kwargs):
+        cost_evaluators.append(cost_evaluator)
+        return from_problem(vrp_instance, cost_evaluator, **kwargs)
+
+    monkeypatch.setattr(KGLS, "from_problem", record_from_problem)
+
+    multilevel_kgls = MultilevelKGLS(
+        os.path.join(instance_path, "X-n101-k25.vrp"),
+        levels=2,
+        optima_per_level=2,
+        routes_per_group=5,
+    )
+    assert num_nodes == []
+
+    multilevel_kgls.set_abortion_condition("max_iterations", 2)
+    multilevel_kgls.run()
+
+    # the full instance only for the final refinement, after the groups and levels
+    assert num_nodes.count(101) == 1
+    assert num_nodes[-1] == 101
+    assert max(num_nodes[:-1]) < 101
+    # the coarsest level is solved with the evaluator built when coarsening
+    assert cost_evaluators[0] is not None
+    multilevel_kgls.best_solution.validate()
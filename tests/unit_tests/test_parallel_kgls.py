@@ -0,0 +1,81 @@
+import os
+import time
+from pathlib import Path
+
+from kgls import KGLS, ParallelKGLS
+from kgls.datastructure import Node, VRPProblem, VRPSolution
+from kgls.elite_store import EliteStore
+
+instance_path = os.path.join(
+    Path(__file__).resolve().parents[2], "examples", "simple_run", "instances"
+)
+
+
+def test_parallel_kgls():
+    parallel_kgls = ParallelKGLS(
+        os.path.join(instance_path, "X-n101-k25.vrp"), workers=2, num_runs=3
+    )
+    parallel_kgls.set_abortion_condition("max_iterations", 2)
+
+    best_solution, run_stats = parallel_kgls.run()
+
+    assert [stats["seed"] for stats in run_stats] == [0, 1, 2]
+    assert all(stats["iterations"] == 2 for stats in run_stats)
+    assert parallel_kgls.best_found_solution_value == min(
+        stats["costs"] for stats in run_stats
+    )
+    best_solution.validate()
+
+
+def test_elite_store():
+    depot = Node(0, 0, 0, 0, True)
+    customers = [Node(idx, idx, idx, 1, False) for idx in range(1, 5)]
+    problem = VRPProblem([depot] + customers, 2)
+
+    solution = VRPSolution(problem)
+    solution.add_route(customers[:2])
+    solution.add_route(customers[2:][::-1])
+
+    elite_store = EliteStore(len(problem.nodes))
+    assert elite_store.publish(solution, 100)
+    assert not elite_store.publish(solution, 120)
+
+    assert elite_store.get_better_solution(100, problem) is None
+    elite_solution = elite_store.get_better_solution(110, problem)
+    assert [route.print() for route in elite_solution.routes] == [
+        "0-1-2-0",
+        "0-4-3-0",
+    ]
+
+
+def test_adopted_elite_solution_keeps_stats():
+    kgls = KGLS(os.path.join(instance_path, "X-n101-k25.vrp"))
+    kgls.set_abortion_condition("max_iterations", 2)
+    kgls.run()
+    operator_run_times = kgls.operator_run_times
+
+    # another island found a better solution, while this one stagnates
+    elite_store = EliteStore(len(kgls._vrp_instance.nodes))
+    elite_store.publish(kgls.best_solution, kgls.best_found_solution_value - 1)
+    kgls.set_elite_store(elite_store, 1)
+    kgls._best_iteration = kgls._iteration - 1
+    previous_solution = kgls._cur_solution
+
+    kgls._exchange_elite_solution(time.time())
+
+    assert kgls._cur_solution is not previous_solution
+    assert kgls.operator_run_times == operator_run_times
+
+
+def test_parallel_kgls_islands():
+    parallel_kgls = ParallelKGLS(
+        os.path.join(instance_path, "X-n101-k25.vrp"),
+        workers=2,
+        exchange_interval=1,
+    )
+    parallel_kgls.set_abortion_condition("max_iterations", 3)
+
+    best_solution, run_stats = parallel_kgls.run()
+
+    assert len(run_stats) == 2
+    best_solution.validate()
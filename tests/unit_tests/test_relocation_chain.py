@@ -1,4 +1,8 @@
-from kgls.local_search.operator_relocation_chain import search_relocation_chains
+from kgls.local_search.operator_relocation_chain import (
+    RelocationChain,
+    find_insertions,
+    search_relocation_chains,
+)
 from kgls.datastructure import Node, VRPProblem, CostEvaluator, VRPSolution
 
 
@@ -62,3 +66,54 @@ def test_search_relocation_chains():
     assert relocations[1].move_after == problem.nodes[0]
     assert relocations[0].improvement == 90
     assert relocations[1].improvement == 180
+
+
+def test_find_insertions():
+    problem, evaluator = build_problem()
+    nodes = problem.nodes
+
+    solution = VRPSolution(problem)
+    solution.add_route([nodes[1], nodes[4], nodes[2]])
+    solution.add_route([nodes[5], nodes[3], nodes[6]])
+
+    node_to_move = nodes[3]
+    removal_gain = (
+        evaluator.get_distance(nodes[5], node_to_move)
+        + evaluator.get_distance(node_to_move, nodes[6])
+        - evaluator.get_distance(nodes[5], nodes[6])
+    )
+    candidates = [
+        (neighbour, added_costs)
+        for neighbour, added_costs in evaluator.get_neighborhood_with_costs(
+            node_to_move
+        )
+        if solution.route_of(neighbour) != solution.route_of(node_to_move)
+    ]
+
+    relocations = find_insertions(
+        node_to_move, removal_gain, candidates, RelocationChain(), solution, evaluator
+    )
+
+    # same insertions as evaluating each candidate position on its own
+    expected = []
+    for insert_next_to, _ in candidates:
+        options = [
+            (solution.prev(insert_next_to), insert_next_to),
+            (insert_next_to, solution.next(insert_next_to)),
+        ]
+        improvements = [
+            removal_gain
+            - evaluator.get_distance(insert_after, node_to_move)
+            - evaluator.get_distance(node_to_move, insert_before)
+            + evaluator.get_distance(insert_after, insert_before)
+            for insert_after, insert_before in options
+        ]
+        best = 0 if improvements[0] >= improvements[1] else 1
+        if improvements[best] > 0:
+            expected.append((*options[best], improvements[best]))
+
+    assert relocations
+    assert [
+        (relocation.move_after, relocation.move_before, relocation.improvement)
+        for relocation in relocations
+    ] == expected
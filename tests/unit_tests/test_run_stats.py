@@ -0,0 +1,22 @@
+import math
+
+from kgls.run_stats import RunStats
+
+
+def test_run_stats(tmp_path):
+    run_stats = RunStats()
+    best_costs = [100, 90, 90, 90, 90, 90, 90, 80, 80, 80, 80]
+    for iteration, costs in enumerate(best_costs):
+        run_stats.append(0.1 * iteration, iteration, costs, costs, None)
+    run_stats.flush()
+
+    # improvements, iterations 1, 2, 4 after an improvement and the last iteration
+    assert [stats["iteration"] for stats in run_stats] == [0, 1, 2, 3, 5, 7, 8, 9, 10]
+    assert math.isnan(run_stats[0]["best_gap"])
+    assert run_stats.last_run_time == 1.0
+
+    csv_file = tmp_path / "run_stats.csv"
+    run_stats.to_csv(str(csv_file))
+    lines = csv_file.read_text().splitlines()
+    assert lines[0] == "run_time,iteration,costs,best_costs,best_gap"
+    assert len(lines) == len(run_stats) + 1
@@ -1,8 +1,21 @@
-from kgls.datastructure import Node, VRPProblem, CostEvaluator
+import os
+from pathlib import Path
+
+import pytest
+
+from kgls.datastructure import Node, VRPProblem, VRPSolution, CostEvaluator
+from kgls.read_write import read_vrp_instance
 from kgls.solution_construction.savings_algorithm import (
     compute_savings,
+    compute_savings_of_pairs,
     compute_weighted_savings,
     clark_wright_parallel,
+    clark_wright_route_reduction,
+    randomize_savings,
+)
+
+instance_path = os.path.join(
+    Path(__file__).resolve().parents[2], "examples", "simple_run", "instances"
 )
 
 
@@ -58,3 +71,185 @@ def test_compute_weighted_savings():
     assert savings[0].saving == 2.0  # Node2 to Node3
     assert savings[1].saving == 1.8  # Node1 to Node3
     assert savings[2].saving == 1.6  # Node1 to Node3
+
+
+def test_randomized_construction():
+    depot = Node(0, 0, 0, 0, True)
+    customers = [Node(idx, idx % 4, idx // 4, 1, False) for idx in range(1, 13)]
+    nodes = [depot] + customers
+    problem = VRPProblem(nodes, 4)
+    evaluator = CostEvaluator(nodes, 4, {"neighborhood_size": 5})
+
+    solutions = [
+        clark_wright_route_reduction(problem, evaluator, seed=seed) for seed in range(4)
+    ]
+
+    for solution in solutions:
+        solution.validate()
+        assert sum(route.size for route in solution.routes) == len(customers)
+    # different seeds construct different solutions
+    assert len({evaluator.get_solution_costs(sol) for sol in solutions}) > 1
+
+
+def test_savings_of_neighbors_only():
+    depot = Node(0, 0, 0, 0, True)
+    customers = [
+        Node(1, 0, 10, 1, False),
+        Node(2, 0, 11, 1, False),
+        Node(3, 10, 0, 1, False),
+        Node(4, 10, 1, 1, False),
+    ]
+    nodes = [depot] + customers
+    evaluator = CostEvaluator(nodes, 5, {"neighborhood_size": 1})
+
+    savings = compute_savings(customers, depot, evaluator)
+
+    # each customer only has its nearest neighbor
+    assert len(savings) == 2
+    assert list(savings) == [
+        (customers[0], customers[1]),
+        (customers[2], customers[3]),
+    ]
+    assert [savings[0].saving, savings[1].saving] == [20, 19]
+
+    # weighted savings are computed for the same pairs
+    assert len(compute_weighted_savings(customers, depot, evaluator, savings)) == 2
+
+
+def test_merge_customers_without_feasible_neighbor():
+    depot = Node(0, 0, 0, 0, True)
+    customers = [
+        Node(1, 0, 10, 2, False),
+        Node(2, 0, 11, 1, False),
+        Node(3, 0, 13, 3, False),
+        Node(4, 10, 0, 2, False),
+        Node(5, 11, 0, 1, False),
+        Node(6, 13, 0, 3, False),
+    ]
+    problem = VRPProblem([depot] + customers, 4)
+    evaluator = CostEvaluator(problem.nodes, 4, {"neighborhood_size": 1})
+
+    # the only neighbors of customers 1 and 4 end up on full routes
+    savings = compute_savings(customers, depot, evaluator)
+    assert (customers[0], customers[3]) not in list(savings)
+
+    solution = clark_wright_parallel(problem, evaluator)
+    solution.validate()
+
+    # customers 1 and 4 are still merged into one route
+    assert sorted(
+        [node.node_id for node in route.customers]
+        for route in solution.routes
+        if route.size > 0
+    ) == [[1, 4], [2, 3], [5, 6]]
+
+
+def merge_routes_with_node_lists(
+    vrp_instance, evaluator, get_ranked_savings
+) -> VRPSolution:
+    # the merge loop before customers and routes were tracked by index
+    customers, depot = vrp_instance.customers, vrp_instance.depot
+    not_planned = customers.copy()
+    can_be_extended = []
+    cannot_be_extended = []
+    solution = VRPSolution(vrp_instance)
+
+    def merge(node1, node2):
+        if node1 in cannot_be_extended or node2 in cannot_be_extended:
+            return
+
+        elif node1 in not_planned and node2 in not_planned:
+            if node1.demand + node2.demand <= vrp_instance.capacity:
+                solution.add_route([node1, node2])
+                not_planned.remove(node1)
+                not_planned.remove(node2)
+                can_be_extended.extend([node1, node2])
+
+        elif node1 in not_planned or node2 in not_planned:
+            endpoint, new_node = (
+                (node1, node2) if node1 in can_be_extended else (node2, node1)
+            )
+            route = solution.route_of(endpoint)
+            if route.volume + new_node.demand <= vrp_instance.capacity:
+                if solution.prev(endpoint).is_depot:
+                    insert_after = solution.prev(endpoint)
+                else:
+                    insert_after = endpoint
+                solution.insert_nodes_after([new_node], insert_after, route)
+                can_be_extended.remove(endpoint)
+                not_planned.remove(new_node)
+                cannot_be_extended.append(endpoint)
+                can_be_extended.append(new_node)
+
+        else:
+            route1 = solution.route_of(node1)
+            route2 = solution.route_of(node2)
+            if route1 != route2 and (
+                route1.volume + route2.volume <= vrp_instance.capacity
+            ):
+                route2_customers = route2.customers
+                solution.remove_nodes(route2_customers)
+                if solution.next(node1).is_depot:
+                    if solution.next(node2).is_depot:
+                        route2_customers = route2_customers[::-1]
+                    solution.insert_nodes_after(route2_customers, node1, route1)
+                if solution.prev(node1).is_depot:
+                    if solution.prev(node2).is_depot:
+                        route2_customers = route2_customers[::-1]
+                    solution.insert_nodes_after(
+                        route2_customers, solution.prev(node1), route1
+                    )
+                can_be_extended.remove(node1)
+                can_be_extended.remove(node2)
+                cannot_be_extended.extend([node1, node2])
+
+    savings_list = compute_savings(customers, depot, evaluator)
+    for node1, node2 in get_ranked_savings(savings_list):
+        merge(node1, node2)
+
+    open_customers = [
+        idx for idx, node in enumerate(customers) if node not in cannot_be_extended
+    ]
+    fallback_pairs = [
+        (idx1, idx2)
+        for pos, idx1 in enumerate(open_customers)
+        for idx2 in open_customers[pos + 1 :]
+    ]
+    fallback_savings = compute_savings_of_pairs(
+        customers, depot, evaluator, fallback_pairs
+    )
+    for node1, node2 in get_ranked_savings(fallback_savings):
+        merge(node1, node2)
+
+    for node in not_planned:
+        solution.add_route([node])
+
+    return solution
+
+
+@pytest.mark.parametrize("demand_weighted", [False, True])
+@pytest.mark.parametrize("seed", [0, 3])
+def test_clark_wright_parallel_merges_like_node_lists(demand_weighted, seed):
+    problem = read_vrp_instance(os.path.join(instance_path, "X-n101-k25.vrp"))
+    evaluator = CostEvaluator(
+        problem.nodes, problem.capacity, {"neighborhood_size": 20}
+    )
+
+    def get_ranked_savings(savings_list):
+        if demand_weighted:
+            savings_list = compute_weighted_savings(
+                problem.customers, problem.depot, evaluator, savings_list
+            )
+        if seed != 0:
+            savings_list = randomize_savings(savings_list, seed)
+        return savings_list
+
+    solution = clark_wright_parallel(
+        problem, evaluator, demand_weighted=demand_weighted, seed=seed
+    )
+    expected = merge_routes_with_node_lists(problem, evaluator, get_ranked_savings)
+
+    # same routes (including the ones emptied by merges) in the same order
+    assert [route.print() for route in solution.routes] == [
+        route.print() for route in expected.routes
+    ]
@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from kgls import KGLS
+from kgls.datastructure import CostEvaluator, Node, VRPProblem, VRPSolution
+from kgls.local_search import (
+    Deadline,
+    improve_solution,
+    perturbate_solution,
+    register_operator,
+    get_registered_operators,
+)
+from kgls.local_search import operator_registry
+from kgls.local_search.search import local_search, schedule_operators
+from kgls.read_write import read_vrp_instance
+from kgls.solution_construction import clark_wright_route_reduction
+
+instance_path = os.path.join(
+    Path(__file__).resolve().parents[2], "examples", "simple_run", "instances"
+)
+
+
+def build_solution() -> VRPSolution:
+    depot = Node(0, 0, 0, 0, True)
+    customers = [Node(1, 0, 10, 1, False), Node(2, 0, 20, 1, False)]
+    problem = VRPProblem([depot] + customers, 3)
+
+    solution = VRPSolution(problem)
+    solution.add_route(customers)
+
+    return solution
+
+
+def search_nothing(solution, cost_evaluator, start_nodes, max_moves):
+    return []
+
+
+def keep_operator_registry(monkeypatch):
+    # operators registered from now on are removed when 'monkeypatch' is undone
+    monkeypatch.setattr(
+        operator_registry, "_operators", dict(operator_registry._operators)
+    )
+    monkeypatch.setattr(
+        operator_registry,
+        "_operator_parameters",
+        dict(operator_registry._operator_parameters),
+    )
+
+
+@pytest.fixture
+def restore_operators(monkeypatch):
+    keep_operator_registry(monkeypatch)
+
+
+def test_register_operator(restore_operators):
+    register_operator("no_move", search_nothing)
+
+    assert "no_move" in get_registered_operators()
+    # registered operators are valid moves
+    KGLS._get_run_parameters(moves=["segment_move", "no_move"])
+
+
+def test_registered_operators_are_restored():
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        keep_operator_registry(monkeypatch)
+        register_operator("temporary_move", search_nothing)
+        assert "temporary_move" in get_registered_operators()
+
+    assert "temporary_move" not in get_registered_operators()
+
+
+def test_schedule_operators():
+    solution = build_solution()
+    run_parameters = {
+        "moves": ["segment_move", "cross_exchange", "relocation_chain"],
+        "operator_scheduling": "adaptive",
+        "scheduling_patience": 2,
+    }
+    stats = solution.solution_stats
+    stats["time_segment_move"] = 1.0
+    stats["improvement_segment_move"] = 10
+    stats["time_cross_exchange"] = 1.0
+    stats["improvement_cross_exchange"] = 20
+    stats["time_relocation_chain"] = 1.0
+    stats["idle_calls_relocation_chain"] = 3
+
+    # ranked by improvement per second, idle relocation chain is skipped
+    assert schedule_operators(solution, run_parameters) == [
+        "cross_exchange",
+        "segment_move",
+    ]
+    # and retried after 'scheduling_patience' calls
+    assert "relocation_chain" in schedule_operators(solution, run_parameters)
+
+    run_parameters["operator_scheduling"] = "fixed"
+    assert schedule_operators(solution, run_parameters) == run_parameters["moves"]
+
+
+def test_adaptive_scheduling_confirms_local_optimum():
+    run_parameters = KGLS._get_run_parameters(
+        moves=["cross_exchange", "segment_move"],
+        operator_scheduling="adaptive",
+        scheduling_patience=1000,
+    )
+    problem = read_vrp_instance(os.path.join(instance_path, "X-n101-k25.vrp"))
+    evaluator = CostEvaluator(problem.nodes, problem.capacity, run_parameters)
+    solution = clark_wright_route_reduction(problem, evaluator)
+
+    # the cross exchange has been idle for a while and would be skipped
+    solution.solution_stats["idle_calls_cross_exchange"] = 1001
+    improve_solution(solution, evaluator, solution.routes, run_parameters)
+
+    # the result is a local optimum over all moves, including the skipped one
+    run_parameters["operator_scheduling"] = "fixed"
+    executed_moves, _ = local_search(
+        solution, evaluator, problem.customers, True, run_parameters
+    )
+    assert executed_moves == 0
+
+
+def test_perturbation_batch():
+    run_parameters = KGLS._get_run_parameters(
+        perturbation_batch_size=5, num_perturbations=10
+    )
+    problem = read_vrp_instance(os.path.join(instance_path, "X-n101-k25.vrp"))
+    evaluator = CostEvaluator(problem.nodes, problem.capacity, run_parameters)
+    solution = clark_wright_route_reduction(problem, evaluator)
+
+    batches = []
+    get_and_penalize_worst_edges = evaluator.get_and_penalize_worst_edges
+
+    def record_batch(num_edges):
+        batches.append(get_and_penalize_worst_edges(num_edges))
+        return batches[-1]
+
+    evaluator.get_and_penalize_worst_edges = record_batch
+    perturbate_solution(solution, evaluator, run_parameters)
+
+    assert batches
+    # each batch penalizes 5 different edges
+    for batch in batches:
+        assert len(set(batch)) == 5
+    solution.validate()
+
+
+def test_deadline():
+    assert not any(Deadline().expired() for _ in range(100))
+
+    deadline = Deadline(time.time() - 1, check_interval=4)
+    # the clock is only read every 'check_interval' checks
+    assert [deadline.expired() for _ in range(5)] == [False, False, False, True, True]
+
+    cancel_event = threading.Event()
+    deadline = Deadline(check_interval=1, cancel_events=[cancel_event])
+    assert not deadline.expired()
+    cancel_event.set()
+    time.sleep(0.02)
+    assert deadline.expired()
+
+
+def test_deadline_interrupts_iteration():
+    kgls = KGLS(
+        os.path.join(instance_path, "X-n101-k25.vrp"), num_perturbations=100000
+    )
+    kgls.set_abortion_condition("max_runtime", 1)
+
+    start_time = time.time()
+    kgls.run()
+
+    # a single iteration would take much longer
+    assert time.time() - start_time < 3
+    kgls.best_solution.validate()
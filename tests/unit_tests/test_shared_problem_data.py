@@ -0,0 +1,63 @@
+import pickle
+
+from kgls.datastructure import (
+    Node,
+    Edge,
+    VRPProblem,
+    VRPSolution,
+    CostEvaluator,
+    SharedProblemData,
+)
+
+
+def test_shared_problem_data():
+    depot = Node(1, 0, 0, 0, True)
+    customers = [
+        Node(2, 10, 0, 1, False),
+        Node(3, 30, 0, 1, False),
+        Node(4, 60, 5, 2, False),
+    ]
+    problem = VRPProblem([depot] + customers, 3, bks=100)
+    evaluator = CostEvaluator(problem.nodes, 3, {"neighborhood_size": 2})
+
+    with SharedProblemData.create(problem, 2) as shared_data:
+        # workers receive the data by name only
+        attached_data = pickle.loads(pickle.dumps(shared_data))
+        shared_problem = attached_data.get_problem()
+        shared_evaluator = CostEvaluator(
+            shared_problem.nodes,
+            3,
+            {"neighborhood_size": 2},
+            shared_data=attached_data,
+        )
+
+        assert shared_problem.nodes == problem.nodes
+        assert shared_problem.depot.is_depot and shared_problem.bks == 100
+        for node1 in problem.nodes:
+            for node2 in problem.nodes:
+                assert shared_evaluator.get_distance(
+                    node1, node2
+                ) == evaluator.get_distance(node1, node2)
+        for node in customers:
+            assert shared_evaluator.get_neighborhood(
+                node
+            ) == evaluator.get_neighborhood(node)
+
+        # penalties stay private
+        solution = VRPSolution(shared_problem)
+        solution.add_route(shared_problem.customers)
+        shared_evaluator.determine_edge_badness(solution.routes)
+        shared_evaluator.determine_edge_badness(solution.routes)
+        shared_evaluator.enable_penalization()
+        edge = shared_evaluator.get_and_penalize_worst_edge()
+        assert edge == Edge(customers[2], depot)
+        assert shared_evaluator.get_distance(customers[2], depot) > 60
+        assert attached_data.get_cost_rows()[4][1] == 60
+        # no cost row is copied, only the penalized costs are stored per edge
+        penalized_costs = shared_evaluator.get_distance(customers[2], depot)
+        assert shared_evaluator._penalized_costs == {
+            4: {1: penalized_costs},
+            1: {4: penalized_costs},
+        }
+        assert shared_evaluator.get_costs_from(depot)[4] == penalized_costs
+        assert shared_evaluator.get_costs_from(depot)[2] == 10
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+
+from kgls import SolverService
+from kgls.read_write import read_vrp_instance
+
+instance_file = os.path.join(
+    Path(__file__).resolve().parents[2],
+    "examples",
+    "simple_run",
+    "instances",
+    "X-n101-k25.vrp",
+)
+
+
+def test_stream_solutions():
+    async def stream():
+        async with SolverService(workers=1, in_process=True) as service:
+            with open(instance_file) as file:
+                job = service.submit(
+                    file.read(), abortion_conditions=[("max_iterations", 3)]
+                )
+            events = [event async for event in job.events()]
+            return events, await job.result()
+
+    events, best_event = asyncio.run(stream())
+
+    costs = [event["costs"] for event in events]
+    assert costs == sorted(costs, reverse=True)
+    assert best_event["costs"] == costs[-1]
+    best_event["solution"].validate()
+
+
+def test_cancel_solve():
+    async def cancel():
+        async with SolverService(workers=1, in_process=True) as service:
+            job = service.submit(read_vrp_instance(instance_file))
+            async for event in job.events():
+                job.cancel()
+            return await job.result()
+
+    best_event = asyncio.run(cancel())
+
+    # the search stops after the first iteration, instead of 100 without improvement
+    assert best_event["iteration"] <= 1
+    best_event["solution"].validate()
+
+
+def test_deadline_interrupts_iteration():
+    async def solve():
+        async with SolverService(workers=1, in_process=True) as service:
+            return await service.solve(
+                read_vrp_instance(instance_file), deadline=1, num_perturbations=100000
+            )
+
+    start_time = time.time()
+    best_event = asyncio.run(solve())
+
+    # a single iteration would take much longer
+    assert time.time() - start_time < 3
+    best_event["solution"].validate()
+
+
+def test_cancel_interrupts_iteration():
+    async def cancel():
+        async with SolverService(workers=1, in_process=True) as service:
+            job = service.submit(
+                read_vrp_instance(instance_file), num_perturbations=100000
+            )
+            async for event in job.events():
+                job.cancel()
+            return await job.result()
+
+    start_time = time.time()
+    best_event = asyncio.run(cancel())
+
+    assert time.time() - start_time < 3
+    best_event["solution"].validate()
+
+
+def test_deadline_in_process_pool():
+    async def solve():
+        async with SolverService(workers=2) as service:
+            return await asyncio.gather(
+                service.solve(read_vrp_instance(instance_file), deadline=1),
+                service.solve(read_vrp_instance(instance_file), deadline=1, seed=1),
+            )
+
+    best_events = asyncio.run(solve())
+
+    assert len(best_events) == 2
+    for best_event in best_events:
+        assert best_event["run_time"] < 5
+        best_event["solution"].validate()
@@ -0,0 +1,99 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from kgls import KGLS
+from kgls.datastructure import Node, VRPProblem
+from kgls.solution_construction.split_algorithm import (
+    get_giant_tour,
+    giant_tour_split,
+    split,
+)
+
+instance_path = os.path.join(
+    Path(__file__).resolve().parents[2], "examples", "simple_run", "instances"
+)
+
+
+def test_split():
+    depot = Node(0, 0, 0, 0, True)
+    giant_tour = [
+        Node(1, 0, 10, 1, False),
+        Node(2, 0, 11, 1, False),
+        Node(3, 10, 0, 1, False),
+        Node(4, 11, 0, 1, False),
+    ]
+
+    routes = split(giant_tour, depot, 2)
+
+    # the only split into two routes keeps neighboring customers together
+    assert [[node.node_id for node in route] for route in routes] == [[1, 2], [3, 4]]
+
+
+def test_split_respects_capacity():
+    depot = Node(0, 0, 0, 0, True)
+    giant_tour = [Node(i, i, 1, 1, False) for i in range(1, 11)]
+
+    routes = split(giant_tour, depot, 3)
+
+    assert [node for route in routes for node in route] == giant_tour
+    assert all(sum(node.demand for node in route) <= 3 for route in routes)
+    assert len(routes) == 4
+
+
+def test_split_customer_exceeding_capacity():
+    depot = Node(0, 0, 0, 0, True)
+    giant_tour = [
+        Node(1, 0, 10, 1, False),
+        Node(2, 0, 11, 5, False),
+        Node(3, 0, 12, 1, False),
+    ]
+
+    routes = split(giant_tour, depot, 3)
+
+    # the oversized customer gets its own route, as in the savings construction
+    assert [[node.node_id for node in route] for route in routes] == [[1], [2], [3]]
+
+
+@pytest.mark.parametrize("tour_order", ["sweep", "hilbert"])
+def test_giant_tour_split(tour_order):
+    depot = Node(0, 50, 50, 0, True)
+    customers = [
+        Node(i, (i * 37) % 100, (i * 61) % 100, 1 + i % 3, False) for i in range(1, 51)
+    ]
+    problem = VRPProblem([depot] + customers, 10)
+
+    assert sorted(get_giant_tour(problem, tour_order), key=lambda n: n.node_id) == customers
+
+    solution = giant_tour_split(problem, tour_order)
+    solution.validate()
+
+
+@pytest.mark.parametrize("tour_order", ["sweep", "hilbert"])
+def test_giant_tour_split_seed(tour_order):
+    depot = Node(0, 50, 50, 0, True)
+    customers = [
+        Node(i, (i * 37) % 100, (i * 61) % 100, 1 + i % 3, False) for i in range(1, 51)
+    ]
+    problem = VRPProblem([depot] + customers, 10)
+
+    def get_routes(seed: int) -> list[str]:
+        solution = giant_tour_split(problem, tour_order, seed)
+        solution.validate()
+        return [route.print() for route in solution.routes]
+
+    # the same seed constructs the same solution, different seeds diversify it
+    assert get_routes(0) == get_routes(0)
+    assert get_routes(3) == get_routes(3)
+    assert len({tuple(get_routes(seed)) for seed in range(4)}) > 1
+
+
+def test_kgls_with_split_construction():
+    kgls = KGLS(
+        os.path.join(instance_path, "X-n101-k25.vrp"), construction="hilbert_split"
+    )
+    kgls.set_abortion_condition("max_iterations", 3)
+    kgls.run()
+
+    kgls.best_solution.validate()